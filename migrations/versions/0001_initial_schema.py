@@ -0,0 +1,102 @@
+"""Initial schema (tables previously created by init_db)
+
+Databases bootstrapped with init_db() should be stamped at this revision:
+    alembic stamp 0001
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analysis_requests",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("channel_identifier", sa.String(255), nullable=False),
+        sa.Column("channel_id", sa.BigInteger(), nullable=True),
+        sa.Column("channel_title", sa.String(500), nullable=True),
+        sa.Column("requested_by", sa.BigInteger(), nullable=True),
+        sa.Column("source", sa.String(20), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_analysis_requests_channel_identifier", "analysis_requests", ["channel_identifier"]
+    )
+
+    op.create_table(
+        "channel_snapshots",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("analysis_id", sa.Integer(), nullable=False),
+        sa.Column("channel_id", sa.BigInteger(), nullable=False),
+        sa.Column("title", sa.String(500), nullable=False),
+        sa.Column("username", sa.String(255), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("member_count", sa.Integer(), nullable=False),
+        sa.Column("channel_type", sa.String(20), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_channel_snapshots_analysis_id", "channel_snapshots", ["analysis_id"])
+    op.create_index("ix_channel_snapshots_channel_id", "channel_snapshots", ["channel_id"])
+
+    op.create_table(
+        "post_records",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("analysis_id", sa.Integer(), nullable=False),
+        sa.Column("channel_id", sa.BigInteger(), nullable=False),
+        sa.Column("message_id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("text", sa.Text(), nullable=True),
+        sa.Column("views", sa.Integer(), nullable=False),
+        sa.Column("forwards", sa.Integer(), nullable=False),
+        sa.Column("replies", sa.Integer(), nullable=False),
+        sa.Column("reactions_count", sa.Integer(), nullable=False),
+        sa.Column("media_type", sa.String(30), nullable=True),
+        sa.Column("has_link", sa.Boolean(), nullable=False),
+    )
+    op.create_index("ix_post_records_analysis_id", "post_records", ["analysis_id"])
+    op.create_index("ix_post_records_channel_id", "post_records", ["channel_id"])
+
+    op.create_table(
+        "analysis_results",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("analysis_id", sa.Integer(), nullable=False),
+        sa.Column("total_posts", sa.Integer(), nullable=False),
+        sa.Column("total_views", sa.BigInteger(), nullable=False),
+        sa.Column("total_forwards", sa.Integer(), nullable=False),
+        sa.Column("total_reactions", sa.Integer(), nullable=False),
+        sa.Column("avg_views", sa.Float(), nullable=False),
+        sa.Column("avg_engagement_rate", sa.Float(), nullable=False),
+        sa.Column("member_count", sa.Integer(), nullable=False),
+        sa.Column("avg_posts_per_day", sa.Float(), nullable=False),
+        sa.Column("most_active_hour", sa.Integer(), nullable=True),
+        sa.Column("most_active_weekday", sa.Integer(), nullable=True),
+        sa.Column("pct_text_only", sa.Float(), nullable=False),
+        sa.Column("pct_photo", sa.Float(), nullable=False),
+        sa.Column("pct_video", sa.Float(), nullable=False),
+        sa.Column("report_pdf_path", sa.String(500), nullable=True),
+        sa.Column("computed_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index(
+        "ix_analysis_results_analysis_id", "analysis_results", ["analysis_id"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("analysis_results")
+    op.drop_table("post_records")
+    op.drop_table("channel_snapshots")
+    op.drop_table("analysis_requests")
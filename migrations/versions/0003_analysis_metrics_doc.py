@@ -0,0 +1,29 @@
+"""Store the full metrics document with each analysis result
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("analysis_results", sa.Column("metrics_doc", sa.LargeBinary(), nullable=True))
+    op.add_column(
+        "analysis_results",
+        sa.Column("report_lang", sa.String(5), nullable=False, server_default="en"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("analysis_results", "report_lang")
+    op.drop_column("analysis_results", "metrics_doc")
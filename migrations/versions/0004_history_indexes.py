@@ -0,0 +1,31 @@
+"""Composite indexes for keyset-paginated history and listings
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_analysis_requests_requested_by_created",
+        "analysis_requests",
+        ["requested_by", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_analysis_requests_created", "analysis_requests", ["created_at", "id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_analysis_requests_created", table_name="analysis_requests")
+    op.drop_index("ix_analysis_requests_requested_by_created", table_name="analysis_requests")
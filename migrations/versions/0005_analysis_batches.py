@@ -0,0 +1,43 @@
+"""Analysis batches (POST /api/analyze/batch)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analysis_batches",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("source", sa.String(20), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        "analysis_batch_items",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("batch_id", sa.Integer(), nullable=False),
+        sa.Column("channel_identifier", sa.String(255), nullable=False),
+        sa.Column("request_id", sa.Integer(), nullable=True),
+        sa.Column("result_id", sa.Integer(), nullable=True),
+        sa.Column("cached", sa.Boolean(), nullable=False),
+        sa.Column("error_message", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_analysis_batch_items_batch_id", "analysis_batch_items", ["batch_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_analysis_batch_items_batch_id", table_name="analysis_batch_items")
+    op.drop_table("analysis_batch_items")
+    op.drop_table("analysis_batches")
@@ -5,10 +5,12 @@ from __future__ import annotations
 import asyncio
 import logging
 import re
+import time
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 
 from telethon import TelegramClient
+from telethon.errors import FloodWaitError
 from telethon.tl.functions.channels import GetFullChannelRequest
 from telethon.tl.functions.messages import GetHistoryRequest
 from telethon.tl.types import (
@@ -19,6 +21,12 @@ from telethon.tl.types import (
 )
 
 from src.config import settings
+from src.observability import tracing
+from src.observability.prometheus import (
+    STAGE_SECONDS,
+    TELETHON_FLOOD_WAIT_SECONDS,
+    TELETHON_FLOOD_WAITS,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -83,6 +91,8 @@ class FetchedPost:
 class FetchResult:
     channel: ChannelInfo
     posts: list[FetchedPost] = field(default_factory=list)
+    truncated: bool = False  # True when older history was not fetched (max_posts or deadline)
+    deadline_hit: bool = False  # True when fetching stopped early to meet the deadline
     fetch_time: datetime = field(default_factory=lambda: datetime.now(UTC))
 
 
@@ -117,28 +127,49 @@ def _classify_media(message) -> str | None:
     return "other"
 
 
-async def fetch_channel(identifier: str, max_posts: int | None = None) -> FetchResult:
+async def _within(awaitable, deadline: float | None):
+    """Await ``awaitable``, raising TimeoutError once the monotonic ``deadline`` passes."""
+    if deadline is None:
+        return await awaitable
+    return await asyncio.wait_for(awaitable, timeout=max(deadline - time.monotonic(), 0))
+
+
+async def fetch_channel(
+    identifier: str, max_posts: int | None = None, deadline: float | None = None
+) -> FetchResult:
     """
     Connect to Telegram via Telethon, resolve the channel, and fetch recent posts.
 
+    With a deadline, batch throughput is tracked and fetching stops before a
+    batch that wouldn't finish in time; the posts collected so far are
+    returned with ``deadline_hit`` set.
+
     Args:
         identifier: Channel username (without @) or full t.me link.
         max_posts: Maximum posts to fetch (default from settings).
+        deadline: time.monotonic() by which fetching must be done (optional).
 
     Returns:
         FetchResult with channel info and post list.
+
+    Raises:
+        TimeoutError: if the deadline passes before any post was fetched.
     """
     max_posts = max_posts or settings.MAX_POSTS
     username = parse_channel_identifier(identifier)
 
-    client = await get_telethon_client()
+    client = await _within(get_telethon_client(), deadline)
 
     try:
-        entity = await client.get_entity(username)
-        if not isinstance(entity, Channel):
-            raise ValueError(f"@{username} is not a channel or supergroup")
-
-        full = await client(GetFullChannelRequest(entity))
+        with (
+            STAGE_SECONDS.labels("resolve").time(),
+            tracing.span("telethon.resolve", {"channel": username}),
+        ):
+            entity = await _within(client.get_entity(username), deadline)
+            if not isinstance(entity, Channel):
+                raise ValueError(f"@{username} is not a channel or supergroup")
+
+            full = await _within(client(GetFullChannelRequest(entity)), deadline)
         full_chat = full.full_chat
 
         channel_info = ChannelInfo(
@@ -154,20 +185,46 @@ async def fetch_channel(identifier: str, max_posts: int | None = None) -> FetchR
         posts: list[FetchedPost] = []
         offset_id = 0
         batch_size = min(100, max_posts)
+        batch_seconds: float | None = None  # EWMA of one GetHistory round trip
+        deadline_hit = False
+        fetch_started = time.monotonic()
 
         while len(posts) < max_posts:
+            if deadline is not None and batch_seconds is not None:
+                if time.monotonic() + batch_seconds > deadline:
+                    deadline_hit = True
+                    break
             limit = min(batch_size, max_posts - len(posts))
-            history = await client(
-                GetHistoryRequest(
-                    peer=entity,
-                    offset_id=offset_id,
-                    offset_date=None,
-                    add_offset=0,
-                    limit=limit,
-                    max_id=0,
-                    min_id=0,
-                    hash=0,
-                )
+            started = time.monotonic()
+            try:
+                with tracing.span(
+                    "telethon.GetHistory", {"offset_id": offset_id, "limit": limit}
+                ) as page_span:
+                    history = await _within(
+                        client(
+                            GetHistoryRequest(
+                                peer=entity,
+                                offset_id=offset_id,
+                                offset_date=None,
+                                add_offset=0,
+                                limit=limit,
+                                max_id=0,
+                                min_id=0,
+                                hash=0,
+                            )
+                        ),
+                        deadline,
+                    )
+                    page_span.set_attribute("messages", len(history.messages))
+            except TimeoutError:
+                if not posts:
+                    raise
+                deadline_hit = True
+                break
+            elapsed = time.monotonic() - started
+            STAGE_SECONDS.labels("fetch_page").observe(elapsed)
+            batch_seconds = (
+                elapsed if batch_seconds is None else 0.7 * batch_seconds + 0.3 * elapsed
             )
 
             if not history.messages:
@@ -211,9 +268,23 @@ async def fetch_channel(identifier: str, max_posts: int | None = None) -> FetchR
             if len(history.messages) < limit:
                 break
 
+        if deadline_hit:
+            rate = len(posts) / max(time.monotonic() - fetch_started, 1e-3)
+            logger.warning(
+                f"Deadline reached for @{username}: stopping at {len(posts)}/{max_posts} posts "
+                f"(~{rate:.0f} posts/s)"
+            )
         logger.info(f"Fetched {len(posts)} posts from @{username}")
-        return FetchResult(channel=channel_info, posts=posts)
+        return FetchResult(
+            channel=channel_info,
+            posts=posts,
+            truncated=deadline_hit or len(posts) >= max_posts,
+            deadline_hit=deadline_hit,
+        )
 
-    except Exception:
+    except FloodWaitError as e:
+        # Longer than Telethon's auto-sleep threshold — the job queue retries later
+        TELETHON_FLOOD_WAITS.inc()
+        TELETHON_FLOOD_WAIT_SECONDS.inc(e.seconds)
         raise
     # Client is shared — do NOT disconnect here
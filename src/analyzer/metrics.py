@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import json
 import statistics
+import zlib
 from collections import Counter
-from dataclasses import dataclass, field
-from datetime import UTC, datetime, timedelta
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, date, datetime, timedelta
 
 from src.analyzer.fetcher import FetchResult, FetchedPost
 
@@ -58,6 +60,17 @@ class ViewsTrend:
     daily_posts: list[int] = field(default_factory=list)
 
 
+@dataclass
+class DailyStats:
+    """One day of activity for a channel (rollup row)."""
+    day: date
+    posts: int
+    views: int
+    forwards: int
+    reactions: int
+    replies: int
+
+
 @dataclass
 class AnalysisMetrics:
     """Complete analysis output."""
@@ -106,6 +119,71 @@ class AnalysisMetrics:
 
     # Data coverage info
     data_note: str  # explains what the numbers represent
+    partial_fetch: bool = False  # fetching stopped early to meet the analysis deadline
+
+
+# ── Serialization ──────────────────────────────────────────────────────────
+# Stored compressed in AnalysisResult.metrics_doc so reports and charts can be
+# rebuilt without refetching from Telegram.
+
+def _json_default(value: object) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def _parse_dt(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def metrics_to_dict(metrics: AnalysisMetrics) -> dict:
+    """Convert metrics to a JSON-safe dict (datetimes as ISO strings)."""
+    return json.loads(json.dumps(asdict(metrics), default=_json_default))
+
+
+def metrics_from_dict(data: dict) -> AnalysisMetrics:
+    """Inverse of metrics_to_dict."""
+    pp = data["posting_pattern"]
+    trend = data.get("views_trend") or {}
+
+    def _top(p: dict) -> TopPost:
+        return TopPost(**{**p, "date": _parse_dt(p["date"])})
+
+    return AnalysisMetrics(
+        **{
+            **data,
+            "engagement": EngagementBreakdown(**data["engagement"]),
+            "posting_pattern": PostingPattern(
+                avg_posts_per_day=pp["avg_posts_per_day"],
+                most_active_hour=pp["most_active_hour"],
+                most_active_weekday=pp["most_active_weekday"],
+                # JSON object keys are strings — restore int keys
+                hour_distribution={int(k): v for k, v in pp.get("hour_distribution", {}).items()},
+                weekday_distribution={
+                    int(k): v for k, v in pp.get("weekday_distribution", {}).items()
+                },
+            ),
+            "content_mix": ContentMix(**data["content_mix"]),
+            "views_trend": ViewsTrend(**trend),
+            "top_posts_by_views": [_top(p) for p in data.get("top_posts_by_views", [])],
+            "top_posts_by_engagement": [
+                _top(p) for p in data.get("top_posts_by_engagement", [])
+            ],
+            "date_from": _parse_dt(data.get("date_from")),
+            "date_to": _parse_dt(data.get("date_to")),
+        }
+    )
+
+
+def dump_metrics(metrics: AnalysisMetrics) -> bytes:
+    """Serialize metrics to compressed JSON bytes."""
+    raw = json.dumps(asdict(metrics), default=_json_default, separators=(",", ":"))
+    return zlib.compress(raw.encode("utf-8"), level=6)
+
+
+def load_metrics(blob: bytes) -> AnalysisMetrics:
+    """Inverse of dump_metrics."""
+    return metrics_from_dict(json.loads(zlib.decompress(blob).decode("utf-8")))
 
 
 def _text_preview(text: str | None, max_len: int = 80) -> str:
@@ -148,6 +226,31 @@ def _compute_views_trend(posts: list[FetchedPost]) -> ViewsTrend:
     )
 
 
+def compute_daily_stats(posts: list[FetchedPost], truncated: bool = False) -> list[DailyStats]:
+    """
+    Aggregate posts into per-day totals (UTC days, oldest first).
+
+    When the fetch was truncated, the oldest day is only partially covered and
+    is dropped so it never overwrites a complete row from an earlier analysis.
+    """
+    by_day: dict[date, DailyStats] = {}
+    for p in posts:
+        day = p.date.date()
+        row = by_day.get(day)
+        if row is None:
+            row = by_day[day] = DailyStats(day, 0, 0, 0, 0, 0)
+        row.posts += 1
+        row.views += p.views
+        row.forwards += p.forwards
+        row.reactions += p.reactions_count
+        row.replies += p.replies
+
+    days = sorted(by_day)
+    if truncated and days:
+        days = days[1:]
+    return [by_day[d] for d in days]
+
+
 def _classify_activity(days_since_last: int, avg_posts_per_day: float) -> tuple[str, str]:
     """
     Classify channel activity status and posting frequency.
@@ -293,7 +396,12 @@ def compute_metrics(result: FetchResult, top_n: int = 10) -> AnalysisMetrics:
         f"({date_from.strftime('%b %d')} – {date_to.strftime('%b %d, %Y')}, "
         f"{span_days} days). "
     )
-    if n >= 500:
+    if result.deadline_hit:
+        data_note += (
+            "Fetching stopped early to finish within the time limit, so older "
+            "posts are not included."
+        )
+    elif n >= 500:
         data_note += (
             "This covers active posting history. For channels with high "
             "volume (17+ posts/day), older posts beyond this window are not included."
@@ -342,4 +450,5 @@ def compute_metrics(result: FetchResult, top_n: int = 10) -> AnalysisMetrics:
         activity_status=activity_status,
         posting_frequency=posting_frequency,
         data_note=data_note,
+        partial_fetch=result.deadline_hit,
     )
@@ -2,22 +2,118 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
-from datetime import UTC, datetime
+import time
+from collections.abc import Awaitable, Callable
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.analyzer.fetcher import FetchResult, fetch_channel, parse_channel_identifier
-from src.analyzer.metrics import AnalysisMetrics, compute_metrics
-from src.cache import get_cached_analysis, set_cached_analysis
+from src.analyzer.metrics import (
+    AnalysisMetrics,
+    ContentMix,
+    EngagementBreakdown,
+    PostingPattern,
+    ViewsTrend,
+    compute_daily_stats,
+    compute_metrics,
+    dump_metrics,
+    metrics_from_dict,
+    metrics_to_dict,
+)
+from src.cache import (
+    TERMINAL_STATUSES,
+    get_cached_analysis,
+    publish_status,
+    set_cached_analysis,
+    subscribe_status,
+)
 from src.db.models import AnalysisResult, ChannelSnapshot, PostRecord
 from src.db.repository import AnalysisRepository
-from src.reports.pdf import generate_pdf_report
+from src.db.session import async_session
+from src.db.write_behind import request_log
+from src.jobs.admission import StageClock, post_fetch_seconds, record_stage_durations
+from src.notify import notify_admin
+from src.observability import tracing
+from src.observability.profiling import AnalysisProfiler, format_summary, should_profile
+from src.observability.prometheus import ANALYSES_IN_PROGRESS, ANALYSES_TOTAL, STAGE_SECONDS
+from src.reports.charts import in_process_rendering
+from src.reports.pdf import REPORTS_DIR, generate_pdf_report
 
 logger = logging.getLogger(__name__)
 
+_notifications: set[asyncio.Task] = set()  # profile summaries on their way to the admin
 
+
+def _metrics_from_cache(cached: dict) -> AnalysisMetrics:
+    """Reconstruct minimal metrics from the Redis summary (legacy rows without a document)."""
+    eng_data = cached.get("engagement", {})
+    return AnalysisMetrics(
+        channel_title=cached.get("channel_title", ""),
+        channel_username=cached.get("channel_username"),
+        channel_type=cached.get("channel_type", "channel"),
+        member_count=cached.get("member_count", 0),
+        description=None,
+        total_posts=cached.get("total_posts", 0),
+        total_views=cached.get("total_views", 0),
+        total_forwards=cached.get("total_forwards", 0),
+        total_reactions=cached.get("total_reactions", 0),
+        total_replies=cached.get("total_replies", 0),
+        avg_views=cached.get("avg_views", 0.0),
+        avg_engagement_rate=cached.get("avg_engagement_rate", 0.0),
+        avg_forwards_per_post=cached.get("avg_forwards_per_post", 0.0),
+        avg_reactions_per_post=cached.get("avg_reactions_per_post", 0.0),
+        engagement=EngagementBreakdown(
+            median_views=eng_data.get("median_views", 0.0),
+            virality_rate=eng_data.get("virality_rate", 0.0),
+            interaction_rate=eng_data.get("interaction_rate", 0.0),
+            avg_replies_per_post=eng_data.get("avg_replies_per_post", 0.0),
+            pct_posts_with_links=eng_data.get("pct_posts_with_links", 0.0),
+            views_per_member=eng_data.get("views_per_member", 0.0),
+        ),
+        posting_pattern=PostingPattern(
+            avg_posts_per_day=cached.get("avg_posts_per_day", 0.0),
+            most_active_hour=cached.get("most_active_hour"),
+            most_active_weekday=cached.get("most_active_weekday"),
+        ),
+        content_mix=ContentMix(
+            pct_text_only=cached.get("pct_text_only", 0),
+            pct_photo=cached.get("pct_photo", 0),
+            pct_video=cached.get("pct_video", 0),
+            pct_document=cached.get("pct_document", 0),
+            pct_other=cached.get("pct_other", 0),
+        ),
+        views_trend=ViewsTrend(),
+        top_posts_by_views=[],
+        top_posts_by_engagement=[],
+        date_from=None,
+        date_to=None,
+        analysis_period_days=cached.get("analysis_period_days", 0),
+        days_since_last_post=cached.get("days_since_last_post", 0),
+        activity_status=cached.get("activity_status", "active"),
+        posting_frequency=cached.get("posting_frequency", "moderate"),
+        data_note="Cached result.",
+    )
+
+
+async def _report_progress(
+    request_id: int,
+    stage: str,
+    message: str,
+    progress_callback=None,
+    clock: StageClock | None = None,
+) -> None:
+    """Publish a stage transition (Redis, no DB write) and forward it to the caller."""
+    if clock is not None:
+        clock.mark(stage)
+    await publish_status(request_id, "running", stage=stage, message=message)
+    if progress_callback:
+        await progress_callback(message)
+
+
+@tracing.traced("pipeline.run_analysis")
 async def run_analysis(
     channel_input: str,
     session: AsyncSession,
@@ -26,10 +122,20 @@ async def run_analysis(
     max_posts: int | None = None,
     progress_callback=None,
     lang: str = "en",
-) -> tuple[AnalysisMetrics, str]:
+    request_id: int | None = None,
+    record_failure: bool | Callable[[Exception], bool] = True,
+    deadline: float | None = None,
+    output: str = "pdf",
+    profile: bool = False,
+) -> tuple[AnalysisMetrics, str | None]:
     """
     Full analysis pipeline.
 
+    The database sees at most two commits: the request row (skipped when the
+    caller already created one) and a single write transaction once the report
+    is built. Intermediate stages go to Redis via publish_status. Cache hits
+    only enqueue their bookkeeping on the write-behind request log.
+
     Args:
         channel_input: Channel link, @username, or plain username.
         session: Database session.
@@ -37,104 +143,130 @@ async def run_analysis(
         source: "bot" or "web".
         max_posts: Override max posts to fetch.
         progress_callback: Optional async callable(stage: str) for progress updates.
+        request_id: Existing AnalysisRequest row to complete (e.g. created by the API).
+        record_failure: Mark the request failed on error — or a callable deciding
+            that from the exception. Job workers leave attempts that will be
+            retried "pending".
+        deadline: time.monotonic() by which the report should be ready. Fetching
+            stops early to leave time for metrics and rendering, and the report
+            covers the posts collected so far (noted in ``data_note``).
+        output: "pdf", or "json" to skip generate_pdf_report — the stored metrics
+            document can still be rendered later (see rebuild_report).
+        profile: Profile every stage (see src.observability.profiling) and skip
+            the cache so there is something to profile. PROFILE_SAMPLE_RATE
+            also profiles a random fraction of uncached runs.
 
     Returns:
-        (metrics, pdf_path) tuple.
+        (metrics, pdf_path) tuple; pdf_path is None for JSON-only runs.
     """
     repo = AnalysisRepository(session)
     identifier = parse_channel_identifier(channel_input)
+    trace = tracing.current_span()
+    trace.set_attribute("channel", identifier)
+    trace.set_attribute("output", output)
 
     # ── Check cache first ──────────────────────────────────────────────
-    cached = await get_cached_analysis(identifier)
-    if cached and os.path.exists(cached.get("pdf_path", "")) and cached.get("lang", "en") == lang:
+    json_only = output == "json"
+    cached = None if profile else await get_cached_analysis(identifier)
+    if cached and (
+        # JSON consumers only need the metrics; PDF consumers need the file, in their language
+        (json_only and cached.get("metrics"))
+        or (os.path.exists(cached.get("pdf_path", "")) and cached.get("lang", "en") == lang)
+    ):
         logger.info(f"Returning cached result for @{identifier}")
-        # Still create a request record for tracking
-        request = await repo.create_request(
-            identifier, requested_by=requested_by, source=source
-        )
-        request.status = "done"
-        request.channel_title = cached.get("channel_title")
-        request.completed_at = datetime.now(UTC)
-        await session.commit()
+        ANALYSES_TOTAL.labels("cached").inc()
+        trace.set_attribute("cache_hit", True)
+        # Still record the request for tracking — write-behind, never awaited
+        if request_id is not None:
+            request_log.complete(request_id, channel_title=cached.get("channel_title"))
+            await publish_status(request_id, "done")
+        else:
+            request_log.record(
+                identifier,
+                requested_by=requested_by,
+                source=source,
+                channel_title=cached.get("channel_title"),
+            )
 
-        # Reconstruct minimal metrics from cache for the summary
-        from src.analyzer.metrics import (
-            ContentMix,
-            EngagementBreakdown,
-            PostingPattern,
-            ViewsTrend,
-        )
-
-        eng_data = cached.get("engagement", {})
-        metrics = AnalysisMetrics(
-            channel_title=cached.get("channel_title", ""),
-            channel_username=cached.get("channel_username"),
-            channel_type=cached.get("channel_type", "channel"),
-            member_count=cached.get("member_count", 0),
-            description=None,
-            total_posts=cached.get("total_posts", 0),
-            total_views=cached.get("total_views", 0),
-            total_forwards=cached.get("total_forwards", 0),
-            total_reactions=cached.get("total_reactions", 0),
-            total_replies=cached.get("total_replies", 0),
-            avg_views=cached.get("avg_views", 0.0),
-            avg_engagement_rate=cached.get("avg_engagement_rate", 0.0),
-            avg_forwards_per_post=cached.get("avg_forwards_per_post", 0.0),
-            avg_reactions_per_post=cached.get("avg_reactions_per_post", 0.0),
-            engagement=EngagementBreakdown(
-                median_views=eng_data.get("median_views", 0.0),
-                virality_rate=eng_data.get("virality_rate", 0.0),
-                interaction_rate=eng_data.get("interaction_rate", 0.0),
-                avg_replies_per_post=eng_data.get("avg_replies_per_post", 0.0),
-                pct_posts_with_links=eng_data.get("pct_posts_with_links", 0.0),
-                views_per_member=eng_data.get("views_per_member", 0.0),
-            ),
-            posting_pattern=PostingPattern(
-                avg_posts_per_day=cached.get("avg_posts_per_day", 0.0),
-                most_active_hour=cached.get("most_active_hour"),
-                most_active_weekday=cached.get("most_active_weekday"),
-            ),
-            content_mix=ContentMix(
-                pct_text_only=cached.get("pct_text_only", 0),
-                pct_photo=cached.get("pct_photo", 0),
-                pct_video=cached.get("pct_video", 0),
-                pct_document=cached.get("pct_document", 0),
-                pct_other=cached.get("pct_other", 0),
-            ),
-            views_trend=ViewsTrend(),
-            top_posts_by_views=[],
-            top_posts_by_engagement=[],
-            date_from=None,
-            date_to=None,
-            analysis_period_days=cached.get("analysis_period_days", 0),
-            days_since_last_post=cached.get("days_since_last_post", 0),
-            activity_status=cached.get("activity_status", "active"),
-            posting_frequency=cached.get("posting_frequency", "moderate"),
-            data_note="Cached result.",
-        )
-        return metrics, cached["pdf_path"]
+        # Full metrics document travels with the cache entry; older entries fall
+        # back to the stored DB document, then to the cached summary
+        if cached.get("metrics"):
+            metrics = metrics_from_dict(cached["metrics"])
+        else:
+            metrics = None
+            if cached.get("analysis_id"):
+                metrics = await repo.get_metrics(cached["analysis_id"])
+            if metrics is None:
+                metrics = _metrics_from_cache(cached)
+        return metrics, cached.get("pdf_path") or None
 
     # ── Full pipeline ──────────────────────────────────────────────────
 
-    # 1. Create request record
-    request = await repo.create_request(identifier, requested_by=requested_by, source=source)
-    await session.commit()
+    # 1. Create request record (unless the caller already did)
+    if request_id is None:
+        request = await repo.create_request(identifier, requested_by=requested_by, source=source)
+        await session.commit()
+        request_id = request.id
 
+    trace.set_attribute("request_id", request_id)
+    profiler = None
+    if profile or should_profile():
+        profiler = AnalysisProfiler.try_start(
+            request_id, REPORTS_DIR / f"analysis_{request_id}" / "profile"
+        )
+    stage_clock = profiler or StageClock()
+    ANALYSES_IN_PROGRESS.inc()
     try:
-        # 2. Fetch channel data
-        if progress_callback:
-            await progress_callback("Fetching channel data...")
-        logger.info(f"[analysis:{request.id}] Fetching @{identifier}...")
-        result: FetchResult = await fetch_channel(identifier, max_posts=max_posts)
+        # 2. Fetch channel data — no DB connection is held while we wait on Telegram
+        await _report_progress(
+            request_id, "fetching", "Fetching channel data...", progress_callback, stage_clock
+        )
+        logger.info(f"[analysis:{request_id}] Fetching @{identifier}...")
+        fetch_deadline = None
+        if deadline is not None:
+            # Keep back what the remaining stages usually take, but never more
+            # than half of the time that is left
+            remaining = deadline - time.monotonic()
+            fetch_deadline = deadline - min(await post_fetch_seconds(), remaining / 2)
+        result: FetchResult = await fetch_channel(
+            identifier, max_posts=max_posts, deadline=fetch_deadline
+        )
 
-        await repo.set_request_running(request.id, result.channel.channel_id, result.channel.title)
-        await session.commit()
+        # 3. Compute metrics
+        await _report_progress(
+            request_id,
+            "metrics",
+            f"Fetched {len(result.posts)} posts, computing metrics...",
+            progress_callback,
+            stage_clock,
+        )
+        logger.info(f"[analysis:{request_id}] Computing metrics for {len(result.posts)} posts...")
+        with STAGE_SECONDS.labels("metrics").time():
+            metrics = compute_metrics(result)
 
-        # 3. Save channel snapshot
-        if progress_callback:
-            await progress_callback(f"Fetched {len(result.posts)} posts, saving...")
+        # 4. Generate PDF report (JSON-only consumers skip charts and PDF entirely)
+        pdf_path = None
+        if not json_only:
+            await _report_progress(
+                request_id, "report", "Generating PDF report...", progress_callback, stage_clock
+            )
+            if profiler is not None:
+                # cProfile and tracemalloc only see this thread: render and lay
+                # out here, blocking the loop, so the profile shows the real work
+                with in_process_rendering():
+                    pdf_path = generate_pdf_report(metrics, analysis_id=request_id, lang=lang)
+            else:
+                # Rendering and layout block for seconds — keep them off the event loop
+                pdf_path = await asyncio.to_thread(
+                    generate_pdf_report, metrics, analysis_id=request_id, lang=lang
+                )
+
+        # 5. Persist everything in one transaction
+        await _report_progress(
+            request_id, "saving", "Saving results...", progress_callback, stage_clock
+        )
         snapshot = ChannelSnapshot(
-            analysis_id=request.id,
+            analysis_id=request_id,
             channel_id=result.channel.channel_id,
             title=result.channel.title,
             username=result.channel.username,
@@ -142,12 +274,9 @@ async def run_analysis(
             member_count=result.channel.member_count,
             channel_type=result.channel.channel_type,
         )
-        await repo.save_snapshot(snapshot)
-
-        # 4. Save posts
         post_records = [
             PostRecord(
-                analysis_id=request.id,
+                analysis_id=request_id,
                 channel_id=result.channel.channel_id,
                 message_id=p.message_id,
                 date=p.date,
@@ -161,23 +290,8 @@ async def run_analysis(
             )
             for p in result.posts
         ]
-        await repo.save_posts(post_records)
-        await session.commit()
-
-        # 5. Compute metrics
-        if progress_callback:
-            await progress_callback("Computing metrics...")
-        logger.info(f"[analysis:{request.id}] Computing metrics for {len(result.posts)} posts...")
-        metrics = compute_metrics(result)
-
-        # 6. Generate PDF report
-        if progress_callback:
-            await progress_callback("Generating PDF report...")
-        pdf_path = generate_pdf_report(metrics, analysis_id=request.id, lang=lang)
-
-        # 7. Save analysis result
         analysis_result = AnalysisResult(
-            analysis_id=request.id,
+            analysis_id=request_id,
             total_posts=metrics.total_posts,
             total_views=metrics.total_views,
             total_forwards=metrics.total_forwards,
@@ -191,18 +305,38 @@ async def run_analysis(
             pct_text_only=metrics.content_mix.pct_text_only,
             pct_photo=metrics.content_mix.pct_photo,
             pct_video=metrics.content_mix.pct_video,
+            metrics_doc=dump_metrics(metrics),
             report_pdf_path=pdf_path,
+            report_lang=lang,
         )
-        await repo.save_result(analysis_result)
-
-        await repo.set_request_done(request.id)
-        await session.commit()
+        with STAGE_SECONDS.labels("persist").time():
+            await repo.save_analysis(
+                request_id,
+                snapshot=snapshot,
+                posts=post_records,
+                daily_stats=compute_daily_stats(result.posts, result.truncated),
+                result=analysis_result,
+            )
+            await session.commit()
+        await publish_status(request_id, "done")
+        ANALYSES_TOTAL.labels("done").inc()
+        # Feeds queue ETAs (see src.jobs.admission); profiled timings are inflated
+        if profiler is None:
+            await record_stage_durations(stage_clock.durations())
 
-        # 8. Cache result
+        # 6. Cache result — a deadline-truncated report shouldn't stand in for
+        # a full one on later requests
+        if result.deadline_hit:
+            logger.info(f"[analysis:{request_id}] Done (partial) → {pdf_path}")
+            return metrics, pdf_path
+        if json_only and cached and os.path.exists(cached.get("pdf_path", "")):
+            # Don't replace a cached PDF (e.g. in another language) with a JSON-only entry
+            logger.info(f"[analysis:{request_id}] Done (JSON only)")
+            return metrics, pdf_path
         await set_cached_analysis(
             identifier,
-            analysis_id=request.id,
-            pdf_path=pdf_path,
+            analysis_id=request_id,
+            pdf_path=pdf_path or "",
             summary={
                 "channel_title": metrics.channel_title,
                 "channel_username": metrics.channel_username,
@@ -230,6 +364,7 @@ async def run_analysis(
                 "pct_video": metrics.content_mix.pct_video,
                 "pct_document": metrics.content_mix.pct_document,
                 "pct_other": metrics.content_mix.pct_other,
+                "metrics": metrics_to_dict(metrics),
                 "engagement": {
                     "median_views": metrics.engagement.median_views,
                     "virality_rate": metrics.engagement.virality_rate,
@@ -241,11 +376,148 @@ async def run_analysis(
             },
         )
 
-        logger.info(f"[analysis:{request.id}] Done → {pdf_path}")
+        logger.info(f"[analysis:{request_id}] Done → {pdf_path}")
         return metrics, pdf_path
 
     except Exception as e:
-        logger.error(f"[analysis:{request.id}] Failed: {e}")
-        await repo.set_request_failed(request.id, str(e))
-        await session.commit()
+        logger.error(f"[analysis:{request_id}] Failed: {e}")
+        failed = record_failure(e) if callable(record_failure) else record_failure
+        ANALYSES_TOTAL.labels("failed" if failed else "retried").inc()
+        await session.rollback()
+        if failed:
+            await repo.set_request_failed(request_id, str(e))
+            await session.commit()
+            await publish_status(request_id, "failed", message=str(e))
+        else:
+            await publish_status(request_id, "pending", stage="retrying", message=str(e))
         raise
+    finally:
+        ANALYSES_IN_PROGRESS.dec()
+        if profiler is not None:
+            _send_profile(profiler, identifier)
+
+
+def _send_profile(profiler: AnalysisProfiler, channel: str) -> None:
+    """
+    Write the profile and send its summary to the admin in the background.
+    Never raises: the analysis' own result or exception must come through,
+    without waiting on Telegram.
+    """
+    try:
+        text = format_summary(profiler.finish(channel))
+    except Exception as e:
+        logger.warning(f"[analysis:{profiler.analysis_id}] Could not write profile: {e}")
+        return
+    task = asyncio.get_running_loop().create_task(_notify_profile(profiler.analysis_id, text))
+    _notifications.add(task)
+    task.add_done_callback(_notifications.discard)
+
+
+async def _notify_profile(analysis_id: int, text: str) -> None:
+    try:
+        await notify_admin(text)
+    except Exception as e:
+        logger.warning(f"[analysis:{analysis_id}] Could not send profile summary: {e}")
+
+
+async def rebuild_report(session: AsyncSession, analysis_id: int, lang: str | None = None) -> str:
+    """
+    Re-render the PDF for a finished analysis from its stored metrics document.
+
+    No Telegram access is needed. Raises LookupError if no document is stored.
+    """
+    repo = AnalysisRepository(session)
+    result = await repo.get_result(analysis_id)
+    metrics = await repo.get_metrics(analysis_id)
+    if result is None or metrics is None:
+        raise LookupError(f"No stored metrics for analysis {analysis_id}")
+
+    lang = lang or result.report_lang
+    pdf_path = await asyncio.to_thread(
+        generate_pdf_report, metrics, analysis_id=analysis_id, lang=lang
+    )
+    await repo.set_report_path(analysis_id, pdf_path, lang)
+    await session.commit()
+    logger.info(f"[analysis:{analysis_id}] Report rebuilt from stored metrics → {pdf_path}")
+    return pdf_path
+
+
+async def wait_for_analysis(
+    request_id: int,
+    timeout: float,
+    on_event: Callable[[dict], Awaitable[None]] | None = None,
+    poll_interval: float = 2.0,
+) -> dict:
+    """
+    Wait for a queued analysis to reach a terminal status.
+
+    Follows the live status channel and forwards each event to ``on_event``;
+    the request row is polled as a fallback when Redis is quiet or down.
+
+    Returns:
+        The terminal event: {"status": "done" | "failed", "message": ...}.
+
+    Raises:
+        TimeoutError: if the analysis isn't finished within ``timeout`` seconds.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    async with subscribe_status(request_id) as sub:
+        while (remaining := deadline - loop.time()) > 0:
+            event = await sub.get(timeout=min(remaining, poll_interval))
+            if event is not None:
+                if on_event:
+                    await on_event(event)
+                if event["status"] in TERMINAL_STATUSES:
+                    return event
+                continue
+            async with async_session() as session:
+                request = await AnalysisRepository(session).get_request(request_id)
+            if request is not None and request.status in TERMINAL_STATUSES:
+                return {"status": request.status, "message": request.error_message}
+    raise TimeoutError(f"Analysis {request_id} not finished after {timeout}s")
+
+
+async def load_analysis_outcome(
+    session: AsyncSession, request_id: int, channel_input: str
+) -> tuple[AnalysisMetrics, str] | None:
+    """
+    Metrics and PDF path for a finished analysis.
+
+    A request served from cache has no result row of its own; its outcome is
+    the cached analysis'.
+    """
+    repo = AnalysisRepository(session)
+    result = await repo.get_result(request_id)
+    metrics = await repo.get_metrics(request_id) if result else None
+    if result is not None and metrics is not None and result.report_pdf_path:
+        return metrics, result.report_pdf_path
+
+    cached = await get_cached_analysis(parse_channel_identifier(channel_input))
+    if not cached or not cached.get("pdf_path"):
+        return None
+    if cached.get("metrics"):
+        return metrics_from_dict(cached["metrics"]), cached["pdf_path"]
+    metrics = await repo.get_metrics(cached["analysis_id"]) if cached.get("analysis_id") else None
+    return metrics or _metrics_from_cache(cached), cached["pdf_path"]
+
+
+async def find_metrics(
+    session: AsyncSession, request_id: int, channel_identifier: str
+) -> AnalysisMetrics | None:
+    """
+    Full metrics for a finished request — its own stored document, or for a
+    request answered from cache, the cached analysis' document.
+    """
+    repo = AnalysisRepository(session)
+    metrics = await repo.get_metrics(request_id)
+    if metrics is not None:
+        return metrics
+    cached = await get_cached_analysis(channel_identifier)
+    if not cached:
+        return None
+    if cached.get("metrics"):
+        return metrics_from_dict(cached["metrics"])
+    if cached.get("analysis_id"):
+        return await repo.get_metrics(cached["analysis_id"])
+    return None
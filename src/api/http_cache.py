@@ -0,0 +1,143 @@
+"""HTTP caching — validators, conditional GET and an in-process cache for
+finished analyses"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from collections import OrderedDict
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Generic, TypeVar
+
+from fastapi import Request, Response
+
+from src.config import settings
+from src.observability.prometheus import record_cache
+
+# Content-addressed responses (the ETag is a hash of every input) never change
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Finished analyses: their status body and PDF can still change under the same URL
+# when the report is rebuilt, so shared caches revalidate (by ETag) after a while
+FINISHED = "public, max-age=300, must-revalidate"
+# Still running — cacheable only if revalidated on every use
+REVALIDATE = "no-cache"
+
+V = TypeVar("V")
+
+
+# ── Validators ─────────────────────────────────────────────────────────────
+
+def strong_etag(data: bytes) -> str:
+    """Content-derived ETag: byte-identical bodies get identical tags."""
+    return f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+
+
+def file_etag(stat_result: os.stat_result) -> str:
+    """ETag for a file on disk from its size and mtime (no read needed)."""
+    raw = f"{stat_result.st_mtime_ns}-{stat_result.st_size}"
+    return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+
+def http_date(moment: datetime | float) -> str:
+    """IMF-fixdate for Last-Modified; accepts a datetime or a POSIX timestamp."""
+    if not isinstance(moment, datetime):
+        moment = datetime.fromtimestamp(moment, UTC)
+    elif moment.tzinfo is None:
+        moment = moment.replace(tzinfo=UTC)
+    return format_datetime(moment.astimezone(UTC), usegmt=True)
+
+
+def validator_headers(
+    etag: str, last_modified: str | None = None, cache_control: str = FINISHED
+) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: str | None = None) -> bool:
+    """
+    Whether a GET can be answered with 304 Not Modified.
+
+    If-None-Match wins when present (RFC 9110 §13.2.2); If-Modified-Since is
+    only consulted without it.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison — W/"x" matches "x"
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(
+                if_modified_since
+            )
+        except (TypeError, ValueError):
+            return False  # unparseable date — ignore the header
+    return False
+
+
+def not_modified(headers: dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+# ── In-process cache ───────────────────────────────────────────────────────
+
+class FinishedCache(Generic[V]):
+    """
+    Bounded LRU of per-analysis values that only change when a report is rebuilt.
+
+    Only put finished analyses here: nothing expires entries except LRU
+    eviction and explicit ``invalidate`` (called after a rebuild).
+    Each API process has its own copy.
+    """
+
+    def __init__(self, max_entries: int | None = None, tier: str | None = None):
+        self.max_entries = max_entries if max_entries is not None else settings.HTTP_CACHE_ENTRIES
+        self.tier = tier  # label for the cache hit/miss metric
+        self._entries: OrderedDict[int, V] = OrderedDict()
+
+    def get(self, analysis_id: int) -> V | None:
+        value = self._entries.get(analysis_id)
+        if value is not None:
+            self._entries.move_to_end(analysis_id)
+        if self.tier:
+            record_cache(self.tier, hit=value is not None)
+        return value
+
+    def put(self, analysis_id: int, value: V) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[analysis_id] = value
+        self._entries.move_to_end(analysis_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, analysis_id: int) -> None:
+        self._entries.pop(analysis_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Serialized GET /api/analysis/{id} bodies: (body, etag, last_modified)
+analysis_status_cache: FinishedCache[tuple[bytes, str, str | None]] = FinishedCache(
+    tier="http_status"
+)
+# Report PDF locations of done analyses, so downloads skip the DB
+report_path_cache: FinishedCache[str] = FinishedCache(tier="report_path")
+
+
+def invalidate_analysis(analysis_id: int) -> None:
+    """Forget cached responses for one analysis (its report was re-rendered)."""
+    analysis_status_cache.invalidate(analysis_id)
+    report_path_cache.invalidate(analysis_id)
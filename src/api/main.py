@@ -2,18 +2,29 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.analyzer.fetcher import disconnect_telethon_client
 from src.api.routes.analyze import router as analyze_router
+from src.api.routes.batch import router as batch_router
+from src.api.routes.channels import router as channels_router
+from src.api.routes.events import router as events_router
 from src.api.routes.reports import router as reports_router
 from src.cache import close_redis
 from src.config import settings
 from src.db.session import init_db
+from src.db.write_behind import request_log
+from src.jobs.queue import get_job_queue
+from src.jobs.worker import Worker
+from src.observability import tracing
+from src.observability.loop_watchdog import loop_watchdog
+from src.observability.prometheus import render_latest
+from src.reports.charts import shutdown_render_pool, start_render_pool
 
 logger = logging.getLogger(__name__)
 
@@ -21,11 +32,27 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Analyticbot API starting...")
+    tracing.configure("api")
+    loop_watchdog.start()
+    start_render_pool()
     await init_db()
+    request_log.start()
+
+    # Memory backend: no separate worker processes, run jobs in this process
+    worker = None
+    if settings.JOB_QUEUE_BACKEND != "redis":
+        worker = Worker(await get_job_queue())
+        worker.start()
+
     yield
     logger.info("Analyticbot API shutting down...")
+    if worker is not None:
+        await worker.stop()
+    await request_log.stop()  # drain buffered request records
     await disconnect_telethon_client()
     await close_redis()
+    await loop_watchdog.stop()
+    await asyncio.to_thread(shutdown_render_pool)
     logger.info("Cleanup complete.")
 
 
@@ -44,10 +71,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(tracing.TracingMiddleware)
+
 app.include_router(analyze_router, prefix="/api", tags=["Analysis"])
+app.include_router(batch_router, prefix="/api", tags=["Analysis"])
 app.include_router(reports_router, prefix="/api", tags=["Reports"])
+app.include_router(channels_router, prefix="/api", tags=["Channels"])
+app.include_router(events_router, prefix="/api", tags=["Analysis"])
 
 
 @app.get("/health")
 async def health():
     return {"status": "ok", "service": "analyticbot", "version": "2.0.0"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    body, content_type = render_latest()
+    return Response(body, media_type=content_type)
@@ -3,35 +3,64 @@
 from __future__ import annotations
 
 import logging
+import math
 from dataclasses import asdict
+from datetime import datetime
+from typing import Literal
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel, Field
 
 from src.analyzer.fetcher import parse_channel_identifier
-from src.analyzer.pipeline import run_analysis
-from src.api.security import rate_limit_check, require_api_key
+from src.analyzer.metrics import metrics_to_dict
+from src.analyzer.pipeline import find_metrics
+from src.api.http_cache import (
+    FINISHED,
+    REVALIDATE,
+    analysis_status_cache,
+    http_date,
+    is_not_modified,
+    not_modified,
+    strong_etag,
+    validator_headers,
+)
+from src.api.security import _get_client_ip, rate_limit_check, require_api_key
+from src.cache import get_live_status, publish_status
 from src.db.repository import AnalysisRepository
 from src.db.session import async_session
+from src.jobs.admission import QueueFullError, enqueue, ensure_capacity
+from src.jobs.queue import Job, get_job_queue
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+_JSON = "application/json"
+
 
 class AnalyzeRequest(BaseModel):
     channel: str = Field(..., description="Channel link, @username, or plain username")
     max_posts: int = Field(default=500, ge=10, le=2000)
+    priority: Literal["api", "batch"] = Field(
+        default="api", description="Use 'batch' for bulk submissions that can wait"
+    )
+    output: Literal["pdf", "json"] = Field(
+        default="pdf",
+        description="'json' skips chart and PDF rendering; read GET /api/analysis/{id}/metrics",
+    )
 
 
 class AnalyzeResponse(BaseModel):
     analysis_id: int
     status: str
     message: str
+    queue_position: int | None = None
+    eta_seconds: float | None = None
 
 
 class AnalysisResultResponse(BaseModel):
     analysis_id: int
     status: str
+    stage: str | None = None
     channel_title: str | None = None
     member_count: int | None = None
     total_posts: int | None = None
@@ -43,52 +72,140 @@ class AnalysisResultResponse(BaseModel):
     error_message: str | None = None
 
 
-async def _run_in_background(channel: str, request_id: int, max_posts: int) -> None:
-    """Background task that runs the full analysis pipeline."""
-    try:
-        async with async_session() as session:
-            await run_analysis(channel, session=session, source="web", max_posts=max_posts)
-    except Exception as e:
-        logger.error(f"Background analysis {request_id} failed: {e}", exc_info=True)
+class AnalysisMetricsResponse(BaseModel):
+    analysis_id: int
+    metrics: dict  # full AnalysisMetrics (see src.analyzer.metrics.metrics_to_dict)
+
+
+class AnalysisListItem(BaseModel):
+    analysis_id: int
+    channel_identifier: str
+    channel_title: str | None = None
+    status: str
+    source: str
+    created_at: datetime
+    completed_at: datetime | None = None
+
+
+class AnalysisListResponse(BaseModel):
+    items: list[AnalysisListItem]
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class QueueClassStats(BaseModel):
+    priority: str
+    depth: int
+    tenants: int
+    oldest_wait_seconds: float
+    avg_wait_seconds: float | None = None
+
+
+class QueueStatsResponse(BaseModel):
+    queues: list[QueueClassStats]
 
 
 @router.post("/analyze", response_model=AnalyzeResponse)
 async def submit_analysis(
     body: AnalyzeRequest,
-    background_tasks: BackgroundTasks,
+    request: Request,
     _key: str = Depends(require_api_key),
     _rate: None = Depends(rate_limit_check),
 ):
     """
     Submit a channel for analysis.
 
-    Returns immediately with an analysis_id. Check status via GET /api/analysis/{id}.
+    Returns immediately with an analysis_id and an estimated queue position.
+    Stream progress via GET /api/analysis/{id}/events (SSE) or /api/analysis/{id}/ws,
+    or poll GET /api/analysis/{id}. Answers 503 with Retry-After when the queue is full.
     """
     try:
         username = parse_channel_identifier(body.channel)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid channel link or username")
 
+    queue = await get_job_queue()
+    try:
+        await ensure_capacity(queue)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Analysis queue is full, please retry later",
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+
     # Create a pending request
     async with async_session() as session:
         repo = AnalysisRepository(session)
-        request = await repo.create_request(username, source="web")
+        row = await repo.create_request(username, source="web")
         await session.commit()
-        request_id = request.id
+        request_id = row.id
+
+    await publish_status(request_id, "pending", stage="queued")
 
-    # Run analysis in background
-    background_tasks.add_task(_run_in_background, body.channel, request_id, body.max_posts)
+    # Hand off to the job queue (worker processes, or in-process for the memory backend)
+    placed = await enqueue(
+        queue,
+        Job(
+            kind="analysis",
+            payload={
+                "channel": body.channel,
+                "request_id": request_id,
+                "max_posts": body.max_posts,
+                "source": "web",
+                "output": body.output,
+            },
+            priority=body.priority,
+            # Fair share per client, so one bulk submitter can't starve the others
+            tenant=f"ip:{_get_client_ip(request)}",
+        ),
+    )
 
     return AnalyzeResponse(
         analysis_id=request_id,
         status="pending",
-        message=f"Analysis for @{username} has been queued. Poll GET /api/analysis/{request_id} for results.",
+        message=(
+            f"Analysis for @{username} has been queued. Follow "
+            f"GET /api/analysis/{request_id}/events (SSE) or poll "
+            f"GET /api/analysis/{request_id} for results."
+        ),
+        queue_position=placed.position,
+        eta_seconds=round(placed.eta_seconds, 1),
     )
 
 
 @router.get("/analysis/{analysis_id}", response_model=AnalysisResultResponse)
-async def get_analysis(analysis_id: int):
-    """Get the status and results of an analysis."""
+async def get_analysis(analysis_id: int, request: Request):
+    """
+    Get the status and results of an analysis.
+
+    Finished analyses carry ETag and Last-Modified and answer conditional
+    requests with 304; done ones are served from memory and may be cached
+    for a few minutes before revalidating (a rebuilt report changes them).
+    """
+    cached = analysis_status_cache.get(analysis_id)
+    cache_control = FINISHED
+    if cached is None:
+        response, completed_at = await _load_analysis_status(analysis_id)
+        body = response.model_dump_json().encode()
+        if response.status not in ("done", "failed"):
+            return Response(body, media_type=_JSON, headers={"Cache-Control": REVALIDATE})
+        cached = (body, strong_etag(body), http_date(completed_at) if completed_at else None)
+        if response.status == "done":
+            analysis_status_cache.put(analysis_id, cached)
+        else:
+            cache_control = REVALIDATE  # final too, but shouldn't stick in shared caches
+
+    body, etag, last_modified = cached
+    headers = validator_headers(etag, last_modified, cache_control)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(headers)
+    return Response(body, media_type=_JSON, headers=headers)
+
+
+async def _load_analysis_status(
+    analysis_id: int,
+) -> tuple[AnalysisResultResponse, datetime | None]:
     async with async_session() as session:
         repo = AnalysisRepository(session)
         request = await repo.get_request(analysis_id)
@@ -103,6 +220,13 @@ async def get_analysis(analysis_id: int):
             error_message=request.error_message,
         )
 
+        if request.status == "pending":
+            # Intermediate stages live in Redis, not the DB
+            live = await get_live_status(analysis_id)
+            if live:
+                response.status = live["status"]
+                response.stage = live.get("stage")
+
         if request.status == "done":
             result = await repo.get_result(analysis_id)
             if result:
@@ -114,4 +238,86 @@ async def get_analysis(analysis_id: int):
                 response.avg_posts_per_day = result.avg_posts_per_day
                 response.report_pdf_path = result.report_pdf_path
 
-        return response
+        return response, request.completed_at
+
+
+@router.get("/analysis/{analysis_id}/metrics", response_model=AnalysisMetricsResponse)
+async def get_analysis_metrics(analysis_id: int):
+    """The complete metrics document of a finished analysis (no PDF involved)."""
+    async with async_session() as session:
+        request = await AnalysisRepository(session).get_request(analysis_id)
+        if not request:
+            raise HTTPException(status_code=404, detail="Analysis not found")
+        if request.status != "done":
+            raise HTTPException(
+                status_code=409, detail=f"Analysis is {request.status}, metrics not available yet"
+            )
+        metrics = await find_metrics(session, analysis_id, request.channel_identifier)
+
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="No stored metrics for this analysis")
+    return AnalysisMetricsResponse(analysis_id=analysis_id, metrics=metrics_to_dict(metrics))
+
+
+@router.get("/analyses", response_model=AnalysisListResponse)
+async def list_analyses(
+    requested_by: int | None = None,
+    source: str | None = None,
+    cursor: str | None = None,
+    direction: Literal["next", "prev"] = "next",
+    limit: int = Query(default=20, ge=1, le=100),
+    _key: str = Depends(require_api_key),
+):
+    """
+    List analyses newest first, keyset-paginated.
+
+    Pass ``next_cursor`` back as ``cursor`` for older entries, or
+    ``prev_cursor`` with ``direction=prev`` for newer ones.
+    """
+    async with async_session() as session:
+        repo = AnalysisRepository(session)
+        try:
+            page = await repo.list_analyses(
+                requested_by=requested_by,
+                source=source,
+                cursor=cursor,
+                direction=direction,
+                limit=limit,
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return AnalysisListResponse(
+        items=[
+            AnalysisListItem(
+                analysis_id=a.id,
+                channel_identifier=a.channel_identifier,
+                channel_title=a.channel_title,
+                status=a.status,
+                source=a.source,
+                created_at=a.created_at,
+                completed_at=a.completed_at,
+            )
+            for a in page.items
+        ],
+        next_cursor=page.next_cursor,
+        prev_cursor=page.prev_cursor,
+    )
+
+
+@router.get("/queue", response_model=QueueStatsResponse)
+async def get_queue_stats(_key: str = Depends(require_api_key)):
+    """Depth and wait time of each priority class in the analysis job queue."""
+    queue = await get_job_queue()
+    return QueueStatsResponse(
+        queues=[
+            QueueClassStats(
+                priority=s.priority,
+                depth=s.depth,
+                tenants=s.tenants,
+                oldest_wait_seconds=round(s.oldest_wait, 3),
+                avg_wait_seconds=None if s.avg_wait is None else round(s.avg_wait, 3),
+            )
+            for s in await queue.stats()
+        ]
+    )
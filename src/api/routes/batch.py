@@ -0,0 +1,345 @@
+"""API route: analyze many channels in one request"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import logging
+import math
+import os
+import tempfile
+import zipfile
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+
+from src.analyzer.fetcher import parse_channel_identifier
+from src.analyzer.metrics import AnalysisMetrics
+from src.analyzer.pipeline import load_analysis_outcome, rebuild_report
+from src.api.http_cache import invalidate_analysis
+from src.api.security import _get_client_ip, rate_limit_check, require_api_key
+from src.cache import get_cached_analyses, publish_status
+from src.config import settings
+from src.db.models import AnalysisBatchItem, AnalysisRequest, AnalysisResult
+from src.db.repository import AnalysisRepository
+from src.db.session import async_session
+from src.db.write_behind import request_log
+from src.jobs.admission import QueueFullError, enqueue, ensure_capacity
+from src.jobs.queue import Job, get_job_queue
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Every uncached channel becomes a queued job, so a batch can't be larger than
+# the wait queue (ANALYSIS_QUEUE_LIMIT) — it would be turned away whatever the load
+_MAX_BATCH_CHANNELS = min(500, settings.ANALYSIS_QUEUE_LIMIT or 500)
+
+
+class BatchAnalyzeRequest(BaseModel):
+    channels: list[str] = Field(..., min_length=1, max_length=_MAX_BATCH_CHANNELS)
+    max_posts: int = Field(default=500, ge=10, le=2000)
+    priority: Literal["api", "batch"] = "batch"
+
+
+class BatchItemStatus(BaseModel):
+    channel: str
+    analysis_id: int | None = None  # where the result lives (GET /api/analysis/{id})
+    status: str
+    cached: bool = False
+    error_message: str | None = None
+
+
+class BatchStatusResponse(BaseModel):
+    batch_id: int
+    status: str  # "pending" until every item is done or failed, then "done"
+    total: int
+    counts: dict[str, int]
+    created_at: datetime | None = None
+    items: list[BatchItemStatus]
+
+
+def _item_status(item: AnalysisBatchItem, request: AnalysisRequest | None) -> BatchItemStatus:
+    if item.cached:
+        status, error = "done", None
+    elif item.request_id is None:
+        status, error = "failed", item.error_message
+    else:
+        status = request.status if request else "pending"
+        error = request.error_message if request else None
+    return BatchItemStatus(
+        channel=item.channel_identifier,
+        analysis_id=item.result_id,
+        status=status,
+        cached=bool(item.cached),
+        error_message=error,
+    )
+
+
+def _batch_response(batch, rows) -> BatchStatusResponse:
+    items = [_item_status(item, request) for item, request in rows]
+    counts: dict[str, int] = {}
+    for item in items:
+        counts[item.status] = counts.get(item.status, 0) + 1
+    finished = all(i.status in ("done", "failed") for i in items)
+    return BatchStatusResponse(
+        batch_id=batch.id,
+        status="done" if finished else "pending",
+        total=len(items),
+        counts=counts,
+        created_at=batch.created_at,
+        items=items,
+    )
+
+
+def _with_report(cached: dict[str, dict]) -> set[str]:
+    """Blocking: the cached channels whose report is still on disk."""
+    return {
+        username
+        for username, hit in cached.items()
+        if hit.get("analysis_id") and os.path.exists(hit.get("pdf_path", ""))
+    }
+
+
+@router.post("/analyze/batch", response_model=BatchStatusResponse)
+async def submit_batch(
+    body: BatchAnalyzeRequest,
+    request: Request,
+    _key: str = Depends(require_api_key),
+    _rate: None = Depends(rate_limit_check),
+):
+    """
+    Submit many channels at once.
+
+    Duplicates are collapsed, channels with a fresh cached report are answered
+    from cache, and the rest are queued (priority "batch" by default) so they
+    share workers and Telethon capacity fairly with other clients. Invalid
+    entries are reported per item. Answers 503 with Retry-After if the queue
+    can't take the batch.
+    """
+    items: list[AnalysisBatchItem] = []
+    new: dict[str, tuple[str, AnalysisBatchItem]] = {}  # lowercased → (as submitted, item)
+    for raw in body.channels:
+        try:
+            username = parse_channel_identifier(raw)
+        except ValueError:
+            items.append(
+                AnalysisBatchItem(
+                    channel_identifier=raw.strip()[:255],
+                    error_message="Invalid channel link or username",
+                )
+            )
+            continue
+        if username.lower() in new:
+            continue
+        item = AnalysisBatchItem(channel_identifier=username)
+        items.append(item)
+        new[username.lower()] = (raw, item)
+
+    # One MGET for the whole batch, and the report files checked off the loop
+    cached = await get_cached_analyses(list(new))
+    with_report = await asyncio.to_thread(_with_report, cached)
+    to_queue: list[tuple[str, AnalysisBatchItem]] = []
+    cache_hits: list[tuple[str, dict]] = []
+    for key, (raw, item) in new.items():
+        if key in with_report:
+            item.result_id, item.cached = cached[key]["analysis_id"], True
+            cache_hits.append((item.channel_identifier, cached[key]))
+        else:
+            to_queue.append((raw, item))
+
+    queue = await get_job_queue()
+    limit = settings.ANALYSIS_QUEUE_LIMIT
+    if limit and len(to_queue) > limit:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch needs {len(to_queue)} new analyses; the queue holds at most {limit}",
+        )
+    try:
+        await ensure_capacity(queue, incoming=len(to_queue))
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Analysis queue is full, please retry later",
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+
+    async with async_session() as session:
+        repo = AnalysisRepository(session)
+        for _, item in to_queue:
+            row = await repo.create_request(item.channel_identifier, source="web")
+            item.request_id = item.result_id = row.id
+        batch = await repo.create_batch(items)
+        await session.commit()
+        await session.refresh(batch, ["created_at"])
+        rows = [(item, None) for item in items]
+        response = _batch_response(batch, rows)
+
+    # Only now that the batch is admitted — a rejected one, or its retries, log nothing
+    for username, hit in cache_hits:
+        request_log.record(username, source="web", channel_title=hit.get("channel_title"))
+
+    tenant = f"ip:{_get_client_ip(request)}"
+    for raw, item in to_queue:
+        await publish_status(item.request_id, "pending", stage="queued")
+        await enqueue(
+            queue,
+            Job(
+                kind="analysis",
+                payload={
+                    "channel": raw,
+                    "request_id": item.request_id,
+                    "max_posts": body.max_posts,
+                    "source": "web",
+                },
+                priority=body.priority,
+                tenant=tenant,
+            ),
+        )
+
+    logger.info(
+        f"[batch:{batch.id}] {len(items)} channels: {len(to_queue)} queued, "
+        f"{sum(i.cached for i in items)} cached"
+    )
+    return response
+
+
+@router.get("/analyze/batch/{batch_id}", response_model=BatchStatusResponse)
+async def get_batch(batch_id: int, _key: str = Depends(require_api_key)):
+    """Aggregated status of a batch, with per-channel status."""
+    async with async_session() as session:
+        repo = AnalysisRepository(session)
+        batch = await repo.get_batch(batch_id)
+        if not batch:
+            raise HTTPException(status_code=404, detail="Batch not found")
+        return _batch_response(batch, await repo.get_batch_items(batch_id))
+
+
+_SUMMARY_FIELDS = [
+    "channel",
+    "status",
+    "analysis_id",
+    "cached",
+    "member_count",
+    "total_posts",
+    "total_views",
+    "avg_views",
+    "avg_engagement_rate",
+    "avg_posts_per_day",
+    "error_message",
+]
+
+
+def _write_zip(path: str, reports: list[tuple[str, str]], summary: list[dict]) -> None:
+    """Blocking: write every PDF plus summary.csv into a zip at ``path``."""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=_SUMMARY_FIELDS)
+    writer.writeheader()
+    writer.writerows(summary)
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("summary.csv", buf.getvalue())
+        for name, pdf_path in reports:
+            zf.write(pdf_path, arcname=name)
+
+
+def _summary_row(
+    status: BatchItemStatus,
+    result: AnalysisResult | None,
+    metrics: AnalysisMetrics | None = None,
+) -> dict:
+    row = {
+        "channel": status.channel,
+        "status": status.status,
+        "analysis_id": status.analysis_id,
+        "cached": status.cached,
+        "error_message": status.error_message,
+    }
+    if result is not None:
+        row.update(
+            member_count=result.member_count,
+            total_posts=result.total_posts,
+            total_views=result.total_views,
+            avg_views=round(result.avg_views, 1),
+            avg_engagement_rate=round(result.avg_engagement_rate, 2),
+            avg_posts_per_day=round(result.avg_posts_per_day, 2),
+        )
+    elif metrics is not None:
+        row.update(
+            member_count=metrics.member_count,
+            total_posts=metrics.total_posts,
+            total_views=metrics.total_views,
+            avg_views=round(metrics.avg_views, 1),
+            avg_engagement_rate=round(metrics.avg_engagement_rate, 2),
+            avg_posts_per_day=round(metrics.posting_pattern.avg_posts_per_day, 2),
+        )
+    return row
+
+
+async def _batch_reports(
+    session: AsyncSession, batch_id: int, statuses: list[BatchItemStatus]
+) -> tuple[list[tuple[str, str]], list[dict]]:
+    """(zip name, PDF path) of every finished report, and a summary row per item."""
+    repo = AnalysisRepository(session)
+    done_ids = [s.analysis_id for s in statuses if s.status == "done" and s.analysis_id]
+    results = await repo.get_results(done_ids) if done_ids else {}
+
+    reports: list[tuple[str, str]] = []
+    summary: list[dict] = []
+    for status in statuses:
+        if status.status != "done":
+            summary.append(_summary_row(status, None))
+            continue
+        result = results.get(status.analysis_id)
+        if result is None:
+            # The worker answered it from cache: no result row under its own id
+            outcome = await load_analysis_outcome(session, status.analysis_id, status.channel)
+            metrics, pdf_path = outcome or (None, None)
+            summary.append(_summary_row(status, None, metrics))
+            if pdf_path and os.path.exists(pdf_path):
+                reports.append((f"{status.channel}.pdf", pdf_path))
+            else:
+                logger.warning(f"[batch:{batch_id}] No report for {status.channel}")
+            continue
+        summary.append(_summary_row(status, result))
+        if not result.report_pdf_path:
+            continue
+        pdf_path = result.report_pdf_path
+        if not os.path.exists(pdf_path):
+            try:
+                pdf_path = await rebuild_report(session, result.analysis_id)
+            except LookupError:
+                logger.warning(f"[batch:{batch_id}] No report for {status.channel}")
+                continue
+            invalidate_analysis(result.analysis_id)
+        reports.append((f"{status.channel}.pdf", pdf_path))
+    return reports, summary
+
+
+@router.get("/analyze/batch/{batch_id}/download")
+async def download_batch(batch_id: int, _key: str = Depends(require_api_key)):
+    """
+    Every finished report of a batch as one zip, with a summary.csv row per
+    channel. Items still running are listed in the summary without a PDF.
+    """
+    async with async_session() as session:
+        repo = AnalysisRepository(session)
+        batch = await repo.get_batch(batch_id)
+        if not batch:
+            raise HTTPException(status_code=404, detail="Batch not found")
+        statuses = _batch_response(batch, await repo.get_batch_items(batch_id)).items
+        reports, summary = await _batch_reports(session, batch_id, statuses)
+
+    fd, zip_path = tempfile.mkstemp(prefix=f"batch_{batch_id}_", suffix=".zip")
+    os.close(fd)
+    await asyncio.to_thread(_write_zip, zip_path, reports, summary)
+    return FileResponse(
+        zip_path,
+        media_type="application/zip",
+        filename=f"analytics_batch_{batch_id}.zip",
+        background=BackgroundTask(os.unlink, zip_path),
+    )
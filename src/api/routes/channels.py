@@ -0,0 +1,61 @@
+"""API route: per-channel history from the daily rollup"""
+
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, timedelta
+
+from fastapi import APIRouter, Query
+from pydantic import BaseModel
+
+from src.db.repository import AnalysisRepository
+from src.db.session import async_session
+
+router = APIRouter()
+
+
+class DailyStatsItem(BaseModel):
+    day: date
+    posts: int
+    views: int
+    forwards: int
+    reactions: int
+    replies: int
+
+
+class DailyStatsResponse(BaseModel):
+    channel_id: int
+    date_from: date
+    date_to: date
+    days: list[DailyStatsItem]
+
+
+@router.get("/channels/{channel_id}/daily", response_model=DailyStatsResponse)
+async def get_channel_daily(
+    channel_id: int,
+    days: int = Query(default=30, ge=1, le=365),
+    date_to: date | None = None,
+):
+    """Daily views/posts/forwards/reactions/replies for a channel, oldest first."""
+    end = date_to or datetime.now(UTC).date()
+    start = end - timedelta(days=days - 1)
+
+    async with async_session() as session:
+        repo = AnalysisRepository(session)
+        rows = await repo.get_daily_stats(channel_id, start, end)
+
+    return DailyStatsResponse(
+        channel_id=channel_id,
+        date_from=start,
+        date_to=end,
+        days=[
+            DailyStatsItem(
+                day=r.day,
+                posts=r.posts,
+                views=r.views,
+                forwards=r.forwards,
+                reactions=r.reactions,
+                replies=r.replies,
+            )
+            for r in rows
+        ],
+    )
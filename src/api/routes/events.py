@@ -0,0 +1,102 @@
+"""API route: push analysis progress (SSE and WebSocket) instead of polling"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from src.cache import TERMINAL_STATUSES, get_live_status, subscribe_status
+from src.db.repository import AnalysisRepository
+from src.db.session import async_session
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+_KEEPALIVE_SECONDS = 15.0
+
+
+async def _get_request_status(analysis_id: int) -> str | None:
+    """Single DB read per stream — later transitions arrive over pub/sub."""
+    async with async_session() as session:
+        repo = AnalysisRepository(session)
+        request = await repo.get_request(analysis_id)
+    return request.status if request else None
+
+
+def _status_event(analysis_id: int, status: str | None) -> dict:
+    return {"analysis_id": analysis_id, "status": status, "stage": None, "message": None}
+
+
+async def _current_event(analysis_id: int, db_status: str) -> dict:
+    if db_status in TERMINAL_STATUSES:
+        return _status_event(analysis_id, db_status)
+    return await get_live_status(analysis_id) or _status_event(analysis_id, db_status)
+
+
+async def _status_events(analysis_id: int, db_status: str) -> AsyncIterator[dict | None]:
+    """
+    Yield the current status, then every transition until a terminal one.
+
+    Yields None when nothing happened for a keepalive interval.
+    """
+    async with subscribe_status(analysis_id) as sub:
+        event = await _current_event(analysis_id, db_status)
+        yield event
+        while event["status"] not in TERMINAL_STATUSES:
+            event = await sub.get(timeout=_KEEPALIVE_SECONDS)
+            if event is None:
+                # Covers a missed publish (e.g. Redis restart) — re-check the snapshot,
+                # falling back to the DB only when Redis has nothing
+                event = await get_live_status(analysis_id)
+                if event is None:
+                    event = _status_event(analysis_id, await _get_request_status(analysis_id))
+                if event["status"] not in TERMINAL_STATUSES:
+                    yield None
+                    continue
+            yield event
+
+
+@router.get("/analysis/{analysis_id}/events")
+async def analysis_events(analysis_id: int, request: Request):
+    """Server-sent events stream of stage transitions; closes after done/failed."""
+    db_status = await _get_request_status(analysis_id)
+    if db_status is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    async def stream():
+        async for event in _status_events(analysis_id, db_status):
+            if await request.is_disconnected():
+                return
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: status\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/analysis/{analysis_id}/ws")
+async def analysis_ws(websocket: WebSocket, analysis_id: int):
+    """WebSocket equivalent of the SSE stream — one JSON message per transition."""
+    await websocket.accept()
+    db_status = await _get_request_status(analysis_id)
+    if db_status is None:
+        await websocket.close(code=4404, reason="Analysis not found")
+        return
+
+    try:
+        async for event in _status_events(analysis_id, db_status):
+            if event is None:
+                continue
+            await websocket.send_json(event)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
@@ -1,33 +1,179 @@
-"""API route: download generated reports"""
+"""API routes: download generated reports and individual charts"""
 
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
+from pathlib import Path
+from typing import Literal
+from urllib.parse import quote
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from fastapi.responses import FileResponse
 
+from src.analyzer.pipeline import rebuild_report
+from src.api.http_cache import (
+    FINISHED,
+    IMMUTABLE,
+    file_etag,
+    http_date,
+    invalidate_analysis,
+    is_not_modified,
+    not_modified,
+    report_path_cache,
+    validator_headers,
+)
+from src.cache import get_cached_analysis
+from src.config import settings
 from src.db.repository import AnalysisRepository
 from src.db.session import async_session
+from src.reports.chart_cache import chart_cache_key, get_or_render_chart
+from src.reports.charts import CHART_FORMATS, CHART_GENERATORS
+from src.reports.pdf import REPORTS_DIR
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.get("/reports/{analysis_id}/pdf")
-async def download_report(analysis_id: int):
-    """Download the PDF report for a completed analysis."""
+async def _report_path(analysis_id: int) -> str:
+    """Location of the report PDF, rebuilding it if needed (DB only on a cache miss)."""
+    pdf_path = report_path_cache.get(analysis_id)
+    if pdf_path and os.path.exists(pdf_path):
+        return pdf_path
+
     async with async_session() as session:
         repo = AnalysisRepository(session)
         result = await repo.get_result(analysis_id)
 
-    if not result or not result.report_pdf_path:
-        raise HTTPException(status_code=404, detail="Report not found or analysis not complete")
+        if not result:
+            raise HTTPException(status_code=404, detail="Report not found or analysis not complete")
+
+        pdf_path = result.report_pdf_path
+        if not pdf_path or not os.path.exists(pdf_path):
+            # JSON-only run or lost file — render from the stored metrics document
+            # (no Telegram fetch)
+            try:
+                pdf_path = await rebuild_report(session, analysis_id)
+            except LookupError:
+                raise HTTPException(status_code=404, detail="Report file not found on disk")
+            invalidate_analysis(analysis_id)  # the cached status shows the old path
+
+    report_path_cache.put(analysis_id, pdf_path)
+    return pdf_path
+
 
-    if not os.path.exists(result.report_pdf_path):
+@router.get("/reports/{analysis_id}/pdf")
+async def download_report(analysis_id: int, request: Request):
+    """
+    Download the PDF report for a completed analysis.
+
+    Carries ETag / Last-Modified from the file and answers conditional
+    requests with 304.
+    """
+    pdf_path = await _report_path(analysis_id)
+    try:
+        stat_result = os.stat(pdf_path)
+    except FileNotFoundError:
+        # Removed between the lookup and now — the next request rebuilds it
+        report_path_cache.invalidate(analysis_id)
         raise HTTPException(status_code=404, detail="Report file not found on disk")
 
+    etag, last_modified = file_etag(stat_result), http_date(stat_result.st_mtime)
+    # Not immutable: a rebuilt report has other bytes under the same URL
+    headers = validator_headers(etag, last_modified, cache_control=FINISHED)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(headers)
+
+    filename = f"analytics_report_{analysis_id}.pdf"
+    offloaded = _offload_response(pdf_path, "application/pdf", filename, headers)
+    if offloaded is not None:
+        return offloaded
+    # Honors Range / If-Range (resumable downloads), and sends via the server's
+    # pathsend extension — zero-copy — when the ASGI server provides it
     return FileResponse(
-        result.report_pdf_path,
+        pdf_path,
         media_type="application/pdf",
-        filename=f"analytics_report_{analysis_id}.pdf",
+        filename=filename,
+        headers=headers,
+        stat_result=stat_result,
     )
+
+
+def _offload_response(
+    path: str, media_type: str, filename: str, headers: dict[str, str]
+) -> Response | None:
+    """
+    Empty response telling the reverse proxy to send ``path`` itself
+    (REPORT_OFFLOAD), or None to serve it from Python.
+
+    The proxy then does ranges and sendfile, and slow clients hold a proxy
+    connection instead of an API worker.
+    """
+    mode = settings.REPORT_OFFLOAD
+    if not mode:
+        return None
+    headers = {
+        **headers,
+        "Content-Disposition": f"attachment; filename=\"{filename}\"",
+    }
+    if mode == "x-sendfile":
+        headers["X-Sendfile"] = str(Path(path).resolve())
+    elif mode == "x-accel":
+        try:
+            relative = Path(path).resolve().relative_to(REPORTS_DIR.resolve())
+        except ValueError:
+            logger.warning(f"{path} is outside REPORTS_DIR — serving it directly")
+            return None
+        prefix = settings.REPORT_OFFLOAD_PREFIX.rstrip("/")
+        headers["X-Accel-Redirect"] = f"{prefix}/{quote(relative.as_posix())}"
+    else:
+        logger.warning(f"Unknown REPORT_OFFLOAD={mode!r} — serving the file directly")
+        return None
+    return Response(media_type=media_type, headers=headers)
+
+
+@router.get("/analysis/{analysis_id}/charts/{name}.{fmt}")
+async def get_chart(
+    analysis_id: int,
+    name: str,
+    fmt: Literal["png", "svg"],
+    request: Request,
+    lang: Literal["en", "ru", "uz"] | None = None,
+    width: int | None = Query(default=None, ge=200, le=3000, description="PNG width in pixels"),
+):
+    """
+    One chart of a finished analysis, rendered on demand from its stored
+    metrics and cached by content. Honors If-None-Match.
+    """
+    if name not in CHART_GENERATORS:
+        raise HTTPException(status_code=404, detail=f"Unknown chart {name!r}")
+
+    async with async_session() as session:
+        repo = AnalysisRepository(session)
+        stored = await repo.get_metrics_doc(analysis_id)
+        if stored is None:
+            # Requests answered from cache share the earlier analysis' document
+            request_row = await repo.get_request(analysis_id)
+            cached = (
+                await get_cached_analysis(request_row.channel_identifier)
+                if request_row and request_row.status == "done"
+                else None
+            )
+            if cached and cached.get("analysis_id"):
+                stored = await repo.get_metrics_doc(cached["analysis_id"])
+    if stored is None:
+        raise HTTPException(status_code=404, detail="No stored metrics for this analysis")
+
+    metrics_doc, report_lang = stored
+    lang = lang or report_lang
+    # Content-addressed: the tag is known without rendering anything
+    etag = f'"{chart_cache_key(metrics_doc, name, lang, fmt, width)}"'
+    headers = validator_headers(etag, cache_control=IMMUTABLE)
+    if is_not_modified(request, etag):
+        return not_modified(headers)
+
+    _, data = await asyncio.to_thread(get_or_render_chart, metrics_doc, name, lang, fmt, width)
+    if not data:
+        raise HTTPException(status_code=404, detail="Not enough data for this chart")
+    return Response(content=data, media_type=CHART_FORMATS[fmt], headers=headers)
@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
+import logging
+import math
 import time
-from collections import defaultdict
+from collections import OrderedDict
+from dataclasses import dataclass
 
 from fastapi import HTTPException, Request, Security
 from fastapi.security import APIKeyHeader
 
+from src.cache import get_redis
 from src.config import settings
 
+logger = logging.getLogger(__name__)
+
 # ── API Key auth ───────────────────────────────────────────────────────────
 _api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
@@ -24,8 +30,43 @@ async def require_api_key(api_key: str | None = Security(_api_key_header)) -> st
     return api_key
 
 
-# ── Simple in-memory rate limiter ──────────────────────────────────────────
-_buckets: dict[str, list[float]] = defaultdict(list)
+# ── Rate limiter ───────────────────────────────────────────────────────────
+# Sliding-window counter: each client keeps a count for the current and the
+# previous fixed window, and the previous one is weighted by how much of it
+# still overlaps the sliding window. O(1) time and memory per client.
+
+_WINDOW_SECONDS = 60.0
+
+
+@dataclass(slots=True)
+class _Window:
+    index: int  # which fixed window ``current`` counts (now // window)
+    current: int = 0
+    previous: int = 0
+
+
+# In-process counters, least recently seen client first; bounded by
+# RATE_LIMIT_MAX_KEYS so an IP-spray can't grow memory
+_buckets: OrderedDict[str, _Window] = OrderedDict()
+_MAX_KEYS = settings.RATE_LIMIT_MAX_KEYS
+
+# KEYS: counter of the current window, counter of the previous window
+# ARGV: limit, weight of the previous window, counter TTL in seconds
+# Returns {allowed (0/1), current, previous}
+_RATE_LIMIT_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[2]) + current >= tonumber(ARGV[1]) then
+    return {0, current, previous}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return {1, current, previous}
+"""
+_rate_script = None  # (client, registered script)
+_redis_down = False  # limiting in-process until Redis answers again; logged on each change
 
 
 def _get_client_ip(request: Request) -> str:
@@ -35,19 +76,77 @@ def _get_client_ip(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
+def _retry_after(current: int, previous: int, limit: int, elapsed: float, window: float) -> float:
+    """Seconds until the sliding estimate drops below ``limit`` again."""
+    if current >= limit or previous <= 0:
+        return window - elapsed  # only the next window helps
+    # previous * (1 - (elapsed + t) / window) + current < limit
+    return max(window * (1 - (limit - current) / previous) - elapsed, 0.0) + 0.001
+
+
+def _memory_hit(key: str, limit: int, now: float, window: float = _WINDOW_SECONDS) -> float:
+    """Count one request in-process. Returns 0 if allowed, else seconds to wait."""
+    index = int(now // window)
+    entry = _buckets.get(key)
+    if entry is None:
+        entry = _buckets[key] = _Window(index=index)
+        while len(_buckets) > _MAX_KEYS:
+            _buckets.popitem(last=False)
+    else:
+        _buckets.move_to_end(key)
+        if entry.index != index:
+            entry.previous = entry.current if entry.index == index - 1 else 0
+            entry.current, entry.index = 0, index
+
+    elapsed = now - index * window
+    if entry.previous * (1 - elapsed / window) + entry.current >= limit:
+        return _retry_after(entry.current, entry.previous, limit, elapsed, window)
+    entry.current += 1
+    return 0.0
+
+
+async def _redis_hit(key: str, limit: int, now: float, window: float = _WINDOW_SECONDS) -> float:
+    """Count one request in Redis (atomic, shared by all workers). Same contract."""
+    global _rate_script
+    r = await get_redis()
+    if _rate_script is None or _rate_script[0] is not r:
+        _rate_script = (r, r.register_script(_RATE_LIMIT_SCRIPT))
+    index = int(now // window)
+    elapsed = now - index * window
+    # Hash tag keeps both windows of a client in one cluster slot
+    allowed, current, previous = await _rate_script[1](
+        keys=[f"ratelimit:{{{key}}}:{index}", f"ratelimit:{{{key}}}:{index - 1}"],
+        args=[limit, 1 - elapsed / window, int(window * 2)],
+    )
+    if allowed:
+        return 0.0
+    return _retry_after(int(current), int(previous), limit, elapsed, window)
+
+
 async def rate_limit_check(request: Request) -> None:
     """FastAPI dependency — enforces per-IP rate limiting on mutating endpoints."""
     client_ip = _get_client_ip(request)
-    now = time.monotonic()
-    window = 60.0  # 1 minute window
     max_requests = settings.RATE_LIMIT_PER_MINUTE
 
-    # Prune old entries
-    _buckets[client_ip] = [t for t in _buckets[client_ip] if now - t < window]
+    global _redis_down
+    wait = None
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        try:
+            wait = await _redis_hit(client_ip, max_requests, time.time())
+        except Exception as e:
+            if not _redis_down:
+                logger.warning(f"Redis rate limit error, limiting in-process (non-fatal): {e}")
+            _redis_down = True
+        else:
+            if _redis_down:
+                logger.info("Redis rate limiting recovered")
+            _redis_down = False
+    if wait is None:
+        wait = _memory_hit(client_ip, max_requests, time.monotonic())
 
-    if len(_buckets[client_ip]) >= max_requests:
+    if wait > 0:
         raise HTTPException(
             status_code=429,
             detail=f"Rate limit exceeded. Max {max_requests} requests per minute.",
+            headers={"Retry-After": str(math.ceil(wait))},
         )
-    _buckets[client_ip].append(now)
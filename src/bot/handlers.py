@@ -4,10 +4,11 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import math
 import os
 
 from aiogram import Bot, Dispatcher, F, Router
-from aiogram.filters import Command, CommandStart
+from aiogram.filters import Command, CommandObject, CommandStart
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import (
@@ -20,16 +21,27 @@ from aiogram.types import (
 
 from src.analyzer.fetcher import parse_channel_identifier
 from src.analyzer.metrics import AnalysisMetrics
-from src.analyzer.pipeline import run_analysis
+from src.analyzer.pipeline import load_analysis_outcome, run_analysis, wait_for_analysis
 from src.bot.i18n import format_date, get_lang, set_lang, t
+from src.cache import get_cached_analysis, publish_status
 from src.config import settings
 from src.db.repository import AnalysisRepository
 from src.db.session import async_session
+from src.jobs.admission import (
+    QueueFullError,
+    QueuePosition,
+    enqueue,
+    ensure_capacity,
+    queue_position,
+)
+from src.jobs.queue import Job, JobQueue, get_job_queue
+from src.observability import tracing
 
 logger = logging.getLogger(__name__)
 router = Router()
 
 _WEEKDAY_KEYS = [f"weekday_{i}" for i in range(7)]
+_QUEUE_POSITION_REFRESH_SECONDS = 3.0
 
 
 # ── Helpers ────────────────────────────────────────────────────────────────
@@ -136,6 +148,8 @@ def _build_summary(metrics: AnalysisMetrics, lang: str) -> str:
     if date_range:
         lines.append(f"📅 {t('period', lang)}: {date_range} ({metrics.analysis_period_days} {t('days', lang)})")
     lines.append(f"📝 {metrics.total_posts:,} {t('posts_analyzed', lang)}")
+    if metrics.partial_fetch:
+        lines.append(f"⏱ {t('partial_fetch_note', lang)}")
     lines.append("")
 
     # Reach & Engagement
@@ -183,6 +197,51 @@ def _build_summary(metrics: AnalysisMetrics, lang: str) -> str:
     return "\n".join(lines)
 
 
+# ── History (keyset-paginated) ──────────────────────────────────────────────
+
+_HISTORY_PAGE_SIZE = 10
+_STATUS_ICONS = {"done": "✅", "failed": "❌", "running": "⏳", "pending": "🕐"}
+
+
+async def _history_page(
+    uid: int, lang: str, cursor: str | None = None, direction: str = "next"
+) -> tuple[str, InlineKeyboardMarkup]:
+    """Render one page of a user's history with newer/older buttons."""
+    async with async_session() as session:
+        repo = AnalysisRepository(session)
+        page = await repo.list_analyses(
+            requested_by=uid, cursor=cursor, direction=direction, limit=_HISTORY_PAGE_SIZE
+        )
+
+    if not page.items:
+        return t("no_history", lang), _main_menu_kb(lang)
+
+    lines = [t("history_title", lang)]
+    for a in page.items:
+        status_icon = _STATUS_ICONS.get(a.status, "❓")
+        title = a.channel_title or a.channel_identifier
+        date_str = a.created_at.strftime("%b %d, %H:%M") if a.created_at else "—"
+        lines.append(f"• {status_icon} <b>{title}</b> — {date_str} ({a.status})")
+
+    nav = []
+    if page.prev_cursor:
+        nav.append(
+            InlineKeyboardButton(
+                text=t("btn_newer", lang), callback_data=f"history:prev:{page.prev_cursor}"
+            )
+        )
+    if page.next_cursor:
+        nav.append(
+            InlineKeyboardButton(
+                text=t("btn_older", lang), callback_data=f"history:next:{page.next_cursor}"
+            )
+        )
+    kb = _main_menu_kb(lang)
+    if nav:
+        kb = InlineKeyboardMarkup(inline_keyboard=[nav, *kb.inline_keyboard])
+    return "\n".join(lines), kb
+
+
 # ── Commands ───────────────────────────────────────────────────────────────
 
 @router.message(CommandStart())
@@ -273,31 +332,26 @@ async def cb_history(callback: CallbackQuery) -> None:
     uid = _uid(callback)
     if not uid:
         return
-    async with async_session() as session:
-        repo = AnalysisRepository(session)
-        analyses = await repo.get_user_analyses(uid, limit=10)
+    text, kb = await _history_page(uid, lang)
+    await callback.message.answer(text, parse_mode="HTML", reply_markup=kb)
 
-    if not analyses:
-        await callback.message.answer(
-            t("no_history", lang),
-            reply_markup=_main_menu_kb(lang),
-        )
-        return
-
-    lines = [t("history_title", lang)]
-    for i, a in enumerate(analyses, 1):
-        status_icon = {"done": "✅", "failed": "❌", "running": "⏳", "pending": "🕐"}.get(
-            a.status, "❓"
-        )
-        title = a.channel_title or a.channel_identifier
-        date_str = a.created_at.strftime("%b %d, %H:%M") if a.created_at else "—"
-        lines.append(f"{i}. {status_icon} <b>{title}</b> — {date_str} ({a.status})")
 
-    await callback.message.answer(
-        "\n".join(lines),
-        parse_mode="HTML",
-        reply_markup=_main_menu_kb(lang),
-    )
+@router.callback_query(F.data.startswith("history:"))
+async def cb_history_page(callback: CallbackQuery) -> None:
+    await callback.answer()
+    lang = _lang(callback)
+    uid = _uid(callback)
+    if not uid:
+        return
+    _, direction, cursor = callback.data.split(":", 2)
+    try:
+        text, kb = await _history_page(uid, lang, cursor=cursor, direction=direction)
+    except ValueError:
+        return  # malformed cursor
+    try:
+        await callback.message.edit_text(text, parse_mode="HTML", reply_markup=kb)
+    except Exception:
+        pass
 
 
 @router.callback_query(F.data == "action:help")
@@ -317,24 +371,8 @@ async def cmd_history(message: Message) -> None:
     uid = _uid(message)
     if not uid:
         return
-    async with async_session() as session:
-        repo = AnalysisRepository(session)
-        analyses = await repo.get_user_analyses(uid, limit=10)
-
-    if not analyses:
-        await message.answer(t("no_history", lang), reply_markup=_main_menu_kb(lang))
-        return
-
-    lines = [t("history_title", lang)]
-    for i, a in enumerate(analyses, 1):
-        status_icon = {"done": "✅", "failed": "❌", "running": "⏳", "pending": "🕐"}.get(
-            a.status, "❓"
-        )
-        title = a.channel_title or a.channel_identifier
-        date_str = a.created_at.strftime("%b %d, %H:%M") if a.created_at else "—"
-        lines.append(f"{i}. {status_icon} <b>{title}</b> — {date_str} ({a.status})")
-
-    await message.answer("\n".join(lines), parse_mode="HTML", reply_markup=_main_menu_kb(lang))
+    text, kb = await _history_page(uid, lang)
+    await message.answer(text, parse_mode="HTML", reply_markup=kb)
 
 
 @router.message(Command("analyze"))
@@ -348,10 +386,93 @@ async def cmd_analyze(message: Message, state: FSMContext) -> None:
     await message.answer(t("send_channel", lang), parse_mode="HTML")
 
 
+async def _enqueue_analysis(
+    queue: JobQueue,
+    raw: str,
+    username: str,
+    requested_by: int | None,
+    lang: str,
+    profile: bool = False,
+) -> tuple[int, Job, QueuePosition]:
+    """
+    Create the request row and queue it in the interactive class.
+
+    Raises:
+        QueueFullError: when the analysis queue is turning work away.
+    """
+    await ensure_capacity(queue)
+    async with async_session() as session:
+        request = await AnalysisRepository(session).create_request(
+            username, requested_by=requested_by, source="bot"
+        )
+        await session.commit()
+        request_id = request.id
+
+    await publish_status(request_id, "pending", stage="queued")
+    job = Job(
+        kind="analysis",
+        payload={
+            "channel": raw,
+            "request_id": request_id,
+            "requested_by": requested_by,
+            "lang": lang,
+            "source": "bot",
+            "profile": profile,
+        },
+        priority="interactive",
+        tenant=f"tg:{requested_by}",
+    )
+    return request_id, job, await enqueue(queue, job)
+
+
+@router.message(Command("profile"))
+async def cmd_profile(message: Message, command: CommandObject) -> None:
+    """Admin only: run a fresh, profiled analysis; the profile is sent as a notification."""
+    if not settings.ADMIN_ID or _uid(message) != settings.ADMIN_ID:
+        return
+    lang = _lang(message)
+    raw = (command.args or "").strip()
+    try:
+        username = parse_channel_identifier(raw)
+    except ValueError:
+        await message.answer(t("profile_usage", lang), parse_mode="HTML")
+        return
+    try:
+        request_id, _, _ = await _enqueue_analysis(
+            await get_job_queue(), raw, username, _uid(message), lang, profile=True
+        )
+    except QueueFullError as e:
+        await message.answer(t("error_queue_full", lang, retry=math.ceil(e.retry_after)))
+        return
+    await message.answer(t("profile_queued", lang, username=username, request_id=request_id))
+
+
+def _queue_position_text(placed: QueuePosition, lang: str) -> str:
+    return t(
+        "progress_queue_position", lang, position=placed.position, eta=math.ceil(placed.eta_seconds)
+    )
+
+
+def _analysis_error_text(error: str, lang: str) -> str:
+    """Map a pipeline error message to a localized reply."""
+    error_msg = error.lower()
+    if "not a channel" in error_msg:
+        return t("error_not_channel", lang)
+    if "cannot parse" in error_msg:
+        return t("error_invalid_link", lang)
+    if "no user has" in error_msg or "could not find" in error_msg:
+        return t("error_not_found", lang)
+    if "flood" in error_msg or "a wait of" in error_msg:
+        return t("error_flood", lang)
+    return t("error_generic", lang)
+
+
 @router.message(AnalyzeState.waiting_for_channel)
+@tracing.traced("bot.handle_channel_input")
 async def handle_channel_input(message: Message, state: FSMContext) -> None:
     lang = _lang(message)
     raw = (message.text or "").strip()
+    tracing.current_span().set_attribute("telegram.user_id", _uid(message))
     if not raw:
         await message.answer(t("send_channel_prompt", lang))
         return
@@ -379,19 +500,53 @@ async def handle_channel_input(message: Message, state: FSMContext) -> None:
         except Exception:
             pass
 
+    async def on_event(event: dict) -> None:
+        if event.get("message") and event["status"] == "running":
+            await update_progress(event["message"])
+
+    async def show_queue_position(queue: JobQueue, job: Job) -> None:
+        # Refresh "#N in queue" until a worker picks the job up
+        while (placed := await queue_position(queue, job)) is not None:
+            await update_progress(_queue_position_text(placed, lang))
+            await asyncio.sleep(_QUEUE_POSITION_REFRESH_SECONDS)
+
+    requested_by = message.from_user.id if message.from_user else None
     try:
-        async with async_session() as session:
-            metrics, pdf_path = await asyncio.wait_for(
-                run_analysis(
-                    raw,
-                    session=session,
-                    requested_by=message.from_user.id if message.from_user else None,
-                    source="bot",
-                    progress_callback=update_progress,
-                    lang=lang,
-                ),
-                timeout=settings.ANALYSIS_TIMEOUT,
+        cached = await get_cached_analysis(username)
+        cache_usable = cached and cached.get("lang", "en") == lang
+        if cache_usable and os.path.exists(cached.get("pdf_path", "")):
+            # Cache hit — nothing to schedule
+            async with async_session() as session:
+                metrics, pdf_path = await run_analysis(
+                    raw, session=session, requested_by=requested_by, source="bot", lang=lang
+                )
+        else:
+            queue = await get_job_queue()
+            request_id, job, placed = await _enqueue_analysis(
+                queue, raw, username, requested_by, lang
             )
+            await update_progress(_queue_position_text(placed, lang))
+            ticker = asyncio.create_task(show_queue_position(queue, job))
+            try:
+                # The timeout covers the run itself, not the time spent waiting in line
+                event = await wait_for_analysis(
+                    request_id,
+                    timeout=settings.ANALYSIS_TIMEOUT + placed.eta_seconds,
+                    on_event=on_event,
+                )
+            finally:
+                ticker.cancel()
+            if event["status"] == "failed":
+                await message.answer(
+                    _analysis_error_text(event.get("message") or "", lang),
+                    reply_markup=_main_menu_kb(lang),
+                )
+                return
+            async with async_session() as session:
+                outcome = await load_analysis_outcome(session, request_id, raw)
+            if outcome is None:
+                raise RuntimeError(f"Analysis {request_id} finished without a result")
+            metrics, pdf_path = outcome
 
         # Send professional summary
         summary = _build_summary(metrics, lang)
@@ -407,28 +562,16 @@ async def handle_channel_input(message: Message, state: FSMContext) -> None:
                 reply_markup=_main_menu_kb(lang),
             )
 
-    except asyncio.TimeoutError:
+    except QueueFullError as e:
+        await message.answer(
+            t("error_queue_full", lang, retry=math.ceil(e.retry_after)),
+            reply_markup=_main_menu_kb(lang),
+        )
+    except TimeoutError:
         await message.answer(t("error_timeout", lang), reply_markup=_main_menu_kb(lang))
-    except ValueError as e:
-        error_msg = str(e).lower()
-        if "not a channel" in error_msg:
-            await message.answer(t("error_not_channel", lang))
-        elif "cannot parse" in error_msg:
-            await message.answer(t("error_invalid_link", lang))
-        else:
-            await message.answer(f"❌ {e}")
     except Exception as e:
         logger.error(f"Analysis failed for {raw}: {e}", exc_info=True)
-        error_msg = str(e).lower()
-        if "no user has" in error_msg or "could not find" in error_msg:
-            await message.answer(t("error_not_found", lang))
-        elif "flood" in error_msg:
-            await message.answer(t("error_flood", lang))
-        else:
-            await message.answer(
-                t("error_generic", lang),
-                reply_markup=_main_menu_kb(lang),
-            )
+        await message.answer(_analysis_error_text(str(e), lang), reply_markup=_main_menu_kb(lang))
     finally:
         await state.clear()
         try:
@@ -151,6 +151,11 @@ TRANSLATIONS: dict[str, dict[str, str]] = {
         "ru": "Начинаю...",
         "uz": "Boshlanmoqda...",
     },
+    "progress_queue_position": {
+        "en": "You are #{position} in queue, ETA ~{eta} s",
+        "ru": "Вы #{position} в очереди, ожидание ~{eta} с",
+        "uz": "Navbatda #{position}-o'rindasiz, taxminan ~{eta} s",
+    },
     # ── Report summary ────────────────────────────────────────────────
     "report_title": {
         "en": "✅ <b>Analysis Complete</b>",
@@ -192,6 +197,14 @@ TRANSLATIONS: dict[str, dict[str, str]] = {
         "ru": "постов проанализировано",
         "uz": "post tahlil qilindi",
     },
+    "partial_fetch_note": {
+        "en": "Time limit reached — report covers the posts fetched so far.",
+        "ru": (
+            "Достигнут лимит времени — "
+            "отчёт охватывает уже загруженные посты."
+        ),
+        "uz": "Vaqt chegarasiga yetildi — hisobot yuklangan postlar asosida.",
+    },
     "days": {
         "en": "days",
         "ru": "дн.",
@@ -354,6 +367,39 @@ TRANSLATIONS: dict[str, dict[str, str]] = {
             "Keyinroq qayta urinib ko'ring."
         ),
     },
+    "error_queue_full": {
+        "en": (
+            "🚦 Too many analyses are waiting right now. "
+            "Please try again in ~{retry} s."
+        ),
+        "ru": (
+            "🚦 Сейчас в очереди слишком много анализов. "
+            "Попробуйте через ~{retry} с."
+        ),
+        "uz": (
+            "🚦 Hozir navbatda juda ko'p tahlil bor. "
+            "~{retry} s dan keyin urinib ko'ring."
+        ),
+    },
+    "profile_usage": {
+        "en": "Usage: <code>/profile @channel</code>",
+        "ru": "Использование: <code>/profile @channel</code>",
+        "uz": "Foydalanish: <code>/profile @channel</code>",
+    },
+    "profile_queued": {
+        "en": (
+            "🔬 Profiling @{username} (analysis #{request_id}). "
+            "Results will follow here."
+        ),
+        "ru": (
+            "🔬 Профилирование @{username} (анализ #{request_id}). "
+            "Результаты придут сюда."
+        ),
+        "uz": (
+            "🔬 @{username} profillanmoqda (tahlil #{request_id}). "
+            "Natijalar shu yerga keladi."
+        ),
+    },
     "error_not_channel": {
         "en": "❌ That doesn't appear to be a channel or supergroup.",
         "ru": "❌ Это не похоже на канал или супергруппу.",
@@ -404,6 +450,16 @@ TRANSLATIONS: dict[str, dict[str, str]] = {
         "ru": "<b>Ваши последние анализы:</b>\n",
         "uz": "<b>Oxirgi tahlillaringiz:</b>\n",
     },
+    "btn_newer": {
+        "en": "◀️ Newer",
+        "ru": "◀️ Новее",
+        "uz": "◀️ Yangiroq",
+    },
+    "btn_older": {
+        "en": "Older ▶️",
+        "ru": "Старше ▶️",
+        "uz": "Eskiroq ▶️",
+    },
     # ── Language ──────────────────────────────────────────────────────
     "choose_language": {
         "en": "🌐 Choose your language:",
@@ -517,7 +573,7 @@ TRANSLATIONS: dict[str, dict[str, str]] = {
     "pdf_react": {"en": "React", "ru": "Реакц.", "uz": "Reaks."},
     "pdf_er_pct": {"en": "ER %", "ru": "ER %", "uz": "ER %"},
     "pdf_preview": {"en": "Preview", "ru": "Превью", "uz": "Ko'rib chiqish"},
-    "pdf_generated": {"en": "Generated {date}", "ru": "Сформирован {date}", "uz": "Yaratilgan {date}"},
+    "pdf_data_as_of": {"en": "Data as of {date}", "ru": "Данные на {date}", "uz": "{date} holatiga ko'ra ma'lumotlar"},
     "pdf_footer": {
         "en": "Generated by {bot_name} • www.t.me/{bot_name}",
         "ru": "Создано {bot_name} • www.t.me/{bot_name}",
@@ -539,6 +595,20 @@ TRANSLATIONS: dict[str, dict[str, str]] = {
         "ru": " Охватывает активную историю публикаций. Для каналов с высокой частотой старые посты за пределами этого окна не включены.",
         "uz": " Faol nashr tarixi qamrab olingan. Yuqori hajmli kanallar uchun ushbu oynadan tashqaridagi eski postlar kiritilmagan.",
     },
+    "pdf_data_note_deadline": {
+        "en": (
+            " Fetching stopped early to finish within the time limit,"
+            " so older posts are not included."
+        ),
+        "ru": (
+            " Загрузка остановлена досрочно, чтобы уложиться в лимит времени;"
+            " старые посты не включены."
+        ),
+        "uz": (
+            " Vaqt chegarasiga sig'ish uchun yuklash erta to'xtatildi,"
+            " eski postlar kiritilmagan."
+        ),
+    },
     "pdf_data_note_cached": {
         "en": "Cached result.",
         "ru": "Результат из кэша.",
@@ -15,26 +15,35 @@ from src.bot.handlers import router
 from src.cache import close_redis
 from src.config import settings
 from src.db.session import init_db
+from src.db.write_behind import request_log
+from src.jobs.queue import get_job_queue
+from src.jobs.worker import Worker
+from src.notify import notify_admin
+from src.observability import tracing
+from src.observability.loop_watchdog import loop_watchdog
+from src.observability.prometheus import start_metrics_server
+from src.reports.charts import shutdown_render_pool, start_render_pool
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 
-async def _notify_admin(bot: Bot, text: str) -> None:
-    """Send a notification to the admin if ADMIN_TELEGRAM_ID is configured."""
-    if not settings.ADMIN_ID:
-        return
-    try:
-        await bot.send_message(settings.ADMIN_ID, text, parse_mode=ParseMode.HTML)
-    except Exception as e:
-        logger.warning(f"Could not notify admin: {e}")
-
-
 async def main() -> None:
     logger.info("Starting Analyticbot v2...")
 
     # Init database tables
     await init_db()
+    request_log.start()
+    start_metrics_server(settings.METRICS_PORT)
+    tracing.configure("bot")
+    loop_watchdog.start()
+    start_render_pool()
+
+    # Memory backend: analyses queued by the bot run in this process
+    worker = None
+    if settings.JOB_QUEUE_BACKEND != "redis":
+        worker = Worker(await get_job_queue())
+        worker.start()
 
     bot = Bot(token=settings.BOT_TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
     dp = Dispatcher()
@@ -48,16 +57,21 @@ async def main() -> None:
             logger.info(f"Bot username: @{settings.BOT_USERNAME}")
 
     start_time = datetime.now(UTC).strftime("%Y-%m-%d %H:%M:%S UTC")
-    await _notify_admin(bot, f"🟢 <b>Analyticbot started</b>\n{start_time}")
+    await notify_admin(f"🟢 <b>Analyticbot started</b>\n{start_time}", bot=bot)
 
     logger.info("Bot is running. Polling for updates...")
     try:
         await dp.start_polling(bot)
     finally:
         logger.info("Shutting down...")
-        await _notify_admin(bot, "🔴 <b>Analyticbot shutting down</b>")
+        await notify_admin("🔴 <b>Analyticbot shutting down</b>", bot=bot)
+        if worker is not None:
+            await worker.stop()
+        await request_log.stop()  # drain buffered request records
         await disconnect_telethon_client()
         await close_redis()
+        await loop_watchdog.stop()
+        await asyncio.to_thread(shutdown_render_pool)
 
 
 if __name__ == "__main__":
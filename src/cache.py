@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 import redis.asyncio as redis
 
 from src.config import settings
+from src.observability.prometheus import record_cache
 
 logger = logging.getLogger(__name__)
 
@@ -41,12 +45,37 @@ async def get_cached_analysis(channel: str) -> dict | None:
         raw = await r.get(_cache_key(channel))
         if raw:
             logger.info(f"Cache hit for @{channel}")
+            record_cache("analysis", hit=True)
             return json.loads(raw)
     except Exception as e:
         logger.warning(f"Redis read error (non-fatal): {e}")
+    record_cache("analysis", hit=False)
     return None
 
 
+async def get_cached_analyses(channels: list[str]) -> dict[str, dict]:
+    """
+    Cached analysis result dicts for many channels in one round trip (MGET),
+    keyed by channel as given; misses are left out.
+    """
+    if not channels:
+        return {}
+    found: dict[str, dict] = {}
+    try:
+        r = await get_redis()
+        raws = await r.mget([_cache_key(channel) for channel in channels])
+        for channel, raw in zip(channels, raws):
+            if raw:
+                found[channel] = json.loads(raw)
+    except Exception as e:
+        logger.warning(f"Redis read error (non-fatal): {e}")
+    for channel in channels:
+        record_cache("analysis", hit=channel in found)
+    if found:
+        logger.info(f"Cache hit for {len(found)} of {len(channels)} channels")
+    return found
+
+
 async def set_cached_analysis(
     channel: str,
     analysis_id: int,
@@ -66,3 +95,105 @@ async def set_cached_analysis(
         logger.info(f"Cached analysis for @{channel} (TTL {settings.CACHE_TTL_HOURS}h)")
     except Exception as e:
         logger.warning(f"Redis write error (non-fatal): {e}")
+
+
+# ── Live analysis status (Redis hash + pub/sub) ────────────────────────────
+# Intermediate pipeline stages are published here instead of being committed
+# to Postgres; the DB only records the final outcome.
+
+_STATUS_TTL_SECONDS = 3600
+
+
+def _status_key(analysis_id: int) -> str:
+    return f"analysis:status:{analysis_id}"
+
+
+def status_channel(analysis_id: int) -> str:
+    return f"analysis:events:{analysis_id}"
+
+
+async def publish_status(
+    analysis_id: int,
+    status: str,
+    stage: str | None = None,
+    message: str | None = None,
+) -> None:
+    """Record the live status of an analysis and notify subscribers (non-fatal)."""
+    event = {"analysis_id": analysis_id, "status": status, "stage": stage, "message": message}
+    try:
+        r = await get_redis()
+        payload = json.dumps(event)
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.setex(_status_key(analysis_id), _STATUS_TTL_SECONDS, payload)
+            pipe.publish(status_channel(analysis_id), payload)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Redis status publish error (non-fatal): {e}")
+
+
+async def get_live_status(analysis_id: int) -> dict | None:
+    """Return the last published status event for an analysis, if any."""
+    try:
+        r = await get_redis()
+        raw = await r.get(_status_key(analysis_id))
+        if raw:
+            return json.loads(raw)
+    except Exception as e:
+        logger.warning(f"Redis status read error (non-fatal): {e}")
+    return None
+
+
+TERMINAL_STATUSES = ("done", "failed")
+
+
+class StatusSubscription:
+    """Pub/sub listener for one analysis' status channel."""
+
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    async def get(self, timeout: float) -> dict | None:
+        """Wait up to ``timeout`` seconds for the next event (None on timeout)."""
+        if self._pubsub is None:
+            await asyncio.sleep(timeout)  # Redis unavailable — behave like a quiet channel
+            return None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                msg = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=remaining
+                )
+            except Exception as e:
+                logger.warning(f"Redis subscription error (non-fatal): {e}")
+                self._pubsub = None
+                return None
+            if msg and msg.get("type") == "message":
+                return json.loads(msg["data"])
+        return None
+
+
+@asynccontextmanager
+async def subscribe_status(analysis_id: int) -> AsyncIterator[StatusSubscription]:
+    """
+    Subscribe to status events for an analysis (works across API/worker processes).
+
+    Subscribe *before* reading the current status so no transition is missed.
+    """
+    pubsub = None
+    try:
+        r = await get_redis()
+        pubsub = r.pubsub()
+        await pubsub.subscribe(status_channel(analysis_id))
+    except Exception as e:
+        logger.warning(f"Redis subscribe error (non-fatal): {e}")
+        pubsub = None
+    try:
+        yield StatusSubscription(pubsub)
+    finally:
+        if pubsub is not None:
+            try:
+                await pubsub.unsubscribe()
+                await pubsub.aclose()
+            except Exception:
+                pass
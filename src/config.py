@@ -46,6 +46,11 @@ class Settings:
 
     # Rate limiting
     RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "10"))
+    # "redis" shares the limit across API workers; "memory" is per process, and is
+    # also the fallback when Redis is unreachable. RATE_LIMIT_MAX_KEYS bounds how
+    # many client IPs the in-process limiter tracks (least recently seen go first).
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
 
     # Bot admin (receives startup/shutdown notifications)
     ADMIN_ID: int = int(os.getenv("ADMIN_TELEGRAM_ID", "0"))
@@ -55,6 +60,69 @@ class Settings:
     CACHE_TTL_HOURS: int = int(os.getenv("ANALYSIS_CACHE_TTL_HOURS", "24"))
     ANALYSIS_TIMEOUT: int = int(os.getenv("ANALYSIS_TIMEOUT_SECONDS", "120"))
 
+    # Job queue — "memory" runs jobs inside the API process; "redis" needs `make worker`
+    JOB_QUEUE_BACKEND: str = os.getenv("JOB_QUEUE_BACKEND", "memory")
+    WORKER_CONCURRENCY: int = int(os.getenv("WORKER_CONCURRENCY", "2"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BASE_SECONDS: float = float(os.getenv("JOB_RETRY_BASE_SECONDS", "5"))
+    JOB_VISIBILITY_TIMEOUT: int = int(
+        os.getenv("JOB_VISIBILITY_TIMEOUT_SECONDS", str(ANALYSIS_TIMEOUT + 60))
+    )
+
+    # Admission control — analyses running at once across all workers (0 = only
+    # WORKER_CONCURRENCY per worker), and ready jobs allowed to wait before new
+    # submissions are turned away (0 = unbounded)
+    ANALYSIS_MAX_CONCURRENCY: int = int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "4"))
+    ANALYSIS_QUEUE_LIMIT: int = int(os.getenv("ANALYSIS_QUEUE_LIMIT", "100"))
+
+    # Report downloads — "" serves files from Python (ranges supported, zero-copy
+    # where the ASGI server offers pathsend); "x-accel" (nginx) or "x-sendfile"
+    # (Apache, lighttpd) hands the transfer to the reverse proxy instead.
+    # REPORT_OFFLOAD_PREFIX is the proxy's internal location mapped to REPORTS_DIR.
+    REPORT_OFFLOAD: str = os.getenv("REPORT_OFFLOAD", "").lower()
+    REPORT_OFFLOAD_PREFIX: str = os.getenv("REPORT_OFFLOAD_PREFIX", "/_reports/")
+
+    # Chart rendering — warm worker processes rendering a report's charts in
+    # parallel (0 = render in the calling thread), replaced by fresh ones after
+    # CHART_RENDER_RECYCLE renders per worker to cap matplotlib's memory growth
+    CHART_RENDER_WORKERS: int = int(
+        os.getenv("CHART_RENDER_WORKERS", str(min(4, os.cpu_count() or 1)))
+    )
+    CHART_RENDER_RECYCLE: int = int(os.getenv("CHART_RENDER_RECYCLE", "100"))
+    # Charts go from the renderer into the PDF in memory; set this to also keep
+    # the PNGs under REPORTS_DIR/analysis_<id>/charts/ for debugging
+    SAVE_CHART_FILES: bool = os.getenv("SAVE_CHART_FILES", "false").lower() in ("1", "true", "yes")
+    # How charts are embedded in the PDF: "svg" draws them as vector graphics set in
+    # the report's own fonts (smaller files, sharp at any zoom); "png" embeds images
+    PDF_CHART_FORMAT: str = os.getenv("PDF_CHART_FORMAT", "svg").lower()
+    # Rendered charts and PDFs are stored once per content (metrics, language,
+    # format, template version) under REPORTS_DIR/artifacts; least recently used
+    # files are evicted beyond this size (0 = unbounded). Reports still linked
+    # from an analysis_<id>/ directory don't count — evicting them frees nothing
+    ARTIFACT_STORE_QUOTA_MB: int = int(os.getenv("ARTIFACT_STORE_QUOTA_MB", "1024"))
+
+    # In-process cache of finished analyses (status bodies, report paths) per API process
+    HTTP_CACHE_ENTRIES: int = int(os.getenv("HTTP_CACHE_ENTRIES", "2048"))
+
+    # Prometheus metrics — the API serves GET /metrics; the bot and workers listen
+    # on this port when set (0 = off)
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "0"))
+    # Tracing — "" (off), "console" (log lines) or "file" (JSON lines at TRACING_FILE)
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "").lower()
+    TRACING_FILE: str = os.getenv("TRACING_FILE", "logs/traces.jsonl")
+    # Profile this fraction of full analyses (0-1; the admin's /profile command
+    # profiles one on demand). Results go next to the report and to the admin.
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    # Event-loop watchdog — heartbeat period (0 = off) and the lag at which the
+    # blocking coroutine's stack is logged
+    LOOP_WATCHDOG_INTERVAL_MS: int = int(os.getenv("LOOP_WATCHDOG_INTERVAL_MS", "100"))
+    LOOP_LAG_THRESHOLD_MS: int = int(os.getenv("LOOP_LAG_THRESHOLD_MS", "250"))
+
+    # Write-behind request log (cache-hit bookkeeping is batched, never awaited)
+    WRITE_BEHIND_FLUSH_MS: int = int(os.getenv("WRITE_BEHIND_FLUSH_MS", "250"))
+    WRITE_BEHIND_BATCH_SIZE: int = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "200"))
+    WRITE_BEHIND_MAX_BUFFER: int = int(os.getenv("WRITE_BEHIND_MAX_BUFFER", "10000"))
+
     def validate(self) -> None:
         """Validate critical settings on startup."""
         if self.SECRET_KEY == _DEFAULT_SECRET:
@@ -2,9 +2,20 @@
 
 from __future__ import annotations
 
-from datetime import datetime
-
-from sqlalchemy import BigInteger, DateTime, Float, Integer, String, Text, func
+from datetime import date, datetime
+
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    func,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -16,6 +27,11 @@ class AnalysisRequest(Base):
     """Tracks each analysis request from a user."""
 
     __tablename__ = "analysis_requests"
+    __table_args__ = (
+        # Keyset pagination: per-user history and global listings, newest first
+        Index("ix_analysis_requests_requested_by_created", "requested_by", "created_at", "id"),
+        Index("ix_analysis_requests_created", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     channel_identifier: Mapped[str] = mapped_column(String(255), index=True)
@@ -91,7 +107,54 @@ class AnalysisResult(Base):
     pct_photo: Mapped[float] = mapped_column(Float, default=0.0)
     pct_video: Mapped[float] = mapped_column(Float, default=0.0)
 
+    # Full AnalysisMetrics document (zlib-compressed JSON, see analyzer.metrics.dump_metrics)
+    metrics_doc: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+
     # Report file path
     report_pdf_path: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    report_lang: Mapped[str] = mapped_column(String(5), default="en")
 
     computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class ChannelDailyStats(Base):
+    """Per-channel, per-day rollup — upserted on every analysis for cheap history reads."""
+
+    __tablename__ = "channel_daily_stats"
+
+    channel_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    posts: Mapped[int] = mapped_column(Integer, default=0)
+    views: Mapped[int] = mapped_column(BigInteger, default=0)
+    forwards: Mapped[int] = mapped_column(Integer, default=0)
+    reactions: Mapped[int] = mapped_column(Integer, default=0)
+    replies: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class AnalysisBatch(Base):
+    """Channels submitted together via POST /api/analyze/batch."""
+
+    __tablename__ = "analysis_batches"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    source: Mapped[str] = mapped_column(String(20), default="web")
+    total: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class AnalysisBatchItem(Base):
+    """One channel of a batch and the analysis that answers it."""
+
+    __tablename__ = "analysis_batch_items"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    batch_id: Mapped[int] = mapped_column(Integer, index=True)
+    channel_identifier: Mapped[str] = mapped_column(String(255))
+    request_id: Mapped[int | None] = mapped_column(Integer, nullable=True)  # queued analysis
+    # Analysis whose result serves this item — an earlier one for cache hits
+    result_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    cached: Mapped[bool] = mapped_column(default=False)
+    error_message: Mapped[str | None] = mapped_column(Text, nullable=True)  # rejected input
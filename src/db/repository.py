@@ -2,12 +2,44 @@
 
 from __future__ import annotations
 
-from datetime import UTC, datetime
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
 
-from sqlalchemy import select, update
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.db.models import AnalysisRequest, AnalysisResult, ChannelSnapshot, PostRecord
+from src.analyzer.metrics import AnalysisMetrics, DailyStats, load_metrics
+from src.db.models import (
+    AnalysisBatch,
+    AnalysisBatchItem,
+    AnalysisRequest,
+    AnalysisResult,
+    ChannelDailyStats,
+    ChannelSnapshot,
+    PostRecord,
+)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def encode_cursor(req: AnalysisRequest) -> str:
+    """Compact keyset cursor "<created_at µs>.<id>" (fits Telegram callback_data)."""
+    micros = (req.created_at - _EPOCH) // timedelta(microseconds=1)
+    return f"{micros}.{req.id}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of encode_cursor. Raises ValueError on malformed input."""
+    micros, _, req_id = cursor.partition(".")
+    return _EPOCH + timedelta(microseconds=int(micros)), int(req_id)
+
+
+@dataclass
+class HistoryPage:
+    items: list[AnalysisRequest]
+    next_cursor: str | None  # older entries
+    prev_cursor: str | None  # newer entries
 
 
 class AnalysisRepository:
@@ -39,11 +71,19 @@ class AnalysisRepository:
             .values(status="running", channel_id=channel_id, channel_title=title)
         )
 
-    async def set_request_done(self, request_id: int) -> None:
+    async def set_request_done(
+        self,
+        request_id: int,
+        channel_id: int | None = None,
+        title: str | None = None,
+    ) -> None:
+        values: dict = {"status": "done", "completed_at": datetime.now(UTC)}
+        if channel_id is not None:
+            values["channel_id"] = channel_id
+        if title is not None:
+            values["channel_title"] = title
         await self.session.execute(
-            update(AnalysisRequest)
-            .where(AnalysisRequest.id == request_id)
-            .values(status="done", completed_at=datetime.now(UTC))
+            update(AnalysisRequest).where(AnalysisRequest.id == request_id).values(**values)
         )
 
     async def set_request_failed(self, request_id: int, error: str) -> None:
@@ -59,6 +99,26 @@ class AnalysisRepository:
         )
         return result.scalar_one_or_none()
 
+    async def save_analysis(
+        self,
+        request_id: int,
+        snapshot: ChannelSnapshot,
+        posts: list[PostRecord],
+        daily_stats: list[DailyStats],
+        result: AnalysisResult,
+    ) -> None:
+        """
+        Stage everything a finished analysis writes, in one transaction.
+
+        Nothing is flushed here — the caller's single commit sends the inserts
+        (posts go out as one batched multi-row INSERT).
+        """
+        await self.set_request_done(request_id, snapshot.channel_id, snapshot.title)
+        await self.upsert_daily_stats(snapshot.channel_id, daily_stats)
+        self.session.add(snapshot)
+        self.session.add_all(posts)
+        self.session.add(result)
+
     # ── Channel Snapshots ──────────────────────────────────────────────
 
     async def save_snapshot(self, snapshot: ChannelSnapshot) -> ChannelSnapshot:
@@ -81,6 +141,55 @@ class AnalysisRepository:
         )
         return list(result.scalars().all())
 
+    # ── Daily Rollup ──────────────────────────────────────────────────
+
+    async def upsert_daily_stats(self, channel_id: int, stats: list[DailyStats]) -> int:
+        """Insert or refresh per-day rows — the latest fetch wins (view counts only grow)."""
+        if not stats:
+            return 0
+        stmt = pg_insert(ChannelDailyStats).values(
+            [
+                {
+                    "channel_id": channel_id,
+                    "day": s.day,
+                    "posts": s.posts,
+                    "views": s.views,
+                    "forwards": s.forwards,
+                    "reactions": s.reactions,
+                    "replies": s.replies,
+                }
+                for s in stats
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ChannelDailyStats.channel_id, ChannelDailyStats.day],
+            set_={
+                "posts": stmt.excluded.posts,
+                "views": stmt.excluded.views,
+                "forwards": stmt.excluded.forwards,
+                "reactions": stmt.excluded.reactions,
+                "replies": stmt.excluded.replies,
+                "updated_at": datetime.now(UTC),
+            },
+        )
+        await self.session.execute(stmt)
+        return len(stats)
+
+    async def get_daily_stats(
+        self, channel_id: int, date_from: date, date_to: date
+    ) -> list[ChannelDailyStats]:
+        """Range scan over the (channel_id, day) primary key, oldest first."""
+        result = await self.session.execute(
+            select(ChannelDailyStats)
+            .where(
+                ChannelDailyStats.channel_id == channel_id,
+                ChannelDailyStats.day >= date_from,
+                ChannelDailyStats.day <= date_to,
+            )
+            .order_by(ChannelDailyStats.day)
+        )
+        return list(result.scalars().all())
+
     # ── Analysis Results ───────────────────────────────────────────────
 
     async def save_result(self, result: AnalysisResult) -> AnalysisResult:
@@ -94,15 +203,122 @@ class AnalysisRepository:
         )
         return result.scalar_one_or_none()
 
+    async def get_metrics(self, analysis_id: int) -> AnalysisMetrics | None:
+        """Hydrate the stored AnalysisMetrics document (None for legacy rows)."""
+        result = await self.session.execute(
+            select(AnalysisResult.metrics_doc).where(AnalysisResult.analysis_id == analysis_id)
+        )
+        blob = result.scalar_one_or_none()
+        return load_metrics(blob) if blob else None
+
+    async def get_metrics_doc(self, analysis_id: int) -> tuple[bytes, str] | None:
+        """Raw compressed metrics document and report language, without decoding."""
+        result = await self.session.execute(
+            select(AnalysisResult.metrics_doc, AnalysisResult.report_lang).where(
+                AnalysisResult.analysis_id == analysis_id
+            )
+        )
+        row = result.one_or_none()
+        return (row[0], row[1]) if row and row[0] else None
+
+    async def set_report_path(self, analysis_id: int, pdf_path: str, lang: str) -> None:
+        await self.session.execute(
+            update(AnalysisResult)
+            .where(AnalysisResult.analysis_id == analysis_id)
+            .values(report_pdf_path=pdf_path, report_lang=lang)
+        )
+
+    # ── Batches ───────────────────────────────────────────────────────────
+
+    async def create_batch(
+        self, items: list[AnalysisBatchItem], source: str = "web"
+    ) -> AnalysisBatch:
+        batch = AnalysisBatch(source=source, total=len(items))
+        self.session.add(batch)
+        await self.session.flush()
+        for item in items:
+            item.batch_id = batch.id
+        self.session.add_all(items)
+        return batch
+
+    async def get_batch(self, batch_id: int) -> AnalysisBatch | None:
+        result = await self.session.execute(
+            select(AnalysisBatch).where(AnalysisBatch.id == batch_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_batch_items(
+        self, batch_id: int
+    ) -> list[tuple[AnalysisBatchItem, AnalysisRequest | None]]:
+        """Items in submission order, each with its queued request (None if not queued)."""
+        result = await self.session.execute(
+            select(AnalysisBatchItem, AnalysisRequest)
+            .outerjoin(AnalysisRequest, AnalysisRequest.id == AnalysisBatchItem.request_id)
+            .where(AnalysisBatchItem.batch_id == batch_id)
+            .order_by(AnalysisBatchItem.id)
+        )
+        return [(item, request) for item, request in result.all()]
+
+    async def get_results(self, analysis_ids: list[int]) -> dict[int, AnalysisResult]:
+        result = await self.session.execute(
+            select(AnalysisResult).where(AnalysisResult.analysis_id.in_(analysis_ids))
+        )
+        return {r.analysis_id: r for r in result.scalars().all()}
+
     # ── User History ──────────────────────────────────────────────────────
 
     async def get_user_analyses(
         self, user_id: int, limit: int = 10
     ) -> list[AnalysisRequest]:
-        result = await self.session.execute(
-            select(AnalysisRequest)
-            .where(AnalysisRequest.requested_by == user_id)
-            .order_by(AnalysisRequest.created_at.desc())
-            .limit(limit)
+        page = await self.list_analyses(requested_by=user_id, limit=limit)
+        return page.items
+
+    async def list_analyses(
+        self,
+        requested_by: int | None = None,
+        source: str | None = None,
+        cursor: str | None = None,
+        direction: str = "next",
+        limit: int = 10,
+    ) -> HistoryPage:
+        """
+        Keyset-paginated listing, newest first.
+
+        Seeks on (created_at, id) via the composite indexes, so any page costs
+        the same as the first. ``direction="next"`` walks to older entries,
+        ``"prev"`` back to newer ones.
+        """
+        key = tuple_(AnalysisRequest.created_at, AnalysisRequest.id)
+        query = select(AnalysisRequest)
+        if requested_by is not None:
+            query = query.where(AnalysisRequest.requested_by == requested_by)
+        if source is not None:
+            query = query.where(AnalysisRequest.source == source)
+
+        backwards = direction == "prev" and cursor is not None
+        if cursor is not None:
+            pos = tuple_(*decode_cursor(cursor))
+            query = query.where(key > pos if backwards else key < pos)
+        if backwards:
+            query = query.order_by(AnalysisRequest.created_at.asc(), AnalysisRequest.id.asc())
+        else:
+            query = query.order_by(AnalysisRequest.created_at.desc(), AnalysisRequest.id.desc())
+
+        result = await self.session.execute(query.limit(limit + 1))
+        rows = list(result.scalars().all())
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if backwards:
+            rows.reverse()
+
+        if not rows:
+            return HistoryPage(items=[], next_cursor=None, prev_cursor=None)
+
+        # Moving forwards, the cursor row itself proves newer rows exist (and vice versa)
+        has_older = has_more if not backwards else True
+        has_newer = has_more if backwards else cursor is not None
+        return HistoryPage(
+            items=rows,
+            next_cursor=encode_cursor(rows[-1]) if has_older else None,
+            prev_cursor=encode_cursor(rows[0]) if has_newer else None,
         )
-        return list(result.scalars().all())
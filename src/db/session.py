@@ -2,17 +2,59 @@
 
 from __future__ import annotations
 
+import time
 from collections.abc import AsyncGenerator
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.config import settings
 from src.db.models import Base
+from src.observability import tracing
+from src.observability.prometheus import DB_POOL_CHECKOUT_SECONDS
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False, pool_size=10, max_overflow=20)
+
+class _TimedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited (DB_POOL_CHECKOUT_SECONDS)."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started)
+
+
+engine = create_async_engine(
+    settings.DATABASE_URL, echo=False, poolclass=_TimedPool, pool_size=10, max_overflow=20
+)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+# ── Tracing: one span per SQL statement ────────────────────────────────────
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _trace_statement_start(conn, cursor, statement, parameters, context, executemany):
+    context._trace_span = tracing.start_span(
+        "db.query", {"db.statement": statement[:500], "db.executemany": executemany}
+    )
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _trace_statement_end(conn, cursor, statement, parameters, context, executemany):
+    tracing.end_span(getattr(context, "_trace_span", None))
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _trace_statement_error(exception_context):
+    context = exception_context.execution_context
+    if context is not None:
+        tracing.end_span(
+            getattr(context, "_trace_span", None), error=exception_context.original_exception
+        )
+
+
 async def init_db() -> None:
     """Create all tables (for development). Use Alembic in production."""
     async with engine.begin() as conn:
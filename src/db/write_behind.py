@@ -0,0 +1,180 @@
+"""Write-behind request log — batches AnalysisRequest bookkeeping off the hot path"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+
+from sqlalchemy import insert, update
+
+from src.config import settings
+from src.db.models import AnalysisRequest
+from src.db.session import async_session
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestRecord:
+    """A finished request to insert, or (with request_id) an existing row to complete."""
+
+    channel_identifier: str | None = None
+    requested_by: int | None = None
+    source: str = "bot"
+    channel_title: str | None = None
+    status: str = "done"
+    request_id: int | None = None
+    completed_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+
+
+FlushFn = Callable[[list[RequestRecord]], Awaitable[None]]
+
+
+async def _flush_to_db(records: list[RequestRecord]) -> None:
+    """Write one batch: a multi-row INSERT plus a bulk UPDATE by primary key."""
+    inserts = [
+        {
+            "channel_identifier": r.channel_identifier,
+            "requested_by": r.requested_by,
+            "source": r.source,
+            "channel_title": r.channel_title,
+            "status": r.status,
+            "completed_at": r.completed_at,
+        }
+        for r in records
+        if r.request_id is None
+    ]
+    updates = [
+        {
+            "id": r.request_id,
+            "status": r.status,
+            "channel_title": r.channel_title,
+            "completed_at": r.completed_at,
+        }
+        for r in records
+        if r.request_id is not None
+    ]
+    async with async_session() as session:
+        if inserts:
+            await session.execute(insert(AnalysisRequest), inserts)
+        if updates:
+            await session.execute(update(AnalysisRequest), updates)
+        await session.commit()
+
+
+class RequestLogWriter:
+    """
+    In-process, bounded queue of request records flushed by a background task
+    every ``flush_ms`` or every ``batch_size`` records, whichever comes first.
+
+    ``record``/``complete`` never block: when the buffer is full the record is
+    dropped and counted. ``stop()`` drains everything still buffered.
+    """
+
+    def __init__(
+        self,
+        flush: FlushFn = _flush_to_db,
+        flush_ms: int | None = None,
+        batch_size: int | None = None,
+        max_buffer: int | None = None,
+    ):
+        self._flush = flush
+        self._interval = (flush_ms or settings.WRITE_BEHIND_FLUSH_MS) / 1000
+        self._batch_size = batch_size or settings.WRITE_BEHIND_BATCH_SIZE
+        self._queue: asyncio.Queue[RequestRecord] = asyncio.Queue(
+            maxsize=max_buffer or settings.WRITE_BEHIND_MAX_BUFFER
+        )
+        self._task: asyncio.Task | None = None
+        self._inflight: list[RequestRecord] = []
+        self.dropped = 0
+
+    # ── Producers ──────────────────────────────────────────────────────
+
+    def record(
+        self,
+        channel_identifier: str,
+        requested_by: int | None = None,
+        source: str = "bot",
+        channel_title: str | None = None,
+        status: str = "done",
+    ) -> None:
+        """Queue a new AnalysisRequest row."""
+        self._put(
+            RequestRecord(
+                channel_identifier=channel_identifier,
+                requested_by=requested_by,
+                source=source,
+                channel_title=channel_title,
+                status=status,
+            )
+        )
+
+    def complete(
+        self, request_id: int, channel_title: str | None = None, status: str = "done"
+    ) -> None:
+        """Queue a status update for an existing AnalysisRequest row."""
+        self._put(RequestRecord(request_id=request_id, channel_title=channel_title, status=status))
+
+    def _put(self, rec: RequestRecord) -> None:
+        self.start()
+        try:
+            self._queue.put_nowait(rec)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Request log buffer full — dropped record ({self.dropped} total)")
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() + len(self._inflight)
+
+    # ── Lifecycle ──────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Start the flusher task (idempotent; called lazily on first record)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write out everything still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+        remaining = self._inflight
+        self._inflight = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        for i in range(0, len(remaining), self._batch_size):
+            await self._write(remaining[i : i + self._batch_size])
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # Tracked from the first record so a cancellation mid-batch is drained by stop()
+            batch = self._inflight = [await self._queue.get()]
+            deadline = loop.time() + self._interval
+            while len(batch) < self._batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+            await self._write(batch)
+            self._inflight = []
+
+    async def _write(self, batch: list[RequestRecord]) -> None:
+        try:
+            await self._flush(batch)
+        except Exception as e:
+            logger.error(f"Request log flush failed, {len(batch)} records lost: {e}")
+
+
+request_log = RequestLogWriter()
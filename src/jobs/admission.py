@@ -0,0 +1,144 @@
+"""Admission control — bounded analysis queue with position and ETA feedback"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+
+from src.cache import get_redis
+from src.config import settings
+from src.jobs.queue import Job, JobQueue
+
+logger = logging.getLogger(__name__)
+
+_STAGE_KEY = "analysis:stage_seconds"
+_STAGE_ALPHA = 0.2
+# Assumed duration of one analysis until real stage timings have been observed
+_DEFAULT_JOB_SECONDS = 30.0
+# Time kept back for metrics, rendering and saving when a fetch has a deadline
+_MIN_POST_FETCH_SECONDS = 5.0
+_POST_FETCH_STAGES = ("metrics", "report", "saving")
+
+# EWMA seconds per pipeline stage, as observed by this process
+_stage_seconds: dict[str, float] = {}
+
+
+class QueueFullError(Exception):
+    """The wait queue is at ANALYSIS_QUEUE_LIMIT — try again after ``retry_after`` seconds."""
+
+    def __init__(self, depth: int, retry_after: float):
+        super().__init__(f"Analysis queue is full ({depth} waiting)")
+        self.depth = depth
+        self.retry_after = retry_after
+
+
+@dataclass
+class QueuePosition:
+    position: int  # 1 = next to run
+    eta_seconds: float  # until the analysis should be finished
+
+
+# ── Stage timings ──────────────────────────────────────────────────────────
+
+class StageClock:
+    """Measures how long each pipeline stage took within one analysis."""
+
+    def __init__(self):
+        self._marks: list[tuple[str, float]] = []
+
+    def mark(self, stage: str) -> None:
+        """Record the start of ``stage`` (ending the previous one)."""
+        self._marks.append((stage, time.monotonic()))
+
+    def durations(self) -> dict[str, float]:
+        """Seconds spent per stage, the last one ending now."""
+        if not self._marks:
+            return {}
+        ends = [t for _, t in self._marks[1:]] + [time.monotonic()]
+        return {stage: end - start for (stage, start), end in zip(self._marks, ends, strict=True)}
+
+
+async def record_stage_durations(durations: dict[str, float]) -> None:
+    """Fold one finished analysis into the stage EWMAs and share them via Redis (non-fatal)."""
+    for stage, seconds in durations.items():
+        prev = _stage_seconds.get(stage)
+        _stage_seconds[stage] = seconds if prev is None else prev + _STAGE_ALPHA * (seconds - prev)
+    try:
+        r = await get_redis()
+        await r.hset(_STAGE_KEY, mapping={s: round(v, 3) for s, v in _stage_seconds.items()})
+    except Exception as e:
+        logger.warning(f"Redis stage timing write error (non-fatal): {e}")
+
+
+async def observed_stage_seconds() -> dict[str, float]:
+    """Typical seconds per pipeline stage (shared Redis view, else this process')."""
+    try:
+        r = await get_redis()
+        shared = await r.hgetall(_STAGE_KEY)
+        if shared:  # fleet-wide view — workers may run in other processes
+            return {s: float(v) for s, v in shared.items()}
+    except Exception as e:
+        logger.warning(f"Redis stage timing read error (non-fatal): {e}")
+    return dict(_stage_seconds)
+
+
+async def expected_job_seconds() -> float:
+    """Typical run time of one analysis: the sum of observed stage durations."""
+    return sum((await observed_stage_seconds()).values()) or _DEFAULT_JOB_SECONDS
+
+
+async def post_fetch_seconds() -> float:
+    """Typical time from the end of fetching to a saved report."""
+    stages = await observed_stage_seconds()
+    return max(sum(stages.get(s, 0.0) for s in _POST_FETCH_STAGES), _MIN_POST_FETCH_SECONDS)
+
+
+def _slots() -> int:
+    limits = [n for n in (settings.ANALYSIS_MAX_CONCURRENCY, settings.WORKER_CONCURRENCY) if n > 0]
+    return min(limits) if limits else 1
+
+
+async def estimate_eta(position: int) -> float:
+    """Seconds until the job at ``position`` finishes: its wave of slots, plus its own run."""
+    waves = math.ceil(position / _slots())
+    return waves * await expected_job_seconds()
+
+
+# ── Admission ──────────────────────────────────────────────────────────────
+
+async def ensure_capacity(queue: JobQueue, incoming: int = 1) -> None:
+    """
+    Turn new work away if ``incoming`` more jobs would overfill the wait queue.
+
+    Call before creating any state for the submission. The check and the
+    later enqueue aren't atomic, so concurrent submitters can overshoot the
+    limit by a few jobs — it is a backpressure threshold, not a hard cap.
+
+    Raises:
+        QueueFullError: when the queue can't take ``incoming`` more jobs under
+            ANALYSIS_QUEUE_LIMIT.
+    """
+    limit = settings.ANALYSIS_QUEUE_LIMIT
+    if not limit:
+        return
+    depth = await queue.depth()
+    if depth + incoming > limit:
+        # Roughly when the backlog beyond the limit will have drained
+        raise QueueFullError(depth, retry_after=await estimate_eta(depth + incoming - limit))
+
+
+async def enqueue(queue: JobQueue, job: Job) -> QueuePosition:
+    """Enqueue an admitted job and report where it landed."""
+    await queue.enqueue(job)
+    position = await queue.position(job) or 1
+    return QueuePosition(position=position, eta_seconds=await estimate_eta(position))
+
+
+async def queue_position(queue: JobQueue, job: Job) -> QueuePosition | None:
+    """Current place in line and ETA, or None once the job has left the wait queue."""
+    position = await queue.position(job)
+    if position is None:
+        return None
+    return QueuePosition(position=position, eta_seconds=await estimate_eta(position))
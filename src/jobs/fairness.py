@@ -0,0 +1,73 @@
+"""Fair scheduling — weighted deficit round-robin across priority classes,
+round-robin across tenants within a class"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Collection, Mapping
+
+# Jobs served per DRR round: a flood of batch or API work can delay an
+# interactive bot request by at most a few jobs, and never starves anyone.
+PRIORITY_WEIGHTS: dict[str, int] = {
+    "interactive": 8,  # bot users waiting on a chat reply
+    "api": 3,  # web API callers
+    "batch": 1,  # bulk / scheduled work
+}
+DEFAULT_PRIORITY = "api"
+
+
+def normalize_priority(priority: str | None) -> str:
+    return priority if priority in PRIORITY_WEIGHTS else DEFAULT_PRIORITY
+
+
+class FairScheduler:
+    """
+    Chooses which (priority class, tenant) queue to serve next.
+
+    Classes get ``weight`` jobs per round (deficit round-robin, unit job cost);
+    tenants inside a class take turns, so one tenant with 200 queued jobs gets
+    the same share as a tenant with one.
+    """
+
+    def __init__(self, weights: Mapping[str, int] | None = None):
+        self._weights = dict(weights or PRIORITY_WEIGHTS)
+        self._classes = list(self._weights)
+        self._current = 0
+        self._deficit = {c: float(self._weights[c]) for c in self._classes}
+        self._tenants: dict[str, deque[str]] = {c: deque() for c in self._classes}
+
+    def choose(self, backlog: Mapping[str, Collection[str]]) -> tuple[str, str] | None:
+        """
+        Pick the next queue to pop.
+
+        Args:
+            backlog: priority class → tenants that currently have ready jobs.
+
+        Returns:
+            (priority, tenant), or None if nothing is ready.
+        """
+        if not any(backlog.get(c) for c in self._classes):
+            return None
+        while True:
+            cls = self._classes[self._current]
+            if backlog.get(cls) and self._deficit[cls] >= 1:
+                self._deficit[cls] -= 1
+                return cls, self._next_tenant(cls, backlog[cls])
+            if not backlog.get(cls):
+                self._deficit[cls] = 0.0  # idle classes don't bank credit
+            self._current = (self._current + 1) % len(self._classes)
+            nxt = self._classes[self._current]
+            self._deficit[nxt] += self._weights[nxt]
+
+    def _next_tenant(self, cls: str, ready: Collection[str]) -> str:
+        order = self._tenants[cls]
+        for tenant in ready:
+            if tenant not in order:
+                order.append(tenant)
+        for _ in range(len(order)):
+            tenant = order.popleft()
+            if tenant in ready:
+                order.append(tenant)
+                return tenant
+            # Drained tenant — drop it until it queues again
+        raise AssertionError("unreachable: ready tenants are always in the rotation")
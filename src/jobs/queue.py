@@ -0,0 +1,540 @@
+"""Durable job queue — Redis-backed, with an in-memory stand-in for tests and dev"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import json
+import logging
+import time
+import uuid
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+
+from src.config import settings
+from src.jobs.fairness import PRIORITY_WEIGHTS, FairScheduler, normalize_priority
+from src.observability.tracing import current_traceparent
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    kind: str  # handler name, e.g. "analysis"
+    payload: dict
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0  # deliveries so far (incremented on dequeue)
+    max_attempts: int = field(default_factory=lambda: settings.JOB_MAX_ATTEMPTS)
+    enqueued_at: float = field(default_factory=time.time)
+    last_error: str | None = None
+    priority: str = "api"  # class in PRIORITY_WEIGHTS: interactive / api / batch
+    tenant: str = "default"  # fair-share key within the class (user, client, …)
+    # Trace of the submitter, continued by the worker (see src.observability.tracing)
+    traceparent: str | None = field(default_factory=current_traceparent)
+
+    def __post_init__(self):
+        self.priority = normalize_priority(self.priority)
+
+    @property
+    def is_last_attempt(self) -> bool:
+        return self.attempts >= self.max_attempts
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, raw: str) -> Job:
+        return cls(**json.loads(raw))
+
+
+@dataclass
+class QueueStats:
+    """Backlog of one priority class."""
+
+    priority: str
+    depth: int = 0  # ready jobs
+    tenants: int = 0  # tenants with ready jobs
+    oldest_wait: float = 0.0  # seconds the oldest ready job has been queued
+    avg_wait: float | None = None  # EWMA of queue wait at dequeue (this process)
+
+
+def retry_delay(attempts: int, base: float | None = None, cap: float = 300.0) -> float:
+    """Exponential backoff: base, 2×base, 4×base, … capped at ``cap`` seconds."""
+    base = settings.JOB_RETRY_BASE_SECONDS if base is None else base
+    return min(base * 2 ** max(attempts - 1, 0), cap)
+
+
+class JobQueue:
+    """
+    At-least-once job queue with acknowledgements and visibility timeouts.
+
+    A dequeued job is leased for ``visibility_timeout`` seconds; if it is
+    neither acked nor nacked (worker crash) it becomes visible again.
+
+    Ready jobs are kept per (priority class, tenant) and dequeued by a
+    FairScheduler, so heavy submitters can't starve interactive users. At most
+    ``max_running`` jobs are leased at once, across every consumer.
+
+    A job whose lease keeps expiring is dead-lettered on the delivery after
+    its last attempt; ``on_dead`` (if set) is then awaited with it.
+    """
+
+    _WAIT_ALPHA = 0.2
+
+    def __init__(self, max_running: int | None = None):
+        if max_running is None:
+            max_running = settings.ANALYSIS_MAX_CONCURRENCY
+        self._max_running = max_running
+        self._scheduler = FairScheduler()
+        self._avg_wait: dict[str, float] = {}
+        self.on_dead: Callable[[Job], Awaitable[None]] | None = None
+
+    def _observe_wait(self, job: Job) -> None:
+        wait = max(time.time() - job.enqueued_at, 0.0)
+        prev = self._avg_wait.get(job.priority)
+        self._avg_wait[job.priority] = (
+            wait if prev is None else prev + self._WAIT_ALPHA * (wait - prev)
+        )
+
+    async def _dead_lettered(self, job: Job) -> None:
+        job.last_error = f"lease expired on each of {job.max_attempts} attempts"
+        logger.error(f"[job:{job.id}] {job.last_error} — dead-lettered")
+        if self.on_dead is not None:
+            try:
+                await self.on_dead(job)
+            except Exception as e:
+                logger.error(f"[job:{job.id}] Dead-letter handling failed: {e}")
+
+    async def enqueue(self, job: Job) -> None:
+        raise NotImplementedError
+
+    async def dequeue(self, timeout: float = 1.0) -> Job | None:
+        """Lease the next ready job, waiting up to ``timeout`` seconds."""
+        raise NotImplementedError
+
+    async def ack(self, job: Job) -> None:
+        """Job finished — forget it."""
+        raise NotImplementedError
+
+    async def nack(self, job: Job, error: str, retry_in: float | None = None) -> bool:
+        """
+        Job failed. Retries after ``retry_in`` seconds (default: exponential
+        backoff) unless attempts are exhausted or ``retry_in`` is negative, in
+        which case the job is dead-lettered. Returns True if it will be retried.
+        """
+        raise NotImplementedError
+
+    async def extend(self, job: Job) -> None:
+        """Heartbeat — push the lease deadline out by another visibility timeout."""
+        raise NotImplementedError
+
+    async def depth(self) -> int:
+        """Number of jobs ready to run (excludes delayed and leased)."""
+        return sum(s.depth for s in await self.stats())
+
+    async def stats(self) -> list[QueueStats]:
+        """Per-priority-class depth and wait times, highest priority first."""
+        raise NotImplementedError
+
+    async def position(self, job: Job) -> int | None:
+        """
+        Approximate 1-based place in line: earlier jobs of the same class plus
+        everything queued in higher classes. None once the job isn't ready
+        (running, waiting to retry, or finished).
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+# ── In-memory backend ──────────────────────────────────────────────────────
+
+class InMemoryJobQueue(JobQueue):
+    """Single-process queue with the same semantics as the Redis backend."""
+
+    def __init__(
+        self,
+        visibility_timeout: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        max_running: int | None = None,
+    ):
+        super().__init__(max_running)
+        self._visibility = visibility_timeout or settings.JOB_VISIBILITY_TIMEOUT
+        self._clock = clock
+        # priority → tenant → FIFO of ready jobs
+        self._ready: dict[str, dict[str, deque[Job]]] = {p: {} for p in PRIORITY_WEIGHTS}
+        self._delayed: list[tuple[float, int, Job]] = []  # heap of (ready_at, seq, job)
+        self._leased: dict[str, tuple[float, Job]] = {}
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+        self.dead: list[Job] = []
+
+    async def enqueue(self, job: Job) -> None:
+        self._push(job)
+        self._wakeup.set()
+
+    def _push(self, job: Job) -> None:
+        self._ready[job.priority].setdefault(job.tenant, deque()).append(job)
+
+    def _promote(self) -> None:
+        now = self._clock()
+        while self._delayed and self._delayed[0][0] <= now:
+            self._push(heapq.heappop(self._delayed)[2])
+        for job_id, (deadline, job) in list(self._leased.items()):
+            if deadline <= now:
+                logger.warning(f"Job {job_id} lease expired — making it visible again")
+                del self._leased[job_id]
+                self._push(job)
+
+    async def dequeue(self, timeout: float = 1.0) -> Job | None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            self._promote()
+            at_capacity = self._max_running and len(self._leased) >= self._max_running
+            choice = None if at_capacity else self._scheduler.choose(self._ready)
+            if choice is not None:
+                priority, tenant = choice
+                tenants = self._ready[priority]
+                job = tenants[tenant].popleft()
+                if not tenants[tenant]:
+                    del tenants[tenant]
+                job.attempts += 1
+                if job.attempts > job.max_attempts:
+                    self.dead.append(job)
+                    await self._dead_lettered(job)
+                    continue
+                self._observe_wait(job)
+                self._leased[job.id] = (self._clock() + self._visibility, job)
+                return job
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            self._wakeup.clear()
+            try:
+                # Short waits so delayed jobs and expired leases get promoted
+                await asyncio.wait_for(self._wakeup.wait(), min(remaining, 0.5))
+            except TimeoutError:
+                pass
+
+    async def ack(self, job: Job) -> None:
+        self._leased.pop(job.id, None)
+        self._wakeup.set()  # a running slot is free
+
+    async def nack(self, job: Job, error: str, retry_in: float | None = None) -> bool:
+        self._leased.pop(job.id, None)
+        job.last_error = error
+        if job.is_last_attempt or (retry_in is not None and retry_in < 0):
+            self.dead.append(job)
+            return False
+        delay = retry_delay(job.attempts) if retry_in is None else retry_in
+        self._seq += 1
+        heapq.heappush(self._delayed, (self._clock() + delay, self._seq, job))
+        self._wakeup.set()
+        return True
+
+    async def extend(self, job: Job) -> None:
+        if job.id in self._leased:
+            self._leased[job.id] = (self._clock() + self._visibility, job)
+
+    async def stats(self) -> list[QueueStats]:
+        self._promote()
+        now = time.time()
+        return [
+            QueueStats(
+                priority=priority,
+                depth=sum(len(q) for q in tenants.values()),
+                tenants=len(tenants),
+                oldest_wait=max((now - q[0].enqueued_at for q in tenants.values()), default=0.0),
+                avg_wait=self._avg_wait.get(priority),
+            )
+            for priority, tenants in self._ready.items()
+        ]
+
+    async def position(self, job: Job) -> int | None:
+        ahead = 0
+        for priority, tenants in self._ready.items():
+            queued = [j for q in tenants.values() for j in q]
+            if priority != job.priority:
+                ahead += len(queued)
+                continue
+            if not any(j.id == job.id for j in queued):
+                return None
+            return ahead + 1 + sum(j.enqueued_at < job.enqueued_at for j in queued)
+        return None
+
+
+# ── Redis backend ──────────────────────────────────────────────────────────
+
+# Move one due job (delayed or lease expired) back to its ready list; a no-op
+# if another consumer already did, or it was acked meanwhile.
+# KEYS: delayed, leased, data, ready list, tenant set, class order.
+# ARGV: job id, now, tenant, enqueued_at.
+_PROMOTE_SCRIPT = """
+local now = tonumber(ARGV[2])
+local due = false
+for _, key in ipairs({KEYS[1], KEYS[2]}) do
+    local score = redis.call('ZSCORE', key, ARGV[1])
+    if score and tonumber(score) <= now then
+        redis.call('ZREM', key, ARGV[1])
+        due = true
+    end
+end
+if not due or redis.call('HEXISTS', KEYS[3], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('LPUSH', KEYS[4], ARGV[1])
+redis.call('SADD', KEYS[5], ARGV[3])
+redis.call('ZADD', KEYS[6], ARGV[4], ARGV[1])
+return 1
+"""
+
+# Pop one job from a tenant's ready list, count the delivery and lease it;
+# drop the tenant from the class's active set once its list is empty. A job
+# past max_attempts (its worker kept dying) is dead-lettered instead.
+# Returns 0 when max_running jobs are already leased (global concurrency
+# limit), -1 if the job was acked meanwhile, else {job JSON, attempts, dead}.
+# KEYS: ready list, tenant set, leased, class order, data, attempts, dead.
+# ARGV: tenant, lease deadline, max_running.
+_LEASE_SCRIPT = """
+local max_running = tonumber(ARGV[3])
+if max_running > 0 and redis.call('ZCARD', KEYS[3]) >= max_running then
+    return 0
+end
+local id = redis.call('RPOP', KEYS[1])
+if redis.call('LLEN', KEYS[1]) == 0 then
+    redis.call('SREM', KEYS[2], ARGV[1])
+end
+if not id then
+    return nil
+end
+redis.call('ZREM', KEYS[4], id)
+local raw = redis.call('HGET', KEYS[5], id)
+if not raw then
+    return -1
+end
+local attempts = redis.call('HINCRBY', KEYS[6], id, 1)
+if attempts > tonumber(cjson.decode(raw).max_attempts) then
+    redis.call('HDEL', KEYS[5], id)
+    redis.call('HDEL', KEYS[6], id)
+    redis.call('LPUSH', KEYS[7], raw)
+    redis.call('LTRIM', KEYS[7], 0, 999)
+    return {raw, attempts, 1}
+end
+redis.call('ZADD', KEYS[3], ARGV[2], id)
+return {raw, attempts, 0}
+"""
+_AT_CAPACITY = 0
+_GONE = -1
+
+
+class RedisJobQueue(JobQueue):
+    """
+    Shared queue for API processes and dedicated workers.
+
+    Keys: ``{prefix}:data`` (hash id → job JSON),
+    ``{prefix}:ready:{priority}:{tenant}`` (lists),
+    ``{prefix}:tenants:{priority}`` (sets of tenants with ready jobs),
+    ``{prefix}:order:{priority}`` (zsets of ready jobs by enqueue time),
+    ``{prefix}:delayed`` and ``{prefix}:leased`` (zsets scored by timestamp),
+    ``{prefix}:attempts`` (hash id → deliveries), ``{prefix}:dead`` (list).
+
+    Scripts get every key they touch through KEYS, so they stay valid on a
+    cluster as long as the prefix is a hash tag (e.g. ``{jobs}``).
+
+    The fair scheduler runs in each consumer, so shares are exact per worker
+    process and approximate across a fleet.
+    """
+
+    _POLL_SECONDS = 0.2
+
+    def __init__(
+        self,
+        redis_client,
+        prefix: str = "jobs",
+        visibility_timeout: float | None = None,
+        max_running: int | None = None,
+    ):
+        super().__init__(max_running)
+        self._r = redis_client
+        self._visibility = visibility_timeout or settings.JOB_VISIBILITY_TIMEOUT
+        self._prefix = prefix
+        self._data = f"{prefix}:data"
+        self._delayed = f"{prefix}:delayed"
+        self._leased = f"{prefix}:leased"
+        self._attempts = f"{prefix}:attempts"
+        self._dead = f"{prefix}:dead"
+        self._promote = self._r.register_script(_PROMOTE_SCRIPT)
+        self._lease = self._r.register_script(_LEASE_SCRIPT)
+
+    def _ready_key(self, priority: str, tenant: str) -> str:
+        return f"{self._prefix}:ready:{priority}:{tenant}"
+
+    def _tenants_key(self, priority: str) -> str:
+        return f"{self._prefix}:tenants:{priority}"
+
+    def _order_key(self, priority: str) -> str:
+        return f"{self._prefix}:order:{priority}"
+
+    async def enqueue(self, job: Job) -> None:
+        async with self._r.pipeline(transaction=True) as pipe:
+            pipe.hset(self._data, job.id, job.to_json())
+            pipe.lpush(self._ready_key(job.priority, job.tenant), job.id)
+            pipe.sadd(self._tenants_key(job.priority), job.tenant)
+            pipe.zadd(self._order_key(job.priority), {job.id: job.enqueued_at})
+            await pipe.execute()
+
+    async def _backlog(self) -> dict[str, set[str]]:
+        async with self._r.pipeline(transaction=False) as pipe:
+            for priority in PRIORITY_WEIGHTS:
+                pipe.smembers(self._tenants_key(priority))
+            members = await pipe.execute()
+        return dict(zip(PRIORITY_WEIGHTS, members, strict=True))
+
+    async def _promote_due(self, now: float) -> None:
+        async with self._r.pipeline(transaction=False) as pipe:
+            pipe.zrangebyscore(self._delayed, "-inf", now)
+            pipe.zrangebyscore(self._leased, "-inf", now)
+            delayed, leased = await pipe.execute()
+        due = list(dict.fromkeys([*delayed, *leased]))
+        if not due:
+            return
+        for job_id, raw in zip(due, await self._r.hmget(self._data, due), strict=True):
+            if raw is None:  # acked meanwhile — only the stale entry is left
+                async with self._r.pipeline(transaction=False) as pipe:
+                    pipe.zrem(self._delayed, job_id)
+                    pipe.zrem(self._leased, job_id)
+                    await pipe.execute()
+                continue
+            job = Job.from_json(raw)
+            await self._promote(
+                keys=[
+                    self._delayed,
+                    self._leased,
+                    self._data,
+                    self._ready_key(job.priority, job.tenant),
+                    self._tenants_key(job.priority),
+                    self._order_key(job.priority),
+                ],
+                args=[job_id, now, job.tenant, job.enqueued_at],
+            )
+
+    async def dequeue(self, timeout: float = 1.0) -> Job | None:
+        deadline = time.monotonic() + timeout
+        while True:
+            now = time.time()
+            await self._promote_due(now)
+            choice = self._scheduler.choose(await self._backlog())
+            if choice is not None:
+                priority, tenant = choice
+                reply = await self._lease(
+                    keys=[
+                        self._ready_key(priority, tenant),
+                        self._tenants_key(priority),
+                        self._leased,
+                        self._order_key(priority),
+                        self._data,
+                        self._attempts,
+                        self._dead,
+                    ],
+                    args=[tenant, now + self._visibility, self._max_running],
+                )
+                if reply == _AT_CAPACITY:
+                    if time.monotonic() >= deadline:
+                        return None
+                    await asyncio.sleep(self._POLL_SECONDS)
+                    continue
+                if not reply or reply == _GONE:  # drained by another worker, or acked
+                    continue
+                raw, attempts, dead = reply
+                job = Job.from_json(raw)
+                job.attempts = int(attempts)
+                if dead:
+                    await self._dead_lettered(job)
+                    continue
+                self._observe_wait(job)
+                return job
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(self._POLL_SECONDS)
+
+    async def ack(self, job: Job) -> None:
+        async with self._r.pipeline(transaction=True) as pipe:
+            pipe.zrem(self._leased, job.id)
+            pipe.hdel(self._data, job.id)
+            pipe.hdel(self._attempts, job.id)
+            await pipe.execute()
+
+    async def nack(self, job: Job, error: str, retry_in: float | None = None) -> bool:
+        job.last_error = error
+        retry = not job.is_last_attempt and not (retry_in is not None and retry_in < 0)
+        async with self._r.pipeline(transaction=True) as pipe:
+            pipe.zrem(self._leased, job.id)
+            if retry:
+                delay = retry_delay(job.attempts) if retry_in is None else retry_in
+                pipe.hset(self._data, job.id, job.to_json())
+                pipe.zadd(self._delayed, {job.id: time.time() + delay})
+            else:
+                pipe.hdel(self._data, job.id)
+                pipe.hdel(self._attempts, job.id)
+                pipe.lpush(self._dead, job.to_json())
+                pipe.ltrim(self._dead, 0, 999)
+            await pipe.execute()
+        return retry
+
+    async def extend(self, job: Job) -> None:
+        await self._r.zadd(self._leased, {job.id: time.time() + self._visibility}, xx=True)
+
+    async def stats(self) -> list[QueueStats]:
+        now = time.time()
+        async with self._r.pipeline(transaction=False) as pipe:
+            for priority in PRIORITY_WEIGHTS:
+                pipe.zcard(self._order_key(priority))
+                pipe.scard(self._tenants_key(priority))
+                pipe.zrange(self._order_key(priority), 0, 0, withscores=True)
+            replies = await pipe.execute()
+        result = []
+        for i, priority in enumerate(PRIORITY_WEIGHTS):
+            depth, tenants, oldest = replies[3 * i : 3 * i + 3]
+            result.append(
+                QueueStats(
+                    priority=priority,
+                    depth=depth,
+                    tenants=tenants,
+                    oldest_wait=max(now - oldest[0][1], 0.0) if oldest else 0.0,
+                    avg_wait=self._avg_wait.get(priority),
+                )
+            )
+        return result
+
+    async def position(self, job: Job) -> int | None:
+        classes = list(PRIORITY_WEIGHTS)
+        higher = classes[: classes.index(job.priority)]
+        async with self._r.pipeline(transaction=False) as pipe:
+            pipe.zrank(self._order_key(job.priority), job.id)
+            for priority in higher:
+                pipe.zcard(self._order_key(priority))
+            rank, *ahead = await pipe.execute()
+        if rank is None:
+            return None
+        return rank + 1 + sum(ahead)
+
+
+# ── Factory ────────────────────────────────────────────────────────────────
+
+_queue: JobQueue | None = None
+
+
+async def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue for the configured backend."""
+    global _queue
+    if _queue is None:
+        if settings.JOB_QUEUE_BACKEND == "redis":
+            from src.cache import get_redis
+
+            _queue = RedisJobQueue(await get_redis())
+        else:
+            _queue = InMemoryJobQueue()
+    return _queue
@@ -0,0 +1,214 @@
+"""Job worker — runs queued analyses outside the API request path
+
+Run dedicated workers with:  python -m src.jobs.worker
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+
+from telethon.errors import BadRequestError, FloodWaitError
+
+from src.analyzer.fetcher import disconnect_telethon_client
+from src.analyzer.pipeline import run_analysis
+from src.cache import close_redis, publish_status
+from src.config import settings
+from src.db.repository import AnalysisRepository
+from src.db.session import async_session
+from src.db.write_behind import request_log
+from src.jobs.queue import Job, JobQueue, get_job_queue
+from src.observability import tracing
+from src.observability.loop_watchdog import loop_watchdog
+from src.observability.prometheus import start_metrics_server
+from src.reports.charts import shutdown_render_pool, start_render_pool
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Job], Awaitable[None]]
+
+
+async def run_analysis_job(job: Job) -> None:
+    """Handler for ``kind="analysis"`` jobs — payload mirrors run_analysis kwargs."""
+    p = job.payload
+    async with async_session() as session:
+        await run_analysis(
+            p["channel"],
+            session=session,
+            requested_by=p.get("requested_by"),
+            source=p.get("source", "web"),
+            max_posts=p.get("max_posts"),
+            lang=p.get("lang", "en"),
+            output=p.get("output", "pdf"),
+            profile=p.get("profile", False),
+            request_id=p["request_id"],
+            # Attempts that will be retried stay "pending" so clients don't see a
+            # transient failure; the last one, or an error not worth retrying, fails
+            record_failure=lambda e: not _will_retry(job, e),
+            # Slow fetches degrade to a report over the posts collected in time
+            deadline=time.monotonic() + settings.ANALYSIS_TIMEOUT,
+        )
+
+
+HANDLERS: dict[str, Handler] = {"analysis": run_analysis_job}
+
+
+async def record_failure(job: Job) -> None:
+    """Mark the job's analysis request failed when the job dies outside its handler."""
+    request_id = job.payload.get("request_id")
+    if request_id is None:
+        return
+    async with async_session() as session:
+        await AnalysisRepository(session).set_request_failed(request_id, job.last_error or "")
+        await session.commit()
+    await publish_status(request_id, "failed", message=job.last_error)
+
+
+def _retry_in(exc: Exception) -> float | None:
+    """Seconds until retry; None for default backoff; negative for "don't retry"."""
+    if isinstance(exc, FloodWaitError):
+        return float(exc.seconds)
+    if isinstance(exc, (ValueError, BadRequestError)):
+        return -1.0  # bad channel / not a channel — retrying won't help
+    return None
+
+
+def _will_retry(job: Job, exc: Exception) -> bool:
+    """Whether the queue retries ``job`` after ``exc`` (the same rule as JobQueue.nack)."""
+    retry_in = _retry_in(exc)
+    return not job.is_last_attempt and not (retry_in is not None and retry_in < 0)
+
+
+class Worker:
+    """Pulls jobs from a JobQueue and runs up to ``concurrency`` of them at once."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        concurrency: int | None = None,
+        handlers: dict[str, Handler] | None = None,
+    ):
+        self.queue = queue
+        self.concurrency = concurrency or settings.WORKER_CONCURRENCY
+        self.handlers = handlers or HANDLERS
+        # Jobs dead-lettered at dequeue (their worker kept dying) never reach a handler
+        queue.on_dead = record_failure
+        self._stopping = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Spawn consumer tasks on the running loop."""
+        self._stopping.clear()
+        self._tasks = [
+            asyncio.get_running_loop().create_task(self._consume(i))
+            for i in range(self.concurrency)
+        ]
+
+    def request_stop(self) -> None:
+        self._stopping.set()
+
+    async def stop(self) -> None:
+        """Finish in-flight jobs, then stop consuming."""
+        self._stopping.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run(self) -> None:
+        self.start()
+        await self._stopping.wait()
+        await self.stop()
+
+    async def _consume(self, slot: int) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = await self.queue.dequeue(timeout=1.0)
+            except Exception as e:
+                logger.error(f"[worker:{slot}] Dequeue failed: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            if job is None:
+                continue
+            try:
+                await self.process(job)
+            except Exception as e:  # ack/nack failed (e.g. Redis blip) — the lease expires
+                logger.error(f"[worker:{slot}] Job {job.id} bookkeeping failed: {e}")
+
+    async def process(self, job: Job) -> None:
+        """Run one leased job, keeping its lease alive, then ack or nack it."""
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            logger.error(f"[job:{job.id}] Unknown job kind {job.kind!r} — dead-lettering")
+            await self.queue.nack(job, f"unknown kind {job.kind!r}", retry_in=-1)
+            await record_failure(job)
+            return
+
+        heartbeat = asyncio.get_running_loop().create_task(self._heartbeat(job))
+        try:
+            with tracing.span(
+                f"job.{job.kind}",
+                {"job.id": job.id, "job.attempt": job.attempts, "job.priority": job.priority},
+                parent=job.traceparent,
+            ):
+                await handler(job)
+        except Exception as e:
+            retried = await self.queue.nack(job, str(e), retry_in=_retry_in(e))
+            logger.warning(
+                f"[job:{job.id}] Attempt {job.attempts}/{job.max_attempts} failed: {e}"
+                + (" — will retry" if retried else " — giving up")
+            )
+        else:
+            await self.queue.ack(job)
+        finally:
+            heartbeat.cancel()
+            with suppress(asyncio.CancelledError):
+                await heartbeat
+
+    async def _heartbeat(self, job: Job) -> None:
+        interval = max(settings.JOB_VISIBILITY_TIMEOUT / 3, 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.queue.extend(job)
+            except Exception as e:
+                logger.warning(f"[job:{job.id}] Lease heartbeat failed: {e}")
+
+
+async def main() -> None:
+    logger.info(
+        f"Starting worker (backend={settings.JOB_QUEUE_BACKEND}, "
+        f"concurrency={settings.WORKER_CONCURRENCY})..."
+    )
+    if settings.JOB_QUEUE_BACKEND != "redis":
+        logger.warning("JOB_QUEUE_BACKEND is not 'redis' — this worker only sees its own jobs")
+    worker = Worker(await get_job_queue())
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.request_stop)
+
+    request_log.start()
+    start_metrics_server(settings.METRICS_PORT)
+    tracing.configure("worker")
+    loop_watchdog.start()
+    start_render_pool()
+    try:
+        await worker.run()
+    finally:
+        logger.info("Worker shutting down...")
+        await request_log.stop()
+        await disconnect_telethon_client()
+        await close_redis()
+        await loop_watchdog.stop()
+        await asyncio.to_thread(shutdown_render_pool)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s [%(name)s] %(levelname)s: %(message)s"
+    )
+    asyncio.run(main())
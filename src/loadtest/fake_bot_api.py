@@ -0,0 +1,183 @@
+"""Fake Bot API server — what aiogram talks to during load tests
+
+A small aiohttp server speaking the Bot API's HTTP shape
+(``/bot<token>/<method>``). Simulated users' messages are queued with
+``push_message`` and handed to the bot through long-polled ``getUpdates``;
+everything the bot sends back is recorded per chat, so a driver can await
+the bot's next reply to a given user.
+
+Point a Bot at it with::
+
+    Bot(token, session=AiohttpSession(api=TelegramAPIServer.from_base(api.url)))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+BOT_USER = {
+    "id": 100_000,
+    "is_bot": True,
+    "first_name": "Analyticbot",
+    "username": "analyticbot_loadtest_bot",
+}
+# Methods answered with a Message object; everything else answers True
+_MESSAGE_METHODS = {"sendMessage", "sendDocument", "sendPhoto", "editMessageText"}
+
+
+@dataclass
+class SentCall:
+    """One Bot API call the bot made towards a chat."""
+
+    method: str
+    params: dict
+    at: float = field(default_factory=time.monotonic)
+
+    @property
+    def has_keyboard(self) -> bool:
+        return "reply_markup" in self.params
+
+
+class FakeBotAPI:
+    """
+    In-memory Bot API server.
+
+    Args:
+        latency_ms: Added to every API call, like the real round trip to Telegram.
+    """
+
+    def __init__(self, latency_ms: float = 0):
+        self.latency_ms = latency_ms
+        self.calls: Counter[str] = Counter()
+        self._updates: list[dict] = []
+        self._new_updates = asyncio.Condition()
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._sent: defaultdict[int, asyncio.Queue[SentCall]] = defaultdict(asyncio.Queue)
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+    # ── Lifecycle ──────────────────────────────────────────────────────
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve on ``host:port`` (0 = any free port); returns the base URL."""
+        app = web.Application(client_max_size=64 * 1024 * 1024)  # PDFs are uploaded here
+        app.router.add_route("*", "/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        bound_host, bound_port = self._runner.addresses[0][:2]
+        self.url = f"http://{bound_host}:{bound_port}"
+        logger.info(f"Fake Bot API listening on {self.url}")
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    # ── Driving simulated users ────────────────────────────────────────
+
+    async def push_message(self, user_id: int, text: str) -> None:
+        """Deliver a private-chat message from ``user_id`` to the bot."""
+        message = {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"User {user_id}"},
+            "text": text,
+        }
+        if text.startswith("/"):
+            command = text.split()[0]
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(command)}]
+        async with self._new_updates:
+            self._updates.append({"update_id": next(self._update_ids), "message": message})
+            self._new_updates.notify_all()
+
+    async def next_call(self, chat_id: int, timeout: float) -> SentCall:
+        """The next call the bot made towards ``chat_id`` (TimeoutError if none comes)."""
+        return await asyncio.wait_for(self._sent[chat_id].get(), timeout)
+
+    # ── Bot API ────────────────────────────────────────────────────────
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.calls[method] += 1
+        params = await self._params(request)
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        if method == "getUpdates":
+            result = await self._get_updates(params)
+        elif method == "getMe":
+            result = BOT_USER
+        elif method in _MESSAGE_METHODS:
+            result = self._message_result(method, params)
+        else:
+            result = True
+
+        chat_id = params.get("chat_id")
+        if chat_id is not None and method != "getUpdates":
+            self._sent[int(chat_id)].put_nowait(SentCall(method, params))
+        return web.json_response({"ok": True, "result": result})
+
+    @staticmethod
+    async def _params(request: web.Request) -> dict:
+        params: dict = dict(request.query)
+        if request.method == "POST" and request.can_read_body:
+            if request.content_type == "application/json":
+                params.update(await request.json())
+            else:
+                for key, value in (await request.post()).items():
+                    if isinstance(value, web.FileField):
+                        params[key] = {"filename": value.filename, "size": len(value.file.read())}
+                    else:
+                        params[key] = value
+        return params
+
+    async def _get_updates(self, params: dict) -> list[dict]:
+        offset = int(params.get("offset") or 0)
+        timeout = float(params.get("timeout") or 0)
+        async with self._new_updates:
+            # Confirmed updates (below offset) are forgotten, as on the real server
+            self._updates = [u for u in self._updates if u["update_id"] >= offset]
+            if not self._updates and timeout:
+                try:
+                    await asyncio.wait_for(self._new_updates.wait(), timeout)
+                except TimeoutError:
+                    pass
+            return list(self._updates)
+
+    def _message_result(self, method: str, params: dict) -> dict:
+        chat_id = int(params.get("chat_id") or 0)
+        message = {
+            "message_id": int(params.get("message_id") or next(self._message_ids)),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+        }
+        if "text" in params:
+            message["text"] = params["text"]
+        if method == "sendDocument":
+            upload = params.get("document")
+            if isinstance(upload, str) and upload.startswith("attach://"):
+                upload = params.get(upload.removeprefix("attach://"))
+            message["document"] = {
+                "file_id": f"doc{message['message_id']}",
+                "file_unique_id": f"doc{message['message_id']}",
+                "file_name": upload["filename"] if isinstance(upload, dict) else None,
+            }
+        if "reply_markup" in params:
+            markup = params["reply_markup"]
+            message["reply_markup"] = json.loads(markup) if isinstance(markup, str) else markup
+        return message
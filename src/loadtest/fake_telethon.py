@@ -0,0 +1,249 @@
+"""Fake MTProto layer — a Telethon client stand-in over synthetic channels
+
+Serves ``get_entity``, ``GetFullChannelRequest`` and ``GetHistoryRequest``
+with real Telethon types, so ``fetch_channel`` runs unchanged. Every
+channel username resolves to a deterministic synthetic channel (same name,
+same history); usernames starting with ``missing`` don't exist.
+
+Latency and FloodWaits are injected per call. Like Telethon, waits up to
+``flood_sleep_threshold`` are slept through and longer ones are raised.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from telethon.errors import FloodWaitError
+from telethon.tl.functions.channels import GetFullChannelRequest
+from telethon.tl.functions.messages import GetHistoryRequest
+from telethon.tl.types import (
+    Channel,
+    ChannelFull,
+    Document,
+    Message,
+    MessageEntityUrl,
+    MessageMediaDocument,
+    MessageMediaPhoto,
+    MessageReactions,
+    MessageReplies,
+    PeerChannel,
+    PeerNotifySettings,
+    ReactionCount,
+    ReactionEmoji,
+)
+from telethon.tl.types.messages import ChannelMessages, ChatFull
+
+from src.analyzer import fetcher
+
+_WORDS = "market update launch news review guide tips daily weekly report thread".split()
+_EMOJI = ("👍", "🔥", "❤", "😁", "🎉")
+
+
+@dataclass(frozen=True)
+class SyntheticChannel:
+    username: str
+    channel_id: int
+    title: str
+    megagroup: bool
+    members: int
+    total_posts: int
+    posts_per_day: float
+    newest: datetime
+
+    @classmethod
+    def generate(cls, username: str) -> SyntheticChannel:
+        rng = random.Random(username)
+        return cls(
+            username=username,
+            channel_id=zlib.crc32(username.encode()) or 1,
+            title=f"{username.replace('_', ' ').title()} (synthetic)",
+            megagroup=rng.random() < 0.2,
+            members=int(10 ** rng.uniform(2, 6)),
+            total_posts=rng.randint(50, 3000),
+            posts_per_day=rng.uniform(0.5, 20),
+            newest=datetime.now(UTC) - timedelta(hours=rng.uniform(0, 48)),
+        )
+
+    def entity(self) -> Channel:
+        return Channel(
+            id=self.channel_id,
+            title=self.title,
+            photo=None,
+            date=None,
+            username=self.username,
+            megagroup=self.megagroup,
+            broadcast=not self.megagroup,
+            access_hash=self.channel_id,
+            participants_count=self.members,
+        )
+
+    def full(self) -> ChatFull:
+        full_chat = ChannelFull(
+            id=self.channel_id,
+            about=f"Synthetic channel @{self.username} for load testing",
+            read_inbox_max_id=0,
+            read_outbox_max_id=0,
+            unread_count=0,
+            chat_photo=None,
+            notify_settings=PeerNotifySettings(),
+            bot_info=[],
+            pts=1,
+            participants_count=self.members,
+        )
+        return ChatFull(full_chat=full_chat, chats=[self.entity()], users=[])
+
+    def message(self, msg_id: int) -> Message:
+        """Post ``msg_id`` (1 = oldest, ``total_posts`` = newest)."""
+        rng = random.Random(f"{self.username}:{msg_id}")
+        age_days = (self.total_posts - msg_id) / self.posts_per_day
+        views = int(self.members * rng.uniform(0.05, 0.6))
+        text = " ".join(rng.choices(_WORDS, k=rng.randint(3, 40)))
+        entities = None
+        if rng.random() < 0.2:
+            entities = [MessageEntityUrl(offset=len(text) + 1, length=19)]
+            text += " https://example.com"
+
+        media = None
+        kind = rng.random()
+        if kind < 0.40:
+            media = MessageMediaPhoto(photo=None)
+        elif kind < 0.60:
+            mime = "video/mp4" if kind < 0.55 else "application/pdf"
+            media = MessageMediaDocument(
+                document=Document(
+                    id=msg_id,
+                    access_hash=0,
+                    file_reference=b"",
+                    date=None,
+                    mime_type=mime,
+                    size=0,
+                    dc_id=0,
+                    attributes=[],
+                )
+            )
+
+        reactions = None
+        if rng.random() < 0.7:
+            reactions = MessageReactions(
+                results=[
+                    ReactionCount(reaction=ReactionEmoji(emoticon=e), count=rng.randint(1, 50))
+                    for e in rng.sample(_EMOJI, rng.randint(1, 3))
+                ]
+            )
+        return Message(
+            id=msg_id,
+            peer_id=PeerChannel(self.channel_id),
+            date=self.newest - timedelta(days=age_days, minutes=rng.uniform(0, 30)),
+            message=text,
+            post=True,
+            media=media,
+            entities=entities,
+            views=views,
+            forwards=int(views * rng.uniform(0, 0.05)),
+            replies=MessageReplies(replies=rng.randint(0, 30), replies_pts=0)
+            if self.megagroup or rng.random() < 0.3
+            else None,
+            reactions=reactions,
+        )
+
+    def history(self, offset_id: int, limit: int) -> ChannelMessages:
+        """A GetHistory page: newest first, older than ``offset_id`` when given."""
+        top = self.total_posts if offset_id <= 0 else min(offset_id - 1, self.total_posts)
+        ids = range(top, max(top - limit, 0), -1)
+        return ChannelMessages(
+            pts=1,
+            count=self.total_posts,
+            messages=[self.message(i) for i in ids],
+            topics=[],
+            chats=[],
+            users=[],
+        )
+
+
+class FakeTelethonClient:
+    """
+    Drop-in for the shared ``TelegramClient`` used by ``fetch_channel``.
+
+    Args:
+        latency_ms: Mean round-trip time of each call.
+        jitter_ms: Uniform +/- spread around ``latency_ms``.
+        flood_rate: Probability (0-1) that a call gets a FloodWait.
+        flood_seconds: Wait asked for by injected FloodWaits.
+        flood_sleep_threshold: Waits up to this are slept through, longer ones raised.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        flood_rate: float = 0,
+        flood_seconds: int = 5,
+        flood_sleep_threshold: int = 60,
+        seed: int | None = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.flood_rate = flood_rate
+        self.flood_seconds = flood_seconds
+        self.flood_sleep_threshold = flood_sleep_threshold
+        self.calls: Counter[str] = Counter()
+        self.flood_waits = 0
+        self._rng = random.Random(seed)
+        self._channels: dict[str, SyntheticChannel] = {}
+        self._connected = True
+
+    # ── TelegramClient surface ─────────────────────────────────────────
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    async def start(self, *args, **kwargs) -> FakeTelethonClient:
+        self._connected = True
+        return self
+
+    async def disconnect(self) -> None:
+        self._connected = False
+
+    async def get_entity(self, username: str) -> Channel:
+        await self._round_trip("get_entity")
+        return self._channel(username).entity()
+
+    async def __call__(self, request):
+        if isinstance(request, GetFullChannelRequest):
+            await self._round_trip("GetFullChannelRequest")
+            return self._channel(request.channel.username).full()
+        if isinstance(request, GetHistoryRequest):
+            await self._round_trip("GetHistoryRequest")
+            return self._channel(request.peer.username).history(request.offset_id, request.limit)
+        raise NotImplementedError(f"FakeTelethonClient does not serve {type(request).__name__}")
+
+    # ── Internals ──────────────────────────────────────────────────────
+
+    def _channel(self, username: str) -> SyntheticChannel:
+        username = username.lstrip("@").lower()
+        if username.startswith("missing"):
+            raise ValueError(f'No user has "{username}" as username')
+        if username not in self._channels:
+            self._channels[username] = SyntheticChannel.generate(username)
+        return self._channels[username]
+
+    async def _round_trip(self, method: str) -> None:
+        self.calls[method] += 1
+        if self.latency_ms or self.jitter_ms:
+            spread = self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+            await asyncio.sleep(max(0.0, self.latency_ms + spread) / 1000)
+        if self.flood_rate and self._rng.random() < self.flood_rate:
+            self.flood_waits += 1
+            if self.flood_seconds > self.flood_sleep_threshold:
+                raise FloodWaitError(request=None, capture=self.flood_seconds)
+            await asyncio.sleep(self.flood_seconds)  # Telethon sleeps short waits itself
+
+
+def install(client: FakeTelethonClient) -> None:
+    """Make ``client`` the shared client that ``fetch_channel`` uses in this process."""
+    fetcher._client = client
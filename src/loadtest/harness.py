@@ -0,0 +1,352 @@
+"""Load-test harness — simulated users through the bot and the API, end to end
+
+Everything except Telegram is real: the bot's dispatcher long-polls a
+FakeBotAPI, API calls go through the FastAPI app in memory, and a local
+Worker runs analyses against the real database and Redis (``make
+db-start``) with a FakeTelethonClient instead of MTProto.
+
+    python -m src.loadtest.harness --bot-users 20 --api-users 20 --requests 3
+
+Each bot user sends /analyze and then a channel, and waits for the PDF;
+each API user POSTs /api/analyze, polls the status, and downloads the
+report. Requests pick from ``--channels`` synthetic channels (unique per
+run), so fewer channels means more cache hits. API users get their own
+X-Forwarded-For address — the per-IP rate limit still applies to each.
+
+Prints throughput and latency percentiles per entry point (and writes them
+as JSON with ``--json``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import secrets
+import time
+from dataclasses import asdict, dataclass, field
+
+import httpx
+from aiogram import Bot, Dispatcher
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.enums import ParseMode
+
+from src.api.main import app
+from src.bot.handlers import router
+from src.cache import close_redis
+from src.config import settings
+from src.db.session import init_db
+from src.db.write_behind import request_log
+from src.jobs.queue import get_job_queue
+from src.jobs.worker import Worker
+from src.loadtest.fake_bot_api import FakeBotAPI
+from src.loadtest.fake_telethon import FakeTelethonClient, install
+from src.observability.loop_watchdog import loop_watchdog
+
+logger = logging.getLogger(__name__)
+
+_BOT_TOKEN = "123456:LOADTEST"
+_REPLY_TIMEOUT = 30.0  # for the bot's immediate replies (prompts, cleanup)
+
+
+@dataclass
+class LoadTestConfig:
+    bot_users: int = 10
+    api_users: int = 10
+    requests: int = 3  # analyses per user, one after another
+    channels: int = 20  # distinct synthetic channels per run
+    max_posts: int = 500
+    ramp_seconds: float = 5.0  # users start evenly spread over this
+    timeout: float = 300.0  # per analysis, end to end
+    poll_interval: float = 0.5  # API status polling
+    mtproto_latency_ms: float = 150.0
+    mtproto_jitter_ms: float = 50.0
+    flood_rate: float = 0.0
+    flood_seconds: int = 5
+    bot_api_latency_ms: float = 30.0
+    seed: int | None = None
+
+
+@dataclass
+class Sample:
+    target: str  # "bot" or "api"
+    ok: bool
+    seconds: float
+    error: str | None = None
+
+
+@dataclass
+class LoadTestRun:
+    config: LoadTestConfig
+    samples: list[Sample] = field(default_factory=list)
+    wall_seconds: float = 0.0
+    extra: dict = field(default_factory=dict)
+
+
+# ── Simulated users ────────────────────────────────────────────────────────
+
+async def _bot_analysis(api: FakeBotAPI, user_id: int, channel: str, timeout: float) -> Sample:
+    """/analyze → channel → wait for the PDF (or an error reply)."""
+    await api.push_message(user_id, "/analyze")
+    while (await api.next_call(user_id, _REPLY_TIMEOUT)).method != "sendMessage":
+        pass  # stray cleanup from the previous run
+
+    started = time.monotonic()
+    await api.push_message(user_id, f"@{channel}")
+    deadline = started + timeout
+    while True:
+        try:
+            call = await api.next_call(user_id, max(deadline - time.monotonic(), 0))
+        except TimeoutError:
+            return Sample("bot", False, time.monotonic() - started, "timeout")
+        # Progress messages carry no keyboard; the PDF and error replies do
+        if call.method == "sendDocument" or (call.method == "sendMessage" and call.has_keyboard):
+            break
+    sample = Sample("bot", call.method == "sendDocument", time.monotonic() - started)
+    if not sample.ok:
+        sample.error = (call.params.get("text") or "error").splitlines()[0][:80]
+
+    # The handler clears the user's state, then deletes the progress message
+    try:
+        while (await api.next_call(user_id, _REPLY_TIMEOUT)).method != "deleteMessage":
+            pass
+    except TimeoutError:
+        pass
+    return sample
+
+
+async def _api_analysis(
+    client: httpx.AsyncClient, headers: dict, channel: str, cfg: LoadTestConfig
+) -> Sample:
+    """POST /api/analyze → poll until finished → download the report."""
+    started = time.monotonic()
+
+    def failed(error: str) -> Sample:
+        return Sample("api", False, time.monotonic() - started, error)
+
+    resp = await client.post(
+        "/api/analyze",
+        json={"channel": f"@{channel}", "max_posts": cfg.max_posts},
+        headers=headers,
+    )
+    if resp.status_code != 200:
+        return failed(f"submit HTTP {resp.status_code}")
+    analysis_id = resp.json()["analysis_id"]
+
+    deadline = started + cfg.timeout
+    while True:
+        status = (await client.get(f"/api/analysis/{analysis_id}", headers=headers)).json()
+        if status["status"] == "done":
+            break
+        if status["status"] == "failed":
+            return failed((status.get("error_message") or "failed")[:80])
+        if time.monotonic() > deadline:
+            return failed("timeout")
+        await asyncio.sleep(cfg.poll_interval)
+
+    report = await client.get(f"/api/reports/{analysis_id}/pdf", headers=headers)
+    if report.status_code != 200:
+        return failed(f"report HTTP {report.status_code}")
+    return Sample("api", True, time.monotonic() - started)
+
+
+async def _user(
+    target: str,
+    index: int,
+    start_delay: float,
+    run: LoadTestRun,
+    channels: list[str],
+    rng: random.Random,
+    api: FakeBotAPI,
+    client: httpx.AsyncClient,
+) -> None:
+    cfg = run.config
+    await asyncio.sleep(start_delay)
+    headers = {"X-Forwarded-For": f"10.{index // 250}.{index % 250}.1"}
+    if settings.API_KEY:
+        headers["X-API-Key"] = settings.API_KEY
+    for _ in range(cfg.requests):
+        channel = rng.choice(channels)
+        try:
+            if target == "bot":
+                sample = await _bot_analysis(api, 1_000_000 + index, channel, cfg.timeout)
+            else:
+                sample = await _api_analysis(client, headers, channel, cfg)
+        except Exception as e:
+            sample = Sample(target, False, 0.0, f"{type(e).__name__}: {e}"[:80])
+        run.samples.append(sample)
+
+
+# ── Run ────────────────────────────────────────────────────────────────────
+
+async def run_load_test(cfg: LoadTestConfig) -> LoadTestRun:
+    """Set up the fakes and the in-process services, drive all users, tear down."""
+    rng = random.Random(cfg.seed)
+    run_id = secrets.token_hex(3)
+    channels = [f"lt{run_id}_ch{i:03d}" for i in range(cfg.channels)]
+    run = LoadTestRun(config=cfg)
+
+    telethon = FakeTelethonClient(
+        latency_ms=cfg.mtproto_latency_ms,
+        jitter_ms=cfg.mtproto_jitter_ms,
+        flood_rate=cfg.flood_rate,
+        flood_seconds=cfg.flood_seconds,
+        seed=cfg.seed,
+    )
+    install(telethon)
+
+    # Jobs must run here, with the fake Telethon client — not on external workers
+    settings.JOB_QUEUE_BACKEND = "memory"
+    await init_db()
+    api = FakeBotAPI(latency_ms=cfg.bot_api_latency_ms)
+    await api.start()
+    request_log.start()
+    loop_watchdog.start()
+    worker = Worker(await get_job_queue())
+    worker.start()
+
+    bot = Bot(
+        token=_BOT_TOKEN,
+        session=AiohttpSession(api=TelegramAPIServer.from_base(api.url)),
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+    )
+    dp = Dispatcher()
+    dp.include_router(router)
+    polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False, polling_timeout=1))
+
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=cfg.timeout
+    )
+    users = ["bot"] * cfg.bot_users + ["api"] * cfg.api_users
+    spacing = cfg.ramp_seconds / max(len(users), 1)
+    logger.info(
+        f"Load test {run_id}: {cfg.bot_users} bot + {cfg.api_users} API users × "
+        f"{cfg.requests} analyses over {cfg.channels} channels"
+    )
+    started = time.monotonic()
+    try:
+        await asyncio.gather(
+            *(
+                _user(target, i, i * spacing, run, channels, rng, api, client)
+                for i, target in enumerate(users)
+            )
+        )
+    finally:
+        run.wall_seconds = time.monotonic() - started
+        run.extra = {
+            "mtproto_calls": dict(telethon.calls),
+            "flood_waits": telethon.flood_waits,
+            "bot_api_calls": dict(api.calls),
+            "loop_lag_ms": loop_watchdog.percentiles(),
+        }
+        await client.aclose()
+        await dp.stop_polling()
+        await polling
+        await worker.stop()
+        await request_log.stop()
+        await loop_watchdog.stop()
+        await api.stop()
+        await close_redis()
+    return run
+
+
+# ── Report ─────────────────────────────────────────────────────────────────
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(run: LoadTestRun) -> dict:
+    """Throughput and latency percentiles per target ("bot", "api", "all")."""
+    summary: dict = {"wall_seconds": round(run.wall_seconds, 2), "targets": {}, **run.extra}
+    for target in ("bot", "api", "all"):
+        samples = [s for s in run.samples if target in ("all", s.target)]
+        if not samples:
+            continue
+        ok = sorted(s.seconds for s in samples if s.ok)
+        errors: dict[str, int] = {}
+        for s in samples:
+            if not s.ok:
+                errors[s.error or "?"] = errors.get(s.error or "?", 0) + 1
+        stats = {
+            "requests": len(samples),
+            "ok": len(ok),
+            "failed": len(samples) - len(ok),
+            "throughput_per_min": round(len(ok) / max(run.wall_seconds, 1e-9) * 60, 2),
+            "errors": errors,
+        }
+        if ok:
+            stats["latency_s"] = {
+                "p50": round(_percentile(ok, 0.50), 2),
+                "p90": round(_percentile(ok, 0.90), 2),
+                "p99": round(_percentile(ok, 0.99), 2),
+                "max": round(ok[-1], 2),
+            }
+        summary["targets"][target] = stats
+    return summary
+
+
+def format_summary(summary: dict) -> str:
+    lines = [
+        f"Wall time {summary['wall_seconds']}s",
+        f"{'target':<6} {'reqs':>5} {'ok':>5} {'fail':>5} {'ok/min':>8} "
+        f"{'p50':>7} {'p90':>7} {'p99':>7} {'max':>7}",
+    ]
+    for target, s in summary["targets"].items():
+        lat = s.get("latency_s", {})
+        cols = " ".join(
+            f"{lat[k]:>6.2f}s" if k in lat else f"{'-':>7}" for k in ("p50", "p90", "p99", "max")
+        )
+        lines.append(
+            f"{target:<6} {s['requests']:>5} {s['ok']:>5} {s['failed']:>5} "
+            f"{s['throughput_per_min']:>8.2f} {cols}"
+        )
+        for error, count in s["errors"].items():
+            lines.append(f"       {count:>4} × {error}")
+    lag = summary.get("loop_lag_ms") or {}
+    if lag:
+        lines.append(
+            f"Event-loop lag p50 {lag['p50']:.1f}ms, p99 {lag['p99']:.1f}ms, "
+            f"max {lag['max']:.1f}ms"
+        )
+    lines.append(
+        f"MTProto calls {summary.get('mtproto_calls')}, FloodWaits {summary.get('flood_waits')}"
+    )
+    return "\n".join(lines)
+
+
+def _parse_args() -> tuple[LoadTestConfig, str | None]:
+    defaults = LoadTestConfig()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    for name, value in asdict(defaults).items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}",
+            type=type(value) if value is not None else int,
+            default=value,
+        )
+    parser.add_argument("--json", help="also write the summary to this file")
+    parser.add_argument("--log-level", default="WARNING")
+    args = vars(parser.parse_args())
+    json_path = args.pop("json")
+    logging.basicConfig(
+        level=args.pop("log_level").upper(),
+        format="%(asctime)s [%(name)s] %(levelname)s: %(message)s",
+    )
+    return LoadTestConfig(**args), json_path
+
+
+def main() -> None:
+    cfg, json_path = _parse_args()
+    summary = summarize(asyncio.run(run_load_test(cfg)))
+    print(format_summary(summary))
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
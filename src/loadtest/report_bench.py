@@ -0,0 +1,143 @@
+"""Report benchmark — PDF size and build time with vector vs raster charts
+
+Builds the same reports once per chart format and compares them. Metrics
+come from synthetic channels through a FakeTelethonClient, so neither
+Telegram nor the database is needed; the PDFs go to a temporary directory.
+
+    python -m src.loadtest.report_bench --channels 3 --repeat 3 --json bench.json
+
+The first report of each format is a warm-up (render pool start, font
+loading) and isn't counted. Every build starts from an empty artifact store;
+the time to reuse a stored report is listed separately.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from src.analyzer.fetcher import fetch_channel
+from src.analyzer.metrics import AnalysisMetrics, compute_metrics
+from src.loadtest.fake_telethon import FakeTelethonClient, install
+from src.reports import pdf
+from src.reports.artifact_store import ArtifactStore
+from src.reports.charts import shutdown_render_pool, start_render_pool
+
+FORMATS = ("png", "svg")
+
+
+async def synthetic_metrics(channels: int, max_posts: int) -> list[AnalysisMetrics]:
+    """Metrics of ``channels`` deterministic synthetic channels."""
+    install(FakeTelethonClient(seed=0))
+    results = [
+        await fetch_channel(f"bench_channel_{i:02d}", max_posts=max_posts)
+        for i in range(channels)
+    ]
+    return [compute_metrics(result) for result in results]
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_report_bench(
+    metrics: list[AnalysisMetrics], repeat: int = 1, formats: tuple[str, ...] = FORMATS
+) -> dict:
+    """Build every report ``repeat`` times per chart format; sizes and build times."""
+    summary: dict = {"formats": {}}
+    reports_dir, store = pdf.REPORTS_DIR, pdf.artifact_store
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep benchmark PDFs out of the real reports and artifact store
+        pdf.REPORTS_DIR = Path(tmp)
+        pdf.artifact_store = ArtifactStore(Path(tmp) / "artifacts", quota_bytes=0)
+        try:
+            for fmt in formats:
+                pdf.generate_pdf_report(metrics[0], analysis_id=0, chart_format=fmt)
+                sizes: list[int] = []
+                seconds: list[float] = []
+                for _ in range(repeat):
+                    for i, m in enumerate(metrics, 1):
+                        shutil.rmtree(pdf.artifact_store.root, ignore_errors=True)
+                        started = time.perf_counter()
+                        path = pdf.generate_pdf_report(m, analysis_id=i, chart_format=fmt)
+                        seconds.append(time.perf_counter() - started)
+                        sizes.append(Path(path).stat().st_size)
+                started = time.perf_counter()
+                pdf.generate_pdf_report(metrics[-1], analysis_id=0, chart_format=fmt)
+                reuse = time.perf_counter() - started
+                seconds.sort()
+                summary["formats"][fmt] = {
+                    "reports": len(sizes),
+                    "avg_kb": round(sum(sizes) / len(sizes) / 1024, 1),
+                    "max_kb": round(max(sizes) / 1024, 1),
+                    "build_s": {
+                        "avg": round(sum(seconds) / len(seconds), 3),
+                        "p50": round(_percentile(seconds, 0.50), 3),
+                        "max": round(seconds[-1], 3),
+                    },
+                    "reuse_s": round(reuse, 4),
+                }
+        finally:
+            pdf.REPORTS_DIR, pdf.artifact_store = reports_dir, store
+
+    png, svg = summary["formats"].get("png"), summary["formats"].get("svg")
+    if png and svg:
+        summary["svg_vs_png"] = {
+            "size_pct": round((svg["avg_kb"] / png["avg_kb"] - 1) * 100, 1),
+            "build_time_pct": round((svg["build_s"]["avg"] / png["build_s"]["avg"] - 1) * 100, 1),
+        }
+    return summary
+
+
+def format_summary(summary: dict) -> str:
+    lines = [
+        f"{'charts':<6} {'reports':>7} {'avg size':>10} {'max size':>10} "
+        f"{'avg build':>10} {'p50':>7} {'max':>7} {'reuse':>8}"
+    ]
+    for fmt, s in summary["formats"].items():
+        b = s["build_s"]
+        lines.append(
+            f"{fmt:<6} {s['reports']:>7} {s['avg_kb']:>8.1f}KB {s['max_kb']:>8.1f}KB "
+            f"{b['avg']:>9.2f}s {b['p50']:>6.2f}s {b['max']:>6.2f}s {s['reuse_s'] * 1000:>6.1f}ms"
+        )
+    diff = summary.get("svg_vs_png")
+    if diff:
+        lines.append(
+            f"svg vs png: size {diff['size_pct']:+.1f}%, build time {diff['build_time_pct']:+.1f}%"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--channels", type=int, default=3, help="distinct synthetic channels")
+    parser.add_argument("--max-posts", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3, help="builds per channel and format")
+    parser.add_argument("--json", help="also write the summary to this file")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=args.log_level.upper(),
+        format="%(asctime)s [%(name)s] %(levelname)s: %(message)s",
+    )
+
+    metrics = asyncio.run(synthetic_metrics(args.channels, args.max_posts))
+    start_render_pool()
+    try:
+        summary = run_report_bench(metrics, args.repeat)
+    finally:
+        shutdown_render_pool()
+    print(format_summary(summary))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
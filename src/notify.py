@@ -0,0 +1,30 @@
+"""Admin notifications — from the bot, the analyzer, or any process that has BOT_TOKEN"""
+
+from __future__ import annotations
+
+import logging
+
+from aiogram import Bot
+from aiogram.enums import ParseMode
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def notify_admin(text: str, bot: Bot | None = None) -> None:
+    """Send a notification to the admin if ADMIN_TELEGRAM_ID is configured."""
+    if not settings.ADMIN_ID:
+        return
+    owned = bot is None
+    if owned:
+        if not settings.BOT_TOKEN:
+            return
+        bot = Bot(token=settings.BOT_TOKEN)  # short-lived, e.g. in a worker process
+    try:
+        await bot.send_message(settings.ADMIN_ID, text, parse_mode=ParseMode.HTML)
+    except Exception as e:
+        logger.warning(f"Could not notify admin: {e}")
+    finally:
+        if owned:
+            await bot.session.close()
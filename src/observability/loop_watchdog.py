@@ -0,0 +1,171 @@
+"""Event-loop watchdog — measures scheduling lag and catches blocking calls
+
+A heartbeat task sleeps LOOP_WATCHDOG_INTERVAL_MS at a time; how late it
+wakes up is the loop's scheduling lag, exported as the
+``analyticbot_event_loop_lag_seconds`` histogram (percentiles via
+``histogram_quantile``) and logged as p50/p99/max every few minutes.
+
+A monitor thread watches the heartbeat. When it is more than
+LOOP_LAG_THRESHOLD_MS overdue, something is running synchronously on the
+loop — the thread then logs the loop thread's current stack (the coroutine
+that is blocking it, down to the synchronous call) while the stall is still
+happening.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import suppress
+
+from prometheus_client import Counter, Histogram
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+_REPORT_SECONDS = 300  # how often lag percentiles are logged
+_SAMPLES = 4096  # lag samples kept for the logged percentiles
+
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "analyticbot_event_loop_lag_seconds",
+    "How late the event loop ran a timer callback that was due",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+EVENT_LOOP_STALLS = Counter(
+    "analyticbot_event_loop_stalls_total",
+    "Times the event loop was blocked for longer than LOOP_LAG_THRESHOLD_MS",
+)
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LoopWatchdog:
+    """
+    Heartbeat task plus monitor thread for the running event loop.
+
+    ``start()`` must be called from the loop to watch; ``stop()`` ends both.
+    """
+
+    def __init__(self, interval_ms: int | None = None, threshold_ms: int | None = None):
+        if interval_ms is None:
+            interval_ms = settings.LOOP_WATCHDOG_INTERVAL_MS
+        if threshold_ms is None:
+            threshold_ms = settings.LOOP_LAG_THRESHOLD_MS
+        self._interval = interval_ms / 1000  # an explicit 0 disables the watchdog
+        self._threshold = threshold_ms / 1000
+        self._samples: deque[float] = deque(maxlen=_SAMPLES)
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id = 0
+        self._last_beat = 0.0
+        self._reported_beat = 0.0  # heartbeat whose stall has already been logged
+        self.stalls = 0
+
+    # ── Lifecycle ──────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Start watching the running loop (idempotent; no-op when the interval is 0)."""
+        if self._interval <= 0 or (self._task is not None and not self._task.done()):
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopping.clear()
+        self._task = self._loop.create_task(self._heartbeat(), name="loop-watchdog")
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Event-loop watchdog started (every {self._interval * 1000:.0f}ms, "
+            f"blocking threshold {self._threshold * 1000:.0f}ms)"
+        )
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+        self._log_percentiles()
+
+    # ── Heartbeat (on the loop) ────────────────────────────────────────
+
+    async def _heartbeat(self) -> None:
+        last_report = time.monotonic()
+        while True:
+            expected = time.monotonic() + self._interval
+            await asyncio.sleep(self._interval)
+            now = time.monotonic()
+            self._last_beat = now
+            lag = max(0.0, now - expected)
+            self._samples.append(lag)
+            EVENT_LOOP_LAG_SECONDS.observe(lag)
+            if lag >= self._threshold:
+                logger.warning(f"Event loop was blocked for {lag * 1000:.0f}ms")
+            if now - last_report >= _REPORT_SECONDS:
+                self._log_percentiles()
+                last_report = now
+
+    def percentiles(self) -> dict[str, float]:
+        """Lag in milliseconds over the recent samples (p50, p90, p99, max)."""
+        if not self._samples:
+            return {}
+        ordered = sorted(self._samples)
+        return {
+            "p50": _percentile(ordered, 0.50) * 1000,
+            "p90": _percentile(ordered, 0.90) * 1000,
+            "p99": _percentile(ordered, 0.99) * 1000,
+            "max": ordered[-1] * 1000,
+        }
+
+    def _log_percentiles(self) -> None:
+        p = self.percentiles()
+        if p:
+            logger.info(
+                f"Event-loop lag over {len(self._samples)} samples: p50 {p['p50']:.1f}ms, "
+                f"p90 {p['p90']:.1f}ms, p99 {p['p99']:.1f}ms, max {p['max']:.1f}ms"
+            )
+
+    # ── Monitor (own thread) ───────────────────────────────────────────
+
+    def _monitor(self) -> None:
+        poll = max(0.01, min(self._interval, self._threshold) / 2)
+        while not self._stopping.wait(poll):
+            beat = self._last_beat
+            overdue = time.monotonic() - beat - self._interval
+            if overdue >= self._threshold and beat != self._reported_beat:
+                self._reported_beat = beat
+                self._report_stall(overdue)
+
+    def _report_stall(self, overdue: float) -> None:
+        """Log what the loop thread is running right now — the blocking call."""
+        self.stalls += 1
+        EVENT_LOOP_STALLS.inc()
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = "".join(traceback.format_stack(frame))
+        task_name = "?"
+        with suppress(Exception):  # best effort — read from outside the loop's thread
+            task = asyncio.current_task(self._loop)
+            task_name = task.get_name() if task is not None else "(no task — a callback)"
+        logger.warning(
+            f"Event loop blocked for {overdue * 1000:.0f}ms+ in task {task_name}; "
+            f"loop thread stack:\n{stack}"
+        )
+
+
+loop_watchdog = LoopWatchdog()
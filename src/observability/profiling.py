@@ -0,0 +1,171 @@
+"""Per-analysis profiling — cProfile and tracemalloc peaks for each stage of
+run_analysis, for one chosen analysis or a sampled fraction of them
+
+Enabled per analysis (the admin's /profile command) or by sampling
+(PROFILE_SAMPLE_RATE). Output goes next to the report:
+
+    analysis_<id>/profile/<stage>.prof   — pstats dumps (snakeviz, pstats)
+    analysis_<id>/profile/summary.json   — seconds, peak allocations, top functions
+
+cProfile sees the whole event-loop thread, so work of other coroutines that
+ran while the profiled analysis was waiting shows up too; only one analysis
+per process is profiled at a time. A profiled analysis builds its report on
+that thread too, charts included (not in a worker thread or the render pool),
+so the report stage's profile shows the rendering — at the cost of blocking
+the loop meanwhile.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import html
+import json
+import logging
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.config import settings
+from src.jobs.admission import StageClock
+
+logger = logging.getLogger(__name__)
+
+_TOP_FUNCTIONS = 10
+# One profiler per process: cProfile and tracemalloc are process-wide
+_active = threading.Lock()
+
+
+def should_profile() -> bool:
+    """Sampling decision for an analysis that wasn't explicitly asked to be profiled."""
+    rate = settings.PROFILE_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+class AnalysisProfiler(StageClock):
+    """
+    A StageClock that also profiles each stage.
+
+    ``mark(stage)`` closes the previous stage's cProfile and tracemalloc
+    window and opens a new one; ``finish`` writes everything to ``out_dir``.
+    """
+
+    def __init__(self, analysis_id: int, out_dir: Path):
+        super().__init__()
+        self.analysis_id = analysis_id
+        self.out_dir = out_dir
+        self._stage: str | None = None
+        self._profile: cProfile.Profile | None = None
+        self._profiles: dict[str, cProfile.Profile] = {}
+        self._peaks: dict[str, int] = {}
+        self._owns_tracemalloc = False
+
+    @classmethod
+    def try_start(cls, analysis_id: int, out_dir: Path) -> AnalysisProfiler | None:
+        """A running profiler, or None if another analysis is being profiled."""
+        if not _active.acquire(blocking=False):
+            logger.info(f"[analysis:{analysis_id}] Not profiled — another profile is running")
+            return None
+        profiler = cls(analysis_id, out_dir)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            profiler._owns_tracemalloc = True
+        return profiler
+
+    def mark(self, stage: str) -> None:
+        self._close_stage()
+        super().mark(stage)
+        self._stage = stage
+        self._profile = cProfile.Profile()
+        try:
+            self._profile.enable()
+        except ValueError as e:  # another profiler (debugger, coverage) owns the hook
+            logger.warning(f"[analysis:{self.analysis_id}] cProfile unavailable: {e}")
+            self._profile = None
+        tracemalloc.reset_peak()
+
+    def _close_stage(self) -> None:
+        if self._stage is None:
+            return
+        if self._profile is not None:
+            self._profile.disable()
+            self._profiles[self._stage] = self._profile
+        self._peaks[self._stage] = tracemalloc.get_traced_memory()[1]
+        self._stage, self._profile = None, None
+
+    def finish(self, channel: str) -> dict:
+        """Stop profiling, write the stage dumps and summary, and return the summary."""
+        try:
+            self._close_stage()
+            durations = self.durations()
+        finally:
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+            _active.release()
+
+        summary = {
+            "analysis_id": self.analysis_id,
+            "channel": channel,
+            "created_at": time.time(),
+            "stages": {
+                stage: {
+                    "seconds": round(seconds, 3),
+                    "peak_alloc_kb": round(self._peaks.get(stage, 0) / 1024, 1),
+                    "top": _top_functions(self._profiles[stage])
+                    if stage in self._profiles
+                    else [],
+                }
+                for stage, seconds in durations.items()
+            },
+        }
+        try:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            for stage, profile in self._profiles.items():
+                profile.dump_stats(self.out_dir / f"{stage}.prof")
+            (self.out_dir / "summary.json").write_text(json.dumps(summary, indent=2))
+        except OSError as e:
+            logger.warning(f"[analysis:{self.analysis_id}] Profile not written (non-fatal): {e}")
+        else:
+            logger.info(f"[analysis:{self.analysis_id}] Profile written to {self.out_dir}")
+        return summary
+
+
+def _top_functions(profile: cProfile.Profile, limit: int = _TOP_FUNCTIONS) -> list[dict]:
+    """Functions with the most own (self) time in one stage."""
+    stats = pstats.Stats(profile).stats  # {(file, line, name): (cc, ncalls, tottime, cumtime, …)}
+    ranked = sorted(stats.items(), key=lambda kv: kv[1][2], reverse=True)[:limit]
+    return [
+        {
+            "function": f"{Path(file).name}:{line}({name})",
+            "calls": ncalls,
+            "self_s": round(tottime, 4),
+            "cum_s": round(cumtime, 4),
+        }
+        for (file, line, name), (_, ncalls, tottime, cumtime, _) in ranked
+    ]
+
+
+def format_summary(summary: dict, per_stage: int = 5) -> str:
+    """Telegram (HTML) text for the admin notification."""
+    lines = [
+        f"🔬 <b>Profile — @{html.escape(summary['channel'])}</b> "
+        f"(analysis #{summary['analysis_id']})"
+    ]
+    for stage, data in summary["stages"].items():
+        lines.append(
+            f"\n<b>{html.escape(stage)}</b> — {data['seconds']:.2f}s, "
+            f"peak {data['peak_alloc_kb'] / 1024:.1f} MB"
+        )
+        for i, fn in enumerate(data["top"][:per_stage], 1):
+            lines.append(
+                f"{i}. <code>{html.escape(fn['function'])}</code> "
+                f"{fn['self_s']:.3f}s self / {fn['cum_s']:.3f}s cum"
+            )
+    text = ""
+    for line in lines:  # whole lines only — Telegram caps messages at 4096 chars
+        if len(text) + len(line) + 1 > 4000:
+            break
+        text = f"{text}\n{line}" if text else line
+    return text
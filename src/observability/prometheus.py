@@ -0,0 +1,108 @@
+"""Prometheus instrumentation — where analyses spend their time
+
+The API exposes these on GET /metrics; the bot and dedicated workers serve
+them on METRICS_PORT (0 = off). When running several processes (uvicorn
+--workers, multiple workers) set PROMETHEUS_MULTIPROC_DIR to a shared empty
+directory so every process' samples are aggregated.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+logger = logging.getLogger(__name__)
+
+# Telegram round trips and PDF builds take seconds; cache and pool waits milliseconds
+_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+
+# ── Instruments ────────────────────────────────────────────────────────────
+
+STAGE_SECONDS = Histogram(
+    "analyticbot_stage_seconds",
+    "Time spent in one pipeline stage (resolve, fetch_page, metrics, pdf, persist)",
+    ["stage"],
+    buckets=_LATENCY_BUCKETS,
+)
+CHART_RENDER_SECONDS = Histogram(
+    "analyticbot_chart_render_seconds",
+    "Time to render one chart",
+    ["chart", "format"],
+    buckets=_LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "analyticbot_cache_requests_total",
+    "Cache lookups by tier and result",
+    ["tier", "result"],
+)
+ARTIFACT_EVICTIONS = Counter(
+    "analyticbot_artifact_evictions_total",
+    "Charts and reports evicted from the artifact store to stay under its quota",
+)
+TELETHON_FLOOD_WAITS = Counter(
+    "analyticbot_telethon_flood_waits_total",
+    "FloodWait errors raised by Telegram during fetching",
+)
+TELETHON_FLOOD_WAIT_SECONDS = Counter(
+    "analyticbot_telethon_flood_wait_seconds_total",
+    "Seconds Telegram asked us to wait in FloodWait errors",
+)
+ANALYSES_IN_PROGRESS = Gauge(
+    "analyticbot_analyses_in_progress",
+    "Analyses currently running the full pipeline",
+    multiprocess_mode="livesum",
+)
+ANALYSES_TOTAL = Counter(
+    "analyticbot_analyses_total",
+    "Analysis attempts by outcome (done, cached, failed, retried)",
+    ["outcome"],
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "analyticbot_db_pool_checkout_seconds",
+    "Time to get a connection from the DB pool (waiting, or connecting a new one)",
+    buckets=_LATENCY_BUCKETS,
+)
+
+
+def record_cache(tier: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(tier=tier, result="hit" if hit else "miss").inc()
+
+
+# ── Exposition ─────────────────────────────────────────────────────────────
+
+def _registry() -> CollectorRegistry:
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Current samples in the text exposition format, and its content type."""
+    return generate_latest(_registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int) -> None:
+    """Serve /metrics on ``port`` from a background thread (bot and worker processes)."""
+    if not port:
+        return
+    try:
+        start_http_server(port, registry=_registry())
+        logger.info(f"Prometheus metrics on :{port}/metrics")
+    except OSError as e:
+        logger.warning(f"Could not start metrics server on port {port} (non-fatal): {e}")
@@ -0,0 +1,336 @@
+"""Tracing — lightweight spans that tie one analysis together across the bot,
+API, job queue, pipeline, Telethon calls, SQL and chart rendering
+
+Trace and span ids and the ``traceparent`` format follow W3C Trace Context,
+and exported spans use OpenTelemetry's field names, so traces can be joined
+with (or replayed into) an OpenTelemetry backend. Off by default — every
+span is then a shared no-op object.
+
+TRACING_EXPORTER:
+    ""         — disabled
+    "console"  — one log line per finished span
+    "file"     — JSON lines appended to TRACING_FILE by a background writer
+                 thread, so ending a span never waits on the disk
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import inspect
+import json
+import logging
+import queue
+import re
+import secrets
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+_service = "analyticbot"
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str  # 32 hex chars
+    span_id: str  # 16 hex chars
+    parent_id: str | None = None
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: str = "UNSET"  # OpenTelemetry status codes: UNSET / OK / ERROR
+    status_description: str | None = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        """OpenTelemetry-style JSON, as the SDK's console exporter writes it."""
+        return {
+            "name": self.name,
+            "context": {"trace_id": f"0x{self.trace_id}", "span_id": f"0x{self.span_id}"},
+            "parent_id": f"0x{self.parent_id}" if self.parent_id else None,
+            "start_time": self.start_ns,
+            "end_time": self.end_ns,
+            "status": {"status_code": self.status, "description": self.status_description},
+            "attributes": self.attributes,
+            "resource": {"service.name": _service},
+        }
+
+
+class _NoopSpan:
+    """Stand-in while tracing is off — accepts and drops everything."""
+
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def enabled() -> bool:
+    return bool(settings.TRACING_EXPORTER)
+
+
+def configure(service: str) -> None:
+    """
+    Name the process in exported spans ("api", "bot", "worker"); with the
+    "file" exporter, also create TRACING_FILE's directory and start its writer.
+    """
+    global _service
+    _service = f"analyticbot-{service}"
+    if settings.TRACING_EXPORTER == "file":
+        try:
+            Path(settings.TRACING_FILE).parent.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Trace export directory unavailable (non-fatal): {e}")
+        _file_writer.start()
+
+
+# ── Context ────────────────────────────────────────────────────────────────
+
+def current_span() -> Span | _NoopSpan:
+    return _current.get() or NOOP_SPAN
+
+
+def current_traceparent() -> str | None:
+    """``traceparent`` of the active span, to carry the trace into another process."""
+    span = _current.get()
+    return span.traceparent if span else None
+
+
+def _parse_traceparent(value: str | None) -> tuple[str, str] | None:
+    m = _TRACEPARENT_RE.match((value or "").strip().lower())
+    return (m.group(1), m.group(2)) if m else None
+
+
+# ── Spans ──────────────────────────────────────────────────────────────────
+
+def start_span(
+    name: str, attributes: dict[str, Any] | None = None, parent: str | None = None
+) -> Span | None:
+    """
+    Open a span without making it current (for leaf work such as SQL
+    statements). Finish it with ``end_span``. Returns None while disabled.
+
+    ``parent`` is a ``traceparent`` from another process; without it the
+    span joins the current trace, or starts a new one.
+    """
+    if not enabled():
+        return None
+    remote = _parse_traceparent(parent)
+    local = _current.get()
+    if remote:
+        trace_id, parent_id = remote
+    elif local:
+        trace_id, parent_id = local.trace_id, local.span_id
+    else:
+        trace_id, parent_id = secrets.token_hex(16), None
+    return Span(
+        name=name,
+        trace_id=trace_id,
+        span_id=secrets.token_hex(8),
+        parent_id=parent_id,
+        attributes=dict(attributes or {}),
+    )
+
+
+def end_span(span: Span | None, error: BaseException | None = None) -> None:
+    if span is None:
+        return
+    span.end_ns = time.time_ns()
+    if error is not None:
+        span.status, span.status_description = "ERROR", f"{type(error).__name__}: {error}"
+    _export(span)
+
+
+@contextmanager
+def span(
+    name: str, attributes: dict[str, Any] | None = None, parent: str | None = None
+) -> Iterator[Span | _NoopSpan]:
+    """Run a block inside a span that becomes the parent of spans opened within it."""
+    opened = start_span(name, attributes, parent)
+    if opened is None:
+        yield NOOP_SPAN
+        return
+    token = _current.set(opened)
+    try:
+        yield opened
+    except BaseException as e:
+        end_span(opened, error=e)
+        raise
+    else:
+        end_span(opened)
+    finally:
+        _current.reset(token)
+
+
+def traced(name: str):
+    """Decorator: run each call of a sync or async function inside ``span(name)``."""
+
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware: a server span per HTTP request, continuing the caller's
+    ``traceparent`` header if it sends one and echoing the trace back.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not enabled():
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        parent = headers.get(b"traceparent", b"").decode("latin-1") or None
+        attributes = {"http.method": scope["method"], "http.target": scope["path"]}
+        with span(f"{scope['method']} {scope['path']}", attributes, parent=parent) as server:
+
+            async def send_with_trace(message):
+                if message["type"] == "http.response.start":
+                    server.set_attribute("http.status_code", message["status"])
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"traceparent", server.traceparent.encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace)
+
+
+# ── Export ─────────────────────────────────────────────────────────────────
+
+def _open_trace_file(path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)  # already there unless configure() wasn't called
+    return path.open("a", encoding="utf-8")
+
+
+class _FileWriter:
+    """
+    Appends exported spans to TRACING_FILE from one daemon thread, which keeps
+    the file open. Spans are queued by the thread that ends them; lines are
+    flushed to the OS whenever the queue runs empty.
+    """
+
+    def __init__(self):
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                if self._thread is None:
+                    atexit.register(self.close)
+                self._thread = threading.Thread(
+                    target=self._run, name="trace-writer", daemon=True
+                )
+                self._thread.start()
+
+    def write(self, path: str, line: str) -> None:
+        self.start()
+        self._queue.put((path, line))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every span queued so far is written; False on timeout."""
+        if self._thread is None:
+            return True
+        written = threading.Event()
+        self._queue.put(written)
+        return written.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        current: str | None = None
+        f = None
+        while (item := self._queue.get()) is not None:
+            if isinstance(item, threading.Event):
+                if f is not None:
+                    f.flush()
+                item.set()
+                continue
+            path, line = item
+            try:
+                if path != current:
+                    if f is not None:
+                        f.close()
+                    current, f = path, None  # on failure, don't retry for every span
+                    f = _open_trace_file(Path(path))
+                if f is not None:
+                    f.write(line + "\n")
+                    if self._queue.empty():
+                        f.flush()
+            except OSError as e:
+                logger.warning(f"Trace export failed (non-fatal): {e}")
+                f = None
+        if f is not None:
+            f.close()
+
+
+_file_writer = _FileWriter()
+
+
+def flush() -> bool:
+    """Wait for spans ended so far to reach TRACING_FILE (tests, shutdown)."""
+    return _file_writer.flush()
+
+
+def _export(span: Span) -> None:
+    exporter = settings.TRACING_EXPORTER
+    if exporter == "console":
+        parent = span.parent_id or "-"
+        logger.info(
+            f"[trace:{span.trace_id}] {span.name} {span.duration_ms:.1f}ms "
+            f"span={span.span_id} parent={parent} status={span.status}"
+        )
+    elif exporter == "file":
+        line = json.dumps(span.to_dict(), default=str, separators=(",", ":"))
+        _file_writer.write(settings.TRACING_FILE, line)
@@ -0,0 +1,199 @@
+"""Content-addressed artifact store — rendered charts and report PDFs kept once
+per content key, with LRU eviction under ARTIFACT_STORE_QUOTA_MB
+
+A key hashes everything an artifact is built from (metrics document,
+language, format, template version), so analyses that end up with identical
+metrics share one rendering. Files live at ``artifacts/<key[:2]>/<key>.<ext>``.
+A hit bumps the mtime of an empty ``<key>.<ext>.used`` marker beside the file,
+never the file itself — a report's inode is shared with the analysis
+directories it was delivered to, whose ETag and Last-Modified come from it.
+
+Reports are hard-linked into their ``analysis_<id>/`` directory (copied where
+the filesystem can't link). The quota covers what only the store holds:
+while an analysis still links a file, dropping the store's name would free
+nothing, so such files neither count towards the quota nor get evicted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager, suppress
+from pathlib import Path
+
+from src.config import settings
+from src.observability.prometheus import ARTIFACT_EVICTIONS
+from src.reports.charts import REPORTS_DIR
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_DIR = REPORTS_DIR / "artifacts"
+_LOW_WATER = 0.9  # eviction frees space down to this share of the quota
+_STRIPES = 64  # build locks, shared by keys hashing to the same stripe
+_USED = ".used"  # recency marker suffix
+
+
+def content_key(*parts: str | int | None) -> str:
+    """Key over an artifact's inputs (hash the metrics document into one part)."""
+    raw = "|".join(str(part) for part in parts)
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+def temp_path(dest: Path) -> Path:
+    """A sibling of ``dest`` to write to before ``os.replace``-ing it into place."""
+    return dest.with_name(f"{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _link_or_copy(source: Path, dest: Path) -> None:
+    """Atomically make ``dest`` a hard link to ``source`` (a copy across filesystems)."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = temp_path(dest)
+    with suppress(FileNotFoundError):
+        tmp.unlink()  # left over from a crashed writer
+    try:
+        os.link(source, tmp)
+    except OSError:  # cross-device, or a filesystem without hard links
+        shutil.copyfile(source, tmp)
+    os.replace(tmp, dest)
+
+
+class ArtifactStore:
+    """
+    Files addressed by content key, shared by every process using ``root``.
+
+    Args:
+        root: Store directory.
+        quota_bytes: Size the store is evicted back under (0 = unbounded).
+    """
+
+    def __init__(self, root: Path, quota_bytes: int):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self._usage: int | None = None  # bytes, as of the last scan plus our own puts
+        self._usage_lock = threading.Lock()
+        self._build_locks = [threading.Lock() for _ in range(_STRIPES)]
+
+    def path(self, key: str, ext: str) -> Path:
+        return self.root / key[:2] / f"{key}.{ext}"
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        """Mark ``path`` as just used (its marker, not its shared inode)."""
+        path.with_name(path.name + _USED).touch()
+
+    # ── Lookups ────────────────────────────────────────────────────────
+
+    def get(self, key: str, ext: str) -> Path | None:
+        """The artifact's path (now the most recently used), or None."""
+        path = self.path(key, ext)
+        if not path.exists():
+            return None
+        self._touch(path)
+        return path
+
+    def read(self, key: str, ext: str) -> bytes | None:
+        path = self.get(key, ext)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:  # evicted by another process in between
+            return None
+
+    def link_to(self, key: str, ext: str, dest: Path) -> bool:
+        """Hard-link the artifact to ``dest``; False when it isn't stored."""
+        path = self.get(key, ext)
+        if path is None:
+            return False
+        try:
+            _link_or_copy(path, dest)
+        except FileNotFoundError:
+            return False
+        return True
+
+    @contextmanager
+    def building(self, key: str) -> Iterator[None]:
+        """
+        Hold while checking for and building ``key``: threads building the same
+        artifact take turns, so the later ones find it stored.
+        """
+        with self._build_locks[int(key[:8], 16) % _STRIPES]:
+            yield
+
+    # ── Adding ─────────────────────────────────────────────────────────
+
+    def put(self, key: str, ext: str, data: bytes) -> Path:
+        path = self.path(key, ext)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = temp_path(path)
+        tmp.write_bytes(data)
+        os.replace(tmp, path)  # atomic — concurrent readers never see a partial file
+        self._touch(path)
+        self._added(len(data))
+        return path
+
+    def put_file(self, key: str, ext: str, source: Path) -> Path:
+        """Store ``source`` by hard-linking it, so both names share the bytes."""
+        path = self.path(key, ext)
+        _link_or_copy(source, path)
+        self._touch(path)
+        st = path.stat()
+        self._added(st.st_size if st.st_nlink == 1 else 0)  # linked: held by the analysis too
+        return path
+
+    # ── Eviction ───────────────────────────────────────────────────────
+
+    def _added(self, size: int) -> None:
+        if not self.quota_bytes:
+            return
+        with self._usage_lock:
+            if self._usage is not None:
+                self._usage += size
+            if self._usage is None or self._usage > self.quota_bytes:
+                self._evict()
+
+    def evict(self) -> int:
+        """Remove least recently used files until under the quota; returns bytes freed."""
+        with self._usage_lock:
+            return self._evict()
+
+    def _evict(self) -> int:
+        files: list[tuple[float, int, Path]] = []
+        for path in self.root.glob("*/*"):
+            if path.suffix in (".tmp", _USED):
+                continue
+            with suppress(FileNotFoundError):
+                st = path.stat()
+                if st.st_nlink > 1:  # still linked from an analysis — evicting frees nothing
+                    continue
+                used = st.st_mtime
+                with suppress(FileNotFoundError):
+                    used = path.with_name(path.name + _USED).stat().st_mtime
+                files.append((used, st.st_size, path))
+        usage = sum(size for _, size, _ in files)
+        freed = 0
+        if self.quota_bytes and usage > self.quota_bytes:
+            target = self.quota_bytes * _LOW_WATER
+            evicted = 0
+            for _, size, path in sorted(files):
+                if usage - freed <= target:
+                    break
+                with suppress(FileNotFoundError):  # another process got there first
+                    path.unlink()
+                    evicted += 1
+                with suppress(FileNotFoundError):
+                    path.with_name(path.name + _USED).unlink()
+                freed += size
+            ARTIFACT_EVICTIONS.inc(evicted)
+            logger.info(
+                f"Artifact store over quota ({usage / 2**20:.1f} MB): evicted {evicted} "
+                f"files, {freed / 2**20:.1f} MB"
+            )
+        self._usage = usage - freed
+        return freed
+
+artifact_store = ArtifactStore(ARTIFACT_DIR, settings.ARTIFACT_STORE_QUOTA_MB * 2**20)
@@ -0,0 +1,50 @@
+"""Rendered-chart cache — charts rendered on demand from stored metrics, kept
+in the artifact store keyed by (metrics hash, chart, lang, format, size)"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+
+from src.analyzer.metrics import load_metrics
+from src.observability.prometheus import record_cache
+from src.reports.artifact_store import artifact_store, content_key
+from src.reports.charts import render_charts
+
+logger = logging.getLogger(__name__)
+
+
+def chart_cache_key(
+    metrics_doc: bytes, name: str, lang: str, fmt: str, width: int | None = None
+) -> str:
+    """Content key for one rendering — doubles as the HTTP ETag."""
+    metrics_hash = hashlib.sha256(metrics_doc).hexdigest()
+    size = width if fmt == "png" else None  # SVG is resolution-independent
+    return content_key(metrics_hash, name, lang, fmt, size or "default")
+
+
+def get_or_render_chart(
+    metrics_doc: bytes, name: str, lang: str, fmt: str, width: int | None = None
+) -> tuple[str, bytes]:
+    """
+    Return (key, image bytes), rendering and caching on a miss. Blocking.
+
+    The image is b"" when the metrics don't have enough data for the chart
+    (not cached). Raises KeyError for an unknown chart name.
+    """
+    key = chart_cache_key(metrics_doc, name, lang, fmt, width)
+    data = artifact_store.read(key, fmt)
+    record_cache("chart", hit=data is not None)
+    if data is not None:
+        return key, data
+
+    with artifact_store.building(key):
+        data = artifact_store.read(key, fmt)  # rendered while we waited?
+        if data is not None:
+            return key, data
+        metrics = load_metrics(metrics_doc)
+        data = render_charts(metrics, [name], lang=lang, fmt=fmt, width=width)[name]
+        if data:
+            artifact_store.put(key, fmt, data)
+            logger.info(f"Rendered chart {name}.{fmt} ({lang}, width={width}) → {key}")
+    return key, data
@@ -1,9 +1,18 @@
-"""Chart generation for reports — matplotlib-based, saved as PNG"""
+"""Chart generation for reports — matplotlib-based, PNG or SVG (web and vector PDF charts)"""
 
 from __future__ import annotations
 
 import io
+import logging
+import multiprocessing
 import os
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
 
 import matplotlib
@@ -15,6 +24,11 @@ from datetime import datetime
 
 from src.analyzer.metrics import AnalysisMetrics
 from src.bot.i18n import format_date_short, t
+from src.config import settings
+from src.observability import tracing
+from src.observability.prometheus import CHART_RENDER_SECONDS
+
+logger = logging.getLogger(__name__)
 
 REPORTS_DIR = Path(os.getenv("REPORTS_DIR", "data/reports"))
 
@@ -47,15 +61,34 @@ def _apply_style(ax, title: str, xlabel: str = "", ylabel: str = "") -> None:
     ax.set_facecolor("white")
 
 
-def _fig_to_bytes(fig) -> bytes:
+_DEFAULT_DPI = 150
+CHART_FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+# SVG text stays <text> in the chart font instead of glyph outlines, so the PDF
+# can set it with its embedded fonts; fixed ids and no date make output repeatable
+_SVG_RC = {"svg.fonttype": "none", "svg.hashsalt": "analyticbot"}
+
+
+def _fig_to_bytes(fig, fmt: str = "png", width: int | None = None) -> bytes:
+    """Serialize a figure; ``width`` (pixels, approximate) scales PNG resolution."""
+    dpi = width / fig.get_size_inches()[0] if width else _DEFAULT_DPI
     buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=150, bbox_inches="tight", facecolor="white")
+    if fmt == "svg":
+        with plt.rc_context(_SVG_RC):
+            fig.savefig(
+                buf, format=fmt, bbox_inches="tight", facecolor="white", metadata={"Date": None}
+            )
+    else:
+        fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches="tight", facecolor="white")
     plt.close(fig)
     buf.seek(0)
     return buf.read()
 
 
-def create_views_trend_chart(metrics: AnalysisMetrics, lang: str = "en") -> bytes:
+def create_views_trend_chart(
+    metrics: AnalysisMetrics, lang: str = "en", fmt: str = "png", width: int | None = None
+) -> bytes:
     """Line chart showing daily views over time."""
     trend = metrics.views_trend
     if not trend.dates or len(trend.dates) < 2:
@@ -90,10 +123,12 @@ def create_views_trend_chart(metrics: AnalysisMetrics, lang: str = "en") -> byte
     ax1.legend(lines1 + lines2, labels1 + labels2, loc="upper left", fontsize=8)
 
     fig.tight_layout()
-    return _fig_to_bytes(fig)
+    return _fig_to_bytes(fig, fmt, width)
 
 
-def create_views_chart(metrics: AnalysisMetrics, lang: str = "en") -> bytes:
+def create_views_chart(
+    metrics: AnalysisMetrics, lang: str = "en", fmt: str = "png", width: int | None = None
+) -> bytes:
     """Horizontal bar chart of top posts by views (better for readability)."""
     top = metrics.top_posts_by_views[:10]
     if not top:
@@ -120,10 +155,12 @@ def create_views_chart(metrics: AnalysisMetrics, lang: str = "en") -> bytes:
             )
 
     fig.tight_layout()
-    return _fig_to_bytes(fig)
+    return _fig_to_bytes(fig, fmt, width)
 
 
-def create_hourly_chart(metrics: AnalysisMetrics, lang: str = "en") -> bytes:
+def create_hourly_chart(
+    metrics: AnalysisMetrics, lang: str = "en", fmt: str = "png", width: int | None = None
+) -> bytes:
     """Bar chart of posting activity by hour."""
     dist = metrics.posting_pattern.hour_distribution
     if not dist:
@@ -140,10 +177,12 @@ def create_hourly_chart(metrics: AnalysisMetrics, lang: str = "en") -> bytes:
     ax.bar(hours, counts, color=bar_colors, width=0.7)
     ax.set_xticks(range(0, 24, 2))
     fig.tight_layout()
-    return _fig_to_bytes(fig)
+    return _fig_to_bytes(fig, fmt, width)
 
 
-def create_weekday_chart(metrics: AnalysisMetrics, lang: str = "en") -> bytes:
+def create_weekday_chart(
+    metrics: AnalysisMetrics, lang: str = "en", fmt: str = "png", width: int | None = None
+) -> bytes:
     """Bar chart of posting activity by weekday."""
     dist = metrics.posting_pattern.weekday_distribution
     if not dist:
@@ -158,10 +197,12 @@ def create_weekday_chart(metrics: AnalysisMetrics, lang: str = "en") -> bytes:
     _apply_style(ax, t("chart_weekday", lang), xlabel=t("chart_day", lang), ylabel=t("chart_posts", lang))
     ax.bar(weekday_names, counts, color=bar_colors, width=0.6)
     fig.tight_layout()
-    return _fig_to_bytes(fig)
+    return _fig_to_bytes(fig, fmt, width)
 
 
-def create_content_mix_chart(metrics: AnalysisMetrics, lang: str = "en") -> bytes:
+def create_content_mix_chart(
+    metrics: AnalysisMetrics, lang: str = "en", fmt: str = "png", width: int | None = None
+) -> bytes:
     """Donut chart of content type distribution."""
     mix = metrics.content_mix
     label_keys = ["chart_text", "chart_photo", "chart_video", "chart_document", "chart_other"]
@@ -190,10 +231,12 @@ def create_content_mix_chart(metrics: AnalysisMetrics, lang: str = "en") -> byte
         at.set_fontweight("bold")
     ax.set_title(t("chart_content_mix", lang), fontsize=13, fontweight="bold", color=DARK_TEXT, pad=12)
     fig.tight_layout()
-    return _fig_to_bytes(fig)
+    return _fig_to_bytes(fig, fmt, width)
 
 
-def create_engagement_chart(metrics: AnalysisMetrics, lang: str = "en") -> bytes:
+def create_engagement_chart(
+    metrics: AnalysisMetrics, lang: str = "en", fmt: str = "png", width: int | None = None
+) -> bytes:
     """Bar chart comparing key engagement metrics."""
     eng = metrics.engagement
     if not metrics.total_posts:
@@ -225,29 +268,235 @@ def create_engagement_chart(metrics: AnalysisMetrics, lang: str = "en") -> bytes
         )
 
     fig.tight_layout()
-    return _fig_to_bytes(fig)
-
-
-def generate_all_charts(metrics: AnalysisMetrics, analysis_id: int, lang: str = "en") -> dict[str, str]:
-    """Generate all charts and save to disk. Returns {name: file_path}."""
-    chart_dir = REPORTS_DIR / f"analysis_{analysis_id}" / "charts"
-    _ensure_dir(chart_dir)
-
-    charts: dict[str, str] = {}
-    generators = {
-        "views_trend": create_views_trend_chart,
-        "views": create_views_chart,
-        "hourly": create_hourly_chart,
-        "weekday": create_weekday_chart,
-        "content_mix": create_content_mix_chart,
-        "engagement": create_engagement_chart,
-    }
-
-    for name, gen_fn in generators.items():
-        png_data = gen_fn(metrics, lang=lang)
-        if png_data:
-            path = chart_dir / f"{name}.png"
-            path.write_bytes(png_data)
-            charts[name] = str(path)
+    return _fig_to_bytes(fig, fmt, width)
+
+
+CHART_GENERATORS = {
+    "views_trend": create_views_trend_chart,
+    "views": create_views_chart,
+    "hourly": create_hourly_chart,
+    "weekday": create_weekday_chart,
+    "content_mix": create_content_mix_chart,
+    "engagement": create_engagement_chart,
+}
+
+# pyplot keeps global figure state — renders from worker threads take turns
+_render_lock = threading.Lock()
+
+
+def render_chart(
+    metrics: AnalysisMetrics,
+    name: str,
+    lang: str = "en",
+    fmt: str = "png",
+    width: int | None = None,
+) -> bytes:
+    """
+    Render one chart by name. Blocking (run it in a thread from async code).
+
+    Returns b"" when there isn't enough data for the chart. Raises KeyError
+    for an unknown chart name.
+    """
+    gen_fn = CHART_GENERATORS[name]
+    with (
+        tracing.span("chart.render", {"chart": name, "format": fmt}),
+        _render_lock,
+        CHART_RENDER_SECONDS.labels(name, fmt).time(),
+    ):
+        return gen_fn(metrics, lang=lang, fmt=fmt, width=width)
+
+
+# ── Render pool ────────────────────────────────────────────────────────────
+# pyplot can only draw one figure at a time per process, so charts render
+# concurrently in spawned worker processes. Each worker pays for matplotlib's
+# import, font loading and first draw once. After CHART_RENDER_RECYCLE renders
+# per worker the pool is swapped for a fresh one, so matplotlib's caches can't
+# grow unbounded (the old pool finishes what it was given, then exits).
+# Python 3.11's max_tasks_per_child can deadlock with queued work, so the
+# recycling is done here instead.
+
+_pool: ProcessPoolExecutor | None = None
+_pool_renders = 0  # renders handed to _pool so far
+_pool_lock = threading.Lock()
+# Set by in_process_rendering(): render on the calling thread even with a pool
+_in_process: ContextVar[bool] = ContextVar("chart_render_in_process", default=False)
+
+
+def _warm_worker() -> None:
+    """Pool initializer: load fonts and draw a throwaway figure."""
+    fig, ax = plt.subplots(figsize=(2, 1))
+    ax.plot([0, 1], [0, 1], color=BLUE)
+    _apply_style(ax, "warm-up", xlabel="x", ylabel="y")
+    ax.text(0.5, 0.5, "Ёж 123", fontweight="bold")  # Cyrillic glyphs for ru reports
+    _fig_to_bytes(fig)
+
+
+def _render_in_worker(
+    metrics: AnalysisMetrics, name: str, lang: str, fmt: str, width: int | None
+) -> tuple[bytes, float]:
+    started = time.perf_counter()
+    data = CHART_GENERATORS[name](metrics, lang=lang, fmt=fmt, width=width)
+    return data, time.perf_counter() - started
+
+
+def _noop() -> None:
+    pass
+
+
+def _new_pool(workers: int) -> ProcessPoolExecutor:
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        # spawn, not fork: the parent runs threads and an event loop
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_worker,
+    )
+    for _ in range(workers):
+        pool.submit(_noop)  # start and warm every worker now, not on the first report
+    return pool
+
+
+def _current_pool(renders: int) -> ProcessPoolExecutor | None:
+    """get_render_pool's body; the caller holds _pool_lock."""
+    global _pool, _pool_renders
+    workers = settings.CHART_RENDER_WORKERS
+    if workers <= 0:
+        return None
+    recycle = settings.CHART_RENDER_RECYCLE
+    if _pool is not None and recycle and _pool_renders >= recycle * workers:
+        _pool.shutdown(wait=False)
+        _pool = None
+        logger.info(f"Chart render pool recycled after {_pool_renders} renders")
+    if _pool is None:
+        _pool, _pool_renders = _new_pool(workers), 0
+        logger.info(f"Chart render pool started with {workers} workers")
+    _pool_renders += renders
+    return _pool
+
+
+def get_render_pool(renders: int = 0) -> ProcessPoolExecutor | None:
+    """
+    The process-wide render pool, created on first use, with ``renders``
+    counted against it. None when CHART_RENDER_WORKERS is 0.
+
+    Only for inspection: another thread may recycle the returned pool at any
+    time, after which it refuses work — render_charts submits under the lock.
+    """
+    with _pool_lock:
+        return _current_pool(renders)
+
+
+def start_render_pool() -> None:
+    """Spawn and warm the render workers at start-up."""
+    get_render_pool()
+
+
+def shutdown_render_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _discard_pool(broken: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+@contextmanager
+def in_process_rendering() -> Iterator[None]:
+    """
+    Render charts on the calling thread within this block, bypassing the pool
+    — for profiling, where work in pool processes would go unseen.
+    """
+    token = _in_process.set(True)
+    try:
+        yield
+    finally:
+        _in_process.reset(token)
+
+
+def render_charts(
+    metrics: AnalysisMetrics,
+    names: list[str],
+    lang: str = "en",
+    fmt: str = "png",
+    width: int | None = None,
+) -> dict[str, bytes]:
+    """
+    Render several charts at once in the render pool. Blocking.
+
+    Without a pool (CHART_RENDER_WORKERS=0), inside in_process_rendering() or
+    after a worker died, charts render in this thread. Values are b"" for charts without enough data;
+    raises KeyError for an unknown chart name.
+    """
+    unknown = [name for name in names if name not in CHART_GENERATORS]
+    if unknown:
+        raise KeyError(unknown[0])
+    started = time.perf_counter()
+    pending: dict[str, tuple[Future, tracing.Span | None]] = {}
+    # Submit under the lock: a concurrent recycle would otherwise shut the pool
+    # down in between, and submit() on it raises RuntimeError
+    with _pool_lock:
+        pool = None if _in_process.get() else _current_pool(renders=len(names))
+        if pool is not None:
+            for name in names:
+                span = tracing.start_span("chart.render", {"chart": name, "format": fmt})
+                try:
+                    future = pool.submit(_render_in_worker, metrics, name, lang, fmt, width)
+                except BrokenProcessPool as e:  # handled with the results below
+                    future = Future()
+                    future.set_exception(e)
+                pending[name] = (future, span)
+    if pool is None:
+        return {name: render_chart(metrics, name, lang, fmt, width) for name in names}
+
+    results: dict[str, bytes] = {}
+    timings: dict[str, float] = {}
+    for name, (future, span) in pending.items():
+        try:
+            results[name], timings[name] = future.result()
+        except BrokenProcessPool as e:
+            logger.warning(f"Chart render pool broke ({e}) — rendering {name} in-process")
+            _discard_pool(pool)
+            tracing.end_span(span, error=e)
+            results[name] = render_chart(metrics, name, lang, fmt, width)
+            continue
+        except Exception as e:
+            tracing.end_span(span, error=e)
+            raise
+        CHART_RENDER_SECONDS.labels(name, fmt).observe(timings[name])
+        if span is not None:
+            span.set_attribute("render_seconds", round(timings[name], 4))
+        tracing.end_span(span)
+
+    per_chart = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items())
+    logger.info(
+        f"Rendered {len(names)} charts in {time.perf_counter() - started:.2f}s ({per_chart})"
+    )
+    return results
+
+
+def generate_all_charts(
+    metrics: AnalysisMetrics, analysis_id: int, lang: str = "en", fmt: str = "png"
+) -> dict[str, bytes]:
+    """
+    Render every report chart. Returns {name: PNG or SVG bytes}, leaving out
+    charts without enough data.
+
+    The charts go straight into the PDF; only with SAVE_CHART_FILES are they
+    also written to ``analysis_<id>/charts/`` (for debugging).
+    """
+    rendered = render_charts(metrics, list(CHART_GENERATORS), lang=lang, fmt=fmt)
+    charts = {name: data for name, data in rendered.items() if data}
+
+    if settings.SAVE_CHART_FILES:
+        chart_dir = REPORTS_DIR / f"analysis_{analysis_id}" / "charts"
+        _ensure_dir(chart_dir)
+        for name, data in charts.items():
+            (chart_dir / f"{name}.{fmt}").write_bytes(data)
 
     return charts
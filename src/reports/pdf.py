@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import hashlib
+import io
+import logging
 import os
-from datetime import UTC, datetime
+from contextlib import suppress
 from pathlib import Path
 
 from reportlab.lib import colors
@@ -12,7 +15,9 @@ from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.lib.units import cm, mm
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.graphics.shapes import Drawing
 from reportlab.platypus import (
+    Flowable,
     Image,
     PageBreak,
     Paragraph,
@@ -21,21 +26,35 @@ from reportlab.platypus import (
     Table,
     TableStyle,
 )
+from svglib import fonts as svg_fonts
+from svglib.svglib import svg2rlg
 
-from src.analyzer.metrics import AnalysisMetrics
+from src.analyzer.metrics import AnalysisMetrics, dump_metrics
 from src.bot.i18n import format_date, t
+from src.observability import tracing
+from src.observability.prometheus import STAGE_SECONDS, record_cache
+from src.reports.artifact_store import artifact_store, content_key, temp_path
 from src.reports.charts import generate_all_charts
 
 from src.config import settings
 
+logger = logging.getLogger(__name__)
+
 REPORTS_DIR = Path(os.getenv("REPORTS_DIR", "data/reports"))
+# Part of every stored report's key — bump it when the layout or wording changes
+REPORT_TEMPLATE_VERSION = 2
 
 # ── Register Cyrillic-capable fonts ────────────────────────────────────────
+_FONT_DIR = "/usr/share/fonts/truetype/dejavu"
 _FONT = "DejaVuSans"
 _FONT_BOLD = "DejaVuSans-Bold"
-pdfmetrics.registerFont(TTFont(_FONT, "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"))
-pdfmetrics.registerFont(TTFont(_FONT_BOLD, "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"))
+pdfmetrics.registerFont(TTFont(_FONT, f"{_FONT_DIR}/DejaVuSans.ttf"))
+pdfmetrics.registerFont(TTFont(_FONT_BOLD, f"{_FONT_DIR}/DejaVuSans-Bold.ttf"))
 pdfmetrics.registerFontFamily(_FONT, normal=_FONT, bold=_FONT_BOLD)
+# Vector charts ask for matplotlib's "DejaVu Sans" (bold as weight 700) — map it
+# to the fonts above, so chart text shares the report's embedded font subsets
+for _weight, _name in (("normal", _FONT), ("bold", _FONT_BOLD), ("700", _FONT_BOLD)):
+    svg_fonts.register_font("DejaVu Sans", f"{_FONT_DIR}/{_name}.ttf", _weight, rlgFontName=_name)
 
 # ── Colors ─────────────────────────────────────────────────────────────────
 BRAND_BLUE = colors.HexColor("#229ED9")
@@ -62,6 +81,23 @@ def _cell(text: str, style: ParagraphStyle) -> Paragraph:
     return Paragraph(str(text), style)
 
 
+def _chart_flowable(chart: bytes, fmt: str, width: float, height: float) -> Flowable:
+    """
+    A flowable reading the chart straight from memory. SVG charts become
+    vector drawings scaled to fit ``width`` × ``height``; PNGs are images.
+    """
+    if fmt != "svg":
+        return Image(io.BytesIO(chart), width=width, height=height)
+    drawing: Drawing | None = svg2rlg(io.BytesIO(chart))
+    if drawing is None:
+        raise ValueError("Chart SVG could not be parsed")
+    scale = min(width / drawing.width, height / drawing.height)
+    drawing.scale(scale, scale)
+    drawing.width, drawing.height = drawing.width * scale, drawing.height * scale
+    drawing.hAlign = "CENTER"
+    return drawing
+
+
 def _styled_table(data, col_widths, header_color=BRAND_BLUE, font_size: int = 9):
     """Create a consistently styled table."""
     table = Table(data, colWidths=col_widths)
@@ -87,22 +123,70 @@ def _styled_table(data, col_widths, header_color=BRAND_BLUE, font_size: int = 9)
     return table
 
 
-def generate_pdf_report(metrics: AnalysisMetrics, analysis_id: int, lang: str = "en") -> str:
-    """Generate a PDF analytics report. Returns path to the generated PDF file."""
+@tracing.traced("report.pdf")
+@STAGE_SECONDS.labels("pdf").time()
+def generate_pdf_report(
+    metrics: AnalysisMetrics, analysis_id: int, lang: str = "en", chart_format: str | None = None
+) -> str:
+    """
+    Generate a PDF analytics report. Returns path to the generated PDF file.
+
+    Charts are embedded as ``chart_format`` ("svg" or "png"; PDF_CHART_FORMAT
+    by default). When a report with the same metrics, language and chart
+    format is in the artifact store, it is linked in instead of rebuilt.
+    """
     report_dir = REPORTS_DIR / f"analysis_{analysis_id}"
     report_dir.mkdir(parents=True, exist_ok=True)
     pdf_path = report_dir / "report.pdf"
+    fmt = chart_format or settings.PDF_CHART_FORMAT
+    key = report_key(metrics, lang, fmt)
+
+    if artifact_store.link_to(key, "pdf", pdf_path):
+        record_cache("report", hit=True)
+        logger.info(f"[analysis:{analysis_id}] Report reused from the artifact store ({key})")
+        return str(pdf_path)
+    record_cache("report", hit=False)
+
+    with artifact_store.building(key):
+        if artifact_store.link_to(key, "pdf", pdf_path):  # built while we waited
+            return str(pdf_path)
+
+        # Built aside and swapped in: an existing report.pdf may be a link
+        # shared with other analyses, so it must not be written through
+        tmp = temp_path(pdf_path)
+        try:
+            _build_report(metrics, analysis_id, lang, fmt, tmp)
+            try:
+                artifact_store.put_file(key, "pdf", tmp)
+            except OSError as e:
+                logger.warning(f"[analysis:{analysis_id}] Report not stored (non-fatal): {e}")
+            os.replace(tmp, pdf_path)
+        finally:
+            with suppress(FileNotFoundError):
+                tmp.unlink()
+    return str(pdf_path)
+
+
+def report_key(metrics: AnalysisMetrics, lang: str, chart_format: str) -> str:
+    """Artifact-store key of the report built from these inputs."""
+    metrics_hash = hashlib.sha256(dump_metrics(metrics)).hexdigest()
+    return content_key(metrics_hash, "report", lang, chart_format, REPORT_TEMPLATE_VERSION)
+
 
+def _build_report(
+    metrics: AnalysisMetrics, analysis_id: int, lang: str, fmt: str, out_path: Path
+) -> None:
     # Generate charts first
-    charts = generate_all_charts(metrics, analysis_id, lang=lang)
+    charts = generate_all_charts(metrics, analysis_id, lang=lang, fmt=fmt)
 
     doc = SimpleDocTemplate(
-        str(pdf_path),
+        str(out_path),
         pagesize=A4,
         topMargin=1.5 * cm,
         bottomMargin=1.5 * cm,
         leftMargin=2 * cm,
         rightMargin=2 * cm,
+        invariant=True,  # no build time or random document ID in the file
     )
 
     styles = getSampleStyleSheet()
@@ -162,12 +246,14 @@ def generate_pdf_report(metrics: AnalysisMetrics, analysis_id: int, lang: str =
         elements.append(
             Paragraph(f"<i>{desc_preview}</i>", ParagraphStyle("Desc", parent=small_style, fontSize=8))
         )
-    elements.append(
-        Paragraph(
-            t("pdf_generated", lang, date=datetime.now(UTC).strftime('%Y-%m-%d %H:%M UTC')),
-            small_style,
+    # Dated by the data, not the build: a stored report is handed to every
+    # analysis with the same metrics, so nothing per-build may end up in it
+    if metrics.date_to:
+        elements.append(
+            Paragraph(
+                t("pdf_data_as_of", lang, date=format_date(metrics.date_to, lang)), small_style
+            )
         )
-    )
     elements.append(Spacer(1, 6 * mm))
 
     # ── Overview table ─────────────────────────────────────────────────
@@ -208,7 +294,9 @@ def generate_pdf_report(metrics: AnalysisMetrics, analysis_id: int, lang: str =
             date_to=format_date(metrics.date_to, lang),
             days=metrics.analysis_period_days,
         )
-        if metrics.total_posts >= 500:
+        if metrics.partial_fetch:
+            note_text += t("pdf_data_note_deadline", lang)
+        elif metrics.total_posts >= 500:
             note_text += t("pdf_data_note_partial", lang)
         else:
             note_text += t("pdf_data_note_full", lang)
@@ -273,7 +361,7 @@ def generate_pdf_report(metrics: AnalysisMetrics, analysis_id: int, lang: str =
 
     if "engagement" in charts:
         elements.append(Spacer(1, 4 * mm))
-        elements.append(Image(charts["engagement"], width=13 * cm, height=7.5 * cm))
+        elements.append(_chart_flowable(charts["engagement"], fmt, width=13 * cm, height=7.5 * cm))
 
     # ── Interaction stats ──────────────────────────────────────────────
     interaction_data = [
@@ -296,7 +384,7 @@ def generate_pdf_report(metrics: AnalysisMetrics, analysis_id: int, lang: str =
     # ── Views Trend ────────────────────────────────────────────────────
     if "views_trend" in charts:
         elements.append(Paragraph(t("pdf_views_trend", lang), heading_style))
-        elements.append(Image(charts["views_trend"], width=16 * cm, height=8 * cm))
+        elements.append(_chart_flowable(charts["views_trend"], fmt, width=16 * cm, height=8 * cm))
         elements.append(Spacer(1, 2 * mm))
 
     # ── Posting Patterns ───────────────────────────────────────────────
@@ -321,11 +409,11 @@ def generate_pdf_report(metrics: AnalysisMetrics, analysis_id: int, lang: str =
 
     if "hourly" in charts:
         elements.append(Spacer(1, 3 * mm))
-        elements.append(Image(charts["hourly"], width=15 * cm, height=7 * cm))
+        elements.append(_chart_flowable(charts["hourly"], fmt, width=15 * cm, height=7 * cm))
 
     if "weekday" in charts:
         elements.append(Spacer(1, 3 * mm))
-        elements.append(Image(charts["weekday"], width=15 * cm, height=7 * cm))
+        elements.append(_chart_flowable(charts["weekday"], fmt, width=15 * cm, height=7 * cm))
 
     # ━━ PAGE 3: Content Mix + Top Posts ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     elements.append(PageBreak())
@@ -333,7 +421,7 @@ def generate_pdf_report(metrics: AnalysisMetrics, analysis_id: int, lang: str =
     # ── Content Mix ────────────────────────────────────────────────────
     elements.append(Paragraph(t("pdf_content_mix", lang), heading_style))
     if "content_mix" in charts:
-        elements.append(Image(charts["content_mix"], width=10 * cm, height=8 * cm))
+        elements.append(_chart_flowable(charts["content_mix"], fmt, width=10 * cm, height=8 * cm))
 
     # ── Top Posts by Views ─────────────────────────────────────────────
     elements.append(Paragraph(t("pdf_top_posts", lang), heading_style))
@@ -371,7 +459,7 @@ def generate_pdf_report(metrics: AnalysisMetrics, analysis_id: int, lang: str =
 
     if "views" in charts:
         elements.append(Spacer(1, 4 * mm))
-        elements.append(Image(charts["views"], width=15 * cm, height=8 * cm))
+        elements.append(_chart_flowable(charts["views"], fmt, width=15 * cm, height=8 * cm))
 
     # ── Top Posts by Engagement ────────────────────────────────────────
     if metrics.top_posts_by_engagement and metrics.member_count > 0:
@@ -419,4 +507,3 @@ def generate_pdf_report(metrics: AnalysisMetrics, analysis_id: int, lang: str =
     )
 
     doc.build(elements)
-    return str(pdf_path)
@@ -0,0 +1,44 @@
+"""Shared test data — fetched channels to compute metrics from"""
+
+from datetime import datetime, timedelta, timezone
+
+from src.analyzer.fetcher import ChannelInfo, FetchedPost, FetchResult
+
+
+def make_channel(member_count: int = 1000, username: str = "testchannel") -> ChannelInfo:
+    return ChannelInfo(
+        channel_id=1,
+        title="Test Channel",
+        username=username,
+        description=None,
+        member_count=member_count,
+        channel_type="channel",
+    )
+
+
+def make_fetch_result(
+    posts: int = 30, days: int = 10, views: int = 100, username: str = "testchannel"
+) -> FetchResult:
+    """
+    ``posts`` posts spread over ``days`` days from Monday 2026-01-05, with
+    varied hours, engagement and media. The same arguments give the same
+    metrics document (chart cache keys and ETags in tests depend on it).
+    """
+    start = datetime(2026, 1, 5, 12, tzinfo=timezone.utc)
+    return FetchResult(
+        channel=make_channel(username=username),
+        posts=[
+            FetchedPost(
+                message_id=i,
+                date=start + timedelta(days=i % days, hours=i % 7),
+                text=f"Post {i}",
+                views=views + i * 10,
+                forwards=i % 3,
+                replies=1,
+                reactions_count=i % 5,
+                media_type="photo" if i % 2 else None,
+                has_link=False,
+            )
+            for i in range(posts)
+        ],
+    )
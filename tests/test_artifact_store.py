@@ -0,0 +1,123 @@
+"""Tests for the content-addressed artifact store and report reuse"""
+
+import os
+
+import pytest
+
+from src.analyzer.metrics import compute_metrics
+from src.reports import artifact_store, charts, pdf
+from src.reports.artifact_store import ArtifactStore, content_key
+from tests.conftest import make_fetch_result
+
+
+def _metrics(views: int = 100):
+    return compute_metrics(make_fetch_result(views=views))
+
+
+class TestArtifactStore:
+    def test_put_and_read(self, tmp_path):
+        store = ArtifactStore(tmp_path, quota_bytes=0)
+        key = content_key("metrics", "hourly", "en")
+        assert store.read(key, "png") is None
+        store.put(key, "png", b"chart")
+        assert store.read(key, "png") == b"chart"
+        assert store.path(key, "png") == tmp_path / key[:2] / f"{key}.png"
+
+    def test_key_covers_every_part(self):
+        assert content_key("a", "en", 1) == content_key("a", "en", 1)
+        assert content_key("a", "en", 1) != content_key("a", "ru", 1)
+        assert content_key("a", "en", 1) != content_key("a", "en", 2)
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        store = ArtifactStore(tmp_path, quota_bytes=3500)
+        keys = [content_key(i) for i in range(3)]
+        for age, key in enumerate(keys):
+            path = store.put(key, "bin", b"x" * 1000)
+            os.utime(path.with_name(path.name + ".used"), (1000 + age, 1000 + age))
+        store.get(keys[0], "bin")  # a hit makes the oldest the most recently used
+
+        store.put(content_key(3), "bin", b"x" * 1000)
+
+        assert store.get(keys[1], "bin") is None
+        assert all(store.get(key, "bin") for key in (keys[0], keys[2], content_key(3)))
+
+    def test_unbounded_without_quota(self, tmp_path):
+        store = ArtifactStore(tmp_path, quota_bytes=0)
+        for i in range(5):
+            store.put(content_key(i), "bin", b"x" * 1000)
+        assert store.evict() == 0
+        assert len(list(tmp_path.glob("*/*.bin"))) == 5
+
+
+class TestReportReuse:
+    @pytest.fixture(autouse=True)
+    def _isolated(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(charts.settings, "CHART_RENDER_WORKERS", 0)
+        monkeypatch.setattr(pdf, "REPORTS_DIR", tmp_path)
+        monkeypatch.setattr(artifact_store.artifact_store, "root", tmp_path / "artifacts")
+        monkeypatch.setattr(artifact_store.artifact_store, "_usage", None)
+        self.builds = []
+        real_build = pdf._build_report
+
+        def counting_build(metrics, analysis_id, *args):
+            self.builds.append(analysis_id)
+            return real_build(metrics, analysis_id, *args)
+
+        monkeypatch.setattr(pdf, "_build_report", counting_build)
+
+    def test_identical_metrics_share_one_file(self):
+        first = pdf.generate_pdf_report(_metrics(), analysis_id=1)
+        second = pdf.generate_pdf_report(_metrics(), analysis_id=2)
+        assert self.builds == [1]
+        assert first != second
+        assert os.path.samefile(first, second)
+
+    def test_different_inputs_build_again(self):
+        pdf.generate_pdf_report(_metrics(), analysis_id=1)
+        pdf.generate_pdf_report(_metrics(), analysis_id=2, lang="ru")
+        pdf.generate_pdf_report(_metrics(views=500), analysis_id=3)
+        assert self.builds == [1, 2, 3]
+
+    def test_rebuild_leaves_shared_report_alone(self):
+        first = pdf.generate_pdf_report(_metrics(), analysis_id=1)
+        pdf.generate_pdf_report(_metrics(), analysis_id=2)
+        before = open(first, "rb").read()
+
+        second = pdf.generate_pdf_report(_metrics(), analysis_id=2, lang="ru")
+
+        assert open(first, "rb").read() == before
+        assert not os.path.samefile(first, second)
+
+    def test_reuse_leaves_delivered_report_untouched(self):
+        first = pdf.generate_pdf_report(_metrics(), analysis_id=1)
+        os.utime(first, (1000, 1000))
+
+        pdf.generate_pdf_report(_metrics(), analysis_id=2)
+
+        # Its mtime is the download's ETag / Last-Modified
+        assert os.stat(first).st_mtime == 1000
+
+    def test_linked_reports_are_not_evicted(self, monkeypatch):
+        path = pdf.generate_pdf_report(_metrics(), analysis_id=1)
+        monkeypatch.setattr(artifact_store.artifact_store, "quota_bytes", 1)
+
+        assert artifact_store.artifact_store.evict() == 0  # the analysis still holds it
+        pdf.generate_pdf_report(_metrics(), analysis_id=2)
+        assert self.builds == [1]
+
+        os.unlink(path)
+        os.unlink(pdf.REPORTS_DIR / "analysis_2" / "report.pdf")
+        assert artifact_store.artifact_store.evict() > 0
+        pdf.generate_pdf_report(_metrics(), analysis_id=3)
+        assert self.builds == [1, 3]
+
+    def test_report_carries_nothing_of_the_build(self):
+        first = pdf.generate_pdf_report(_metrics(), analysis_id=1)
+        key = pdf.report_key(_metrics(), "en", charts.settings.PDF_CHART_FORMAT)
+        os.unlink(artifact_store.artifact_store.path(key, "pdf"))
+
+        # Whichever analysis builds it, the shared file must be the same
+        second = pdf.generate_pdf_report(_metrics(), analysis_id=2)
+
+        assert self.builds == [1, 2]
+        assert open(first, "rb").read() == open(second, "rb").read()
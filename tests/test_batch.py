@@ -0,0 +1,186 @@
+"""Tests for batch status aggregation and the combined download"""
+
+import csv
+import io
+import zipfile
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from src import cache
+from src.api.routes import batch
+from src.api.routes.batch import (
+    BatchAnalyzeRequest,
+    BatchItemStatus,
+    _batch_reports,
+    _batch_response,
+    _write_zip,
+)
+from src.api.security import rate_limit_check, require_api_key
+from src.config import settings
+from src.db.models import AnalysisBatchItem
+from src.jobs.admission import QueueFullError
+
+
+def _batch():
+    return SimpleNamespace(id=7, created_at=None)
+
+
+def _totals() -> dict:
+    return {
+        "member_count": 1000,
+        "total_posts": 40,
+        "total_views": 4000,
+        "avg_views": 100.0,
+        "avg_engagement_rate": 1.5,
+        "avg_posts_per_day": 2.0,
+    }
+
+
+class TestBatchStatus:
+    def test_aggregates_item_statuses(self):
+        rows = [
+            (AnalysisBatchItem(channel_identifier="cached_one", result_id=1, cached=True), None),
+            (
+                AnalysisBatchItem(channel_identifier="queued", request_id=2, result_id=2),
+                SimpleNamespace(status="running", error_message=None),
+            ),
+            (AnalysisBatchItem(channel_identifier="??", error_message="Invalid channel"), None),
+        ]
+        resp = _batch_response(_batch(), rows)
+        assert resp.status == "pending"
+        assert resp.counts == {"done": 1, "running": 1, "failed": 1}
+        assert resp.items[0].cached and resp.items[0].analysis_id == 1
+        assert resp.items[2].error_message == "Invalid channel"
+
+    def test_done_when_all_terminal(self):
+        rows = [
+            (
+                AnalysisBatchItem(channel_identifier="a", request_id=1, result_id=1),
+                SimpleNamespace(status="done", error_message=None),
+            ),
+            (
+                AnalysisBatchItem(channel_identifier="b", request_id=2, result_id=2),
+                SimpleNamespace(status="failed", error_message="boom"),
+            ),
+        ]
+        resp = _batch_response(_batch(), rows)
+        assert resp.status == "done"
+        assert resp.items[1].error_message == "boom"
+
+
+class TestBatchZip:
+    def test_zip_contains_reports_and_summary(self, tmp_path):
+        pdf = tmp_path / "r.pdf"
+        pdf.write_bytes(b"%PDF-1.4 fake")
+        out = tmp_path / "batch.zip"
+        _write_zip(
+            str(out),
+            [("durov.pdf", str(pdf))],
+            [{"channel": "durov", "status": "done", "analysis_id": 1, "cached": False}],
+        )
+        with zipfile.ZipFile(out) as zf:
+            assert sorted(zf.namelist()) == ["durov.pdf", "summary.csv"]
+            rows = list(csv.DictReader(io.StringIO(zf.read("summary.csv").decode())))
+        assert rows[0]["channel"] == "durov"
+        assert rows[0]["status"] == "done"
+
+
+class TestBatchLimits:
+    def test_batch_fits_the_queue(self):
+        if settings.ANALYSIS_QUEUE_LIMIT:
+            assert batch._MAX_BATCH_CHANNELS <= settings.ANALYSIS_QUEUE_LIMIT
+        channels = [f"channel_{i}" for i in range(batch._MAX_BATCH_CHANNELS + 1)]
+        with pytest.raises(ValidationError):
+            BatchAnalyzeRequest(channels=channels)
+        assert BatchAnalyzeRequest(channels=channels[:-1]).channels == channels[:-1]
+
+
+class TestBatchReports:
+    @pytest.mark.asyncio
+    async def test_worker_cache_hit_is_resolved(self, tmp_path, monkeypatch):
+        own, shared = tmp_path / "own.pdf", tmp_path / "shared.pdf"
+        own.write_bytes(b"%PDF-1.4 own")
+        shared.write_bytes(b"%PDF-1.4 shared")
+
+        async def get_results(self, analysis_ids):
+            return {1: SimpleNamespace(analysis_id=1, report_pdf_path=str(own), **_totals())}
+
+        async def load_analysis_outcome(session, request_id, channel_input):
+            assert (request_id, channel_input) == (2, "durov")
+            metrics = SimpleNamespace(
+                **_totals(), posting_pattern=SimpleNamespace(avg_posts_per_day=2.0)
+            )
+            return metrics, str(shared)
+
+        monkeypatch.setattr(batch.AnalysisRepository, "get_results", get_results)
+        monkeypatch.setattr(batch, "load_analysis_outcome", load_analysis_outcome)
+        statuses = [
+            BatchItemStatus(channel="fresh", analysis_id=1, status="done"),
+            BatchItemStatus(channel="durov", analysis_id=2, status="done"),
+            BatchItemStatus(channel="slow", analysis_id=3, status="running"),
+        ]
+
+        reports, summary = await _batch_reports(None, 7, statuses)
+
+        assert reports == [("fresh.pdf", str(own)), ("durov.pdf", str(shared))]
+        assert [row["total_posts"] for row in summary[:2]] == [40, 40]
+        assert "total_posts" not in summary[2]
+
+
+class TestSubmitBatch:
+    def test_rejected_batch_logs_no_requests(self, tmp_path, monkeypatch):
+        report = tmp_path / "report.pdf"
+        report.write_bytes(b"%PDF-1.4 fake")
+        recorded, looked_up = [], []
+
+        async def get_cached_analyses(channels):
+            looked_up.append(channels)
+            return {"durov": {"analysis_id": 1, "pdf_path": str(report)}}
+
+        async def get_job_queue():
+            return None
+
+        async def ensure_capacity(queue, incoming=1):
+            raise QueueFullError(100, retry_after=30)
+
+        monkeypatch.setattr(batch, "get_cached_analyses", get_cached_analyses)
+        monkeypatch.setattr(batch, "get_job_queue", get_job_queue)
+        monkeypatch.setattr(batch, "ensure_capacity", ensure_capacity)
+        monkeypatch.setattr(batch.request_log, "record", lambda *a, **kw: recorded.append(a))
+        app = FastAPI()
+        app.include_router(batch.router, prefix="/api")
+        app.dependency_overrides[require_api_key] = lambda: "key"
+        app.dependency_overrides[rate_limit_check] = lambda: None
+
+        resp = TestClient(app).post(
+            "/api/analyze/batch", json={"channels": ["@durov", "t.me/Durov", "@telegram"]}
+        )
+
+        assert resp.status_code == 503
+        assert resp.headers["retry-after"] == "30"
+        assert looked_up == [["durov", "telegram"]]  # one lookup, duplicates collapsed
+        assert recorded == []
+
+
+class TestCachedAnalyses:
+    @pytest.mark.asyncio
+    async def test_one_round_trip(self, monkeypatch):
+        calls = []
+
+        class FakeRedis:
+            async def mget(self, keys):
+                calls.append(keys)
+                return ['{"analysis_id": 1}', None]
+
+        async def get_redis():
+            return FakeRedis()
+
+        monkeypatch.setattr(cache, "get_redis", get_redis)
+        assert await cache.get_cached_analyses(["Durov", "nobody"]) == {
+            "Durov": {"analysis_id": 1}
+        }
+        assert calls == [["analysis:durov", "analysis:nobody"]]
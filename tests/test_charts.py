@@ -0,0 +1,184 @@
+"""Tests for on-demand chart rendering and the rendered-chart cache"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from src.analyzer.metrics import compute_metrics, dump_metrics, load_metrics
+from src.reports import artifact_store, chart_cache, charts
+from src.reports.charts import CHART_GENERATORS, render_chart, render_charts
+from tests.conftest import make_fetch_result
+
+
+def _metrics_doc(days: int = 10) -> bytes:
+    return dump_metrics(compute_metrics(make_fetch_result(days=days)))
+
+
+class TestRenderChart:
+    def test_png_and_svg(self):
+        metrics = load_metrics(_metrics_doc())
+        assert render_chart(metrics, "hourly", fmt="png").startswith(b"\x89PNG")
+        assert b"<svg" in render_chart(metrics, "hourly", fmt="svg")[:500]
+
+    def test_unknown_chart(self):
+        with pytest.raises(KeyError):
+            render_chart(load_metrics(_metrics_doc()), "nope")
+
+
+class TestChartCache:
+    def test_key_varies_by_inputs(self):
+        doc = _metrics_doc()
+        base = chart_cache.chart_cache_key(doc, "hourly", "en", "png", 800)
+        assert base == chart_cache.chart_cache_key(doc, "hourly", "en", "png", 800)
+        assert base != chart_cache.chart_cache_key(doc, "hourly", "ru", "png", 800)
+        assert base != chart_cache.chart_cache_key(doc, "hourly", "en", "png", 1200)
+        assert base != chart_cache.chart_cache_key(doc, "weekday", "en", "png", 800)
+        assert base != chart_cache.chart_cache_key(_metrics_doc(days=5), "hourly", "en", "png", 800)
+
+    def test_svg_ignores_width(self):
+        doc = _metrics_doc()
+        assert chart_cache.chart_cache_key(doc, "views", "en", "svg", 800) == (
+            chart_cache.chart_cache_key(doc, "views", "en", "svg", None)
+        )
+
+    def test_key_is_stable(self):
+        # Served as the ETag — must not change between releases for the same rendering
+        key = chart_cache.chart_cache_key(b"doc", "hourly", "en", "png", 800)
+        assert key == "b47729f5662206b74d4713881fcd9cc3"
+
+    def test_renders_once(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(artifact_store.artifact_store, "root", tmp_path)
+        calls = []
+        real_render = chart_cache.render_charts
+
+        def counting_render(*args, **kwargs):
+            calls.extend(args[1])
+            return real_render(*args, **kwargs)
+
+        monkeypatch.setattr(chart_cache, "render_charts", counting_render)
+        doc = _metrics_doc()
+        key1, data1 = chart_cache.get_or_render_chart(doc, "hourly", "en", "png", 400)
+        key2, data2 = chart_cache.get_or_render_chart(doc, "hourly", "en", "png", 400)
+        assert key1 == key2 and data1 == data2 and data1
+        assert calls == ["hourly"]
+        assert len(list(tmp_path.rglob("*.png"))) == 1
+
+
+@pytest.fixture
+def render_pool(monkeypatch):
+    monkeypatch.setattr(charts.settings, "CHART_RENDER_WORKERS", 2)
+    monkeypatch.setattr(charts.settings, "CHART_RENDER_RECYCLE", 2)
+    charts.shutdown_render_pool()
+    yield
+    charts.shutdown_render_pool()
+
+
+class TestRenderPool:
+    def test_renders_every_chart_in_workers(self, render_pool):
+        metrics = load_metrics(_metrics_doc())
+        rendered = render_charts(metrics, list(CHART_GENERATORS), lang="ru")
+        assert list(rendered) == list(CHART_GENERATORS)
+        assert all(data.startswith(b"\x89PNG") for data in rendered.values() if data)
+        assert rendered["hourly"]
+
+    def test_unknown_chart(self, render_pool):
+        with pytest.raises(KeyError):
+            render_charts(load_metrics(_metrics_doc()), ["hourly", "nope"])
+
+    def test_pool_is_recycled(self, render_pool):
+        first = charts.get_render_pool(renders=3)
+        assert charts.get_render_pool(renders=1) is first
+        fresh = charts.get_render_pool()  # two workers × two renders reached
+        assert fresh is not first
+        assert render_charts(load_metrics(_metrics_doc()), ["hourly"])["hourly"]
+
+    def test_concurrent_recycles_dont_reject_renders(self, render_pool, monkeypatch):
+        monkeypatch.setattr(charts.settings, "CHART_RENDER_WORKERS", 1)
+        monkeypatch.setattr(charts.settings, "CHART_RENDER_RECYCLE", 1)  # every render
+        monkeypatch.setattr(charts, "_new_pool", lambda workers: ThreadPoolExecutor(workers))
+        monkeypatch.setattr(charts, "_render_in_worker", lambda *args: (b"chart", 0.0))
+
+        def slow_span(*args):
+            time.sleep(0.001)  # widen the gap between picking the pool and submitting
+
+        monkeypatch.setattr(charts.tracing, "start_span", slow_span)
+        metrics = load_metrics(_metrics_doc())
+
+        def render(_):
+            return render_charts(metrics, ["hourly"])["hourly"]
+
+        with ThreadPoolExecutor(8) as callers:
+            assert set(callers.map(render, range(200))) == {b"chart"}
+
+    def test_disabled_renders_in_process(self, monkeypatch):
+        monkeypatch.setattr(charts.settings, "CHART_RENDER_WORKERS", 0)
+        assert charts.get_render_pool() is None
+        assert render_charts(load_metrics(_metrics_doc()), ["weekday"])["weekday"]
+
+
+class TestReportCharts:
+    @pytest.fixture(autouse=True)
+    def _in_process(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(charts.settings, "CHART_RENDER_WORKERS", 0)
+        monkeypatch.setattr(charts, "REPORTS_DIR", tmp_path)
+        monkeypatch.setattr(artifact_store.artifact_store, "root", tmp_path / "artifacts")
+
+    def test_charts_stay_in_memory(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(charts.settings, "SAVE_CHART_FILES", False)
+        rendered = charts.generate_all_charts(load_metrics(_metrics_doc()), 7)
+        assert rendered and all(data.startswith(b"\x89PNG") for data in rendered.values())
+        assert not any(tmp_path.iterdir())
+
+    def test_debug_copies_on_disk(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(charts.settings, "SAVE_CHART_FILES", True)
+        rendered = charts.generate_all_charts(load_metrics(_metrics_doc()), 7)
+        saved = {p.stem: p.read_bytes() for p in (tmp_path / "analysis_7" / "charts").iterdir()}
+        assert saved == rendered
+
+    def test_pdf_embeds_in_memory_charts(self, tmp_path, monkeypatch):
+        from src.reports import pdf
+
+        monkeypatch.setattr(pdf, "REPORTS_DIR", tmp_path)
+        path = pdf.generate_pdf_report(
+            load_metrics(_metrics_doc()), analysis_id=8, chart_format="png"
+        )
+        assert path.endswith("report.pdf")
+        assert sorted(p.name for p in (tmp_path / "analysis_8").iterdir()) == ["report.pdf"]
+        assert (tmp_path / "analysis_8" / "report.pdf").read_bytes().count(b"/Subtype /Image") >= 4
+
+    def test_svg_charts_are_repeatable_text(self):
+        metrics = load_metrics(_metrics_doc())
+        first = charts.generate_all_charts(metrics, 7, fmt="svg")
+        assert first == charts.generate_all_charts(metrics, 7, fmt="svg")
+        assert b"<text" in first["hourly"] and b"DejaVu Sans" in first["hourly"]
+
+    def test_pdf_draws_vector_charts(self, tmp_path, monkeypatch):
+        from src.reports import pdf
+
+        monkeypatch.setattr(pdf, "REPORTS_DIR", tmp_path)
+        metrics = load_metrics(_metrics_doc())
+        vector = Path(pdf.generate_pdf_report(metrics, 8, lang="ru", chart_format="svg"))
+        raster = Path(pdf.generate_pdf_report(metrics, 9, lang="ru", chart_format="png"))
+        assert b"/Subtype /Image" not in vector.read_bytes()
+        assert vector.stat().st_size < raster.stat().st_size / 2
+
+    def test_vector_chart_uses_report_fonts(self):
+        from reportlab.graphics.shapes import String
+
+        from src.reports import pdf
+
+        svg = charts.generate_all_charts(load_metrics(_metrics_doc()), 7, lang="ru", fmt="svg")
+        drawing = pdf._chart_flowable(svg["hourly"], "svg", width=300, height=100)
+        assert drawing.width <= 300 and drawing.height == pytest.approx(100)
+
+        fonts: set[str] = set()
+        nodes = [drawing]
+        while nodes:
+            node = nodes.pop()
+            if isinstance(node, String):
+                fonts.add(node.fontName)
+            nodes.extend(getattr(node, "contents", []))
+        # The bold title as well — not a Latin-only Helvetica fallback
+        assert fonts == {"DejaVuSans", "DejaVuSans-Bold"}
@@ -0,0 +1,193 @@
+"""Tests for the status subscription and the SSE / WebSocket progress streams"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from src import cache
+from src.api.routes import events
+
+
+def _event(status: str, stage: str | None = None) -> dict:
+    return {"analysis_id": 7, "status": status, "stage": stage, "message": None}
+
+
+class _FakePubSub:
+    def __init__(self, published: list[dict]):
+        self.published = published
+        self.channels: list[str] = []
+        self.closed = False
+
+    async def subscribe(self, channel):
+        self.channels.append(channel)
+
+    async def unsubscribe(self):
+        self.channels.clear()
+
+    async def aclose(self):
+        self.closed = True
+
+    async def get_message(self, ignore_subscribe_messages, timeout):
+        if self.published:
+            return {"type": "message", "data": json.dumps(self.published.pop(0))}
+        await asyncio.sleep(timeout)
+        return None
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.live: dict[str, dict] = {}  # status key → last published event
+        self.published: list[dict] = []  # delivered to the next subscriber, in order
+        self.pubsubs: list[_FakePubSub] = []
+
+    def pubsub(self):
+        pubsub = _FakePubSub(self.published)
+        self.pubsubs.append(pubsub)
+        return pubsub
+
+    async def get(self, key):
+        return json.dumps(self.live[key]) if key in self.live else None
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = _FakeRedis()
+
+    async def get_redis():
+        return fake
+
+    monkeypatch.setattr(cache, "get_redis", get_redis)
+    monkeypatch.setattr(events, "_KEEPALIVE_SECONDS", 0.01)
+    return fake
+
+
+@pytest.fixture
+def db_status(monkeypatch):
+    statuses = {7: "running"}
+
+    async def get_request_status(analysis_id):
+        return statuses.get(analysis_id)
+
+    monkeypatch.setattr(events, "_get_request_status", get_request_status)
+    return statuses
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(events.router, prefix="/api")
+    return TestClient(app)
+
+
+def _sse_events(body: str) -> list[dict]:
+    return [
+        json.loads(line.removeprefix("data: "))
+        for block in body.split("\n\n")
+        for line in block.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+class TestStatusSubscription:
+    @pytest.mark.asyncio
+    async def test_receives_published_events(self, redis):
+        redis.published.append(_event("running", "fetching"))
+        async with cache.subscribe_status(7) as sub:
+            assert redis.pubsubs[0].channels == [cache.status_channel(7)]
+            assert await sub.get(timeout=0.1) == _event("running", "fetching")
+            assert await sub.get(timeout=0.01) is None
+
+    @pytest.mark.asyncio
+    async def test_unsubscribes_on_exit(self, redis):
+        with pytest.raises(RuntimeError):
+            async with cache.subscribe_status(7):
+                raise RuntimeError("consumer went away")
+        assert redis.pubsubs[0].channels == []
+        assert redis.pubsubs[0].closed
+
+    @pytest.mark.asyncio
+    async def test_redis_down_is_a_quiet_channel(self, monkeypatch):
+        async def get_redis():
+            raise ConnectionError("redis down")
+
+        monkeypatch.setattr(cache, "get_redis", get_redis)
+        async with cache.subscribe_status(7) as sub:
+            assert await sub.get(timeout=0.01) is None
+
+
+class TestStatusEvents:
+    @pytest.mark.asyncio
+    async def test_ends_on_terminal_status(self, redis):
+        redis.live[cache._status_key(7)] = _event("running", "fetching")
+        redis.published.extend([_event("running", "report"), _event("done")])
+
+        seen = [event async for event in events._status_events(7, "running")]
+
+        assert [e["stage"] for e in seen] == ["fetching", "report", None]
+        assert seen[-1]["status"] == "done"
+        assert redis.pubsubs[0].closed
+
+    @pytest.mark.asyncio
+    async def test_missed_publish_is_recovered_from_snapshot(self, redis):
+        redis.live[cache._status_key(7)] = _event("running", "fetching")
+        stream = events._status_events(7, "running")
+        assert (await anext(stream))["status"] == "running"
+
+        redis.live[cache._status_key(7)] = _event("failed")  # published while unsubscribed
+        assert await anext(stream) == _event("failed")
+        with pytest.raises(StopAsyncIteration):
+            await anext(stream)
+
+    @pytest.mark.asyncio
+    async def test_disconnect_releases_subscription(self, redis):
+        redis.live[cache._status_key(7)] = _event("running", "fetching")
+        stream = events._status_events(7, "running")
+        assert (await anext(stream))["status"] == "running"
+        assert await anext(stream) is None  # keepalive
+
+        await stream.aclose()  # what the server does when the client goes away
+
+        assert redis.pubsubs[0].channels == []
+        assert redis.pubsubs[0].closed
+
+
+class TestEventRoutes:
+    def test_sse_stream_closes_after_done(self, redis, db_status):
+        redis.published.extend([_event("running", "metrics"), _event("done")])
+
+        resp = _client().get("/api/analysis/7/events")
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        assert [e["status"] for e in _sse_events(resp.text)] == ["running", "running", "done"]
+        assert redis.pubsubs[0].closed
+
+    def test_sse_finished_analysis_sends_one_event(self, redis, db_status):
+        db_status[7] = "done"
+        resp = _client().get("/api/analysis/7/events")
+        assert _sse_events(resp.text) == [_event("done")]
+
+    def test_sse_unknown_analysis(self, redis, db_status):
+        resp = _client().get("/api/analysis/404/events")
+        assert resp.status_code == 404
+        assert redis.pubsubs == []  # rejected before subscribing
+
+    def test_ws_streams_until_done(self, redis, db_status):
+        redis.published.append(_event("done"))
+        with _client().websocket_connect("/api/analysis/7/ws") as ws:
+            assert ws.receive_json()["status"] == "running"
+            assert ws.receive_json() == _event("done")
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+        assert closed.value.code == 1000
+        assert redis.pubsubs[0].closed
+
+    def test_ws_unknown_analysis(self, redis, db_status):
+        with _client().websocket_connect("/api/analysis/404/ws") as ws:
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+        assert closed.value.code == 4404
+        assert redis.pubsubs == []
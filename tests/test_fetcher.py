@@ -1,7 +1,14 @@
-"""Tests for channel identifier parsing"""
+"""Tests for channel identifier parsing and deadline-aware fetching"""
+
+import asyncio
+import time
+from datetime import UTC, datetime
+from types import SimpleNamespace
 
 import pytest
+from telethon.tl.functions.channels import GetFullChannelRequest
 
+from src.analyzer import fetcher
 from src.analyzer.fetcher import parse_channel_identifier
 
 
@@ -38,3 +45,77 @@ class TestParseChannelIdentifier:
 
     def test_underscore_prefix(self):
         assert parse_channel_identifier("_test_channel") == "_test_channel"
+
+
+class _FakeEntity:
+    id = 1
+    title = "Fake"
+    username = "fakechannel"
+    megagroup = False
+
+
+class _FakeMessage:
+    def __init__(self, msg_id: int):
+        self.id = msg_id
+        self.date = datetime(2026, 1, 5, tzinfo=UTC)
+        self.message = "post"
+        self.views = 10
+        self.forwards = 0
+        self.replies = None
+        self.reactions = None
+        self.entities = None
+        self.media = None
+
+
+class _FakeClient:
+    """Serves 100-message history pages, each taking ``delay`` seconds."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.next_id = 10_000
+
+    async def get_entity(self, username):
+        return _FakeEntity()
+
+    async def __call__(self, request):
+        if isinstance(request, GetFullChannelRequest):
+            return SimpleNamespace(full_chat=SimpleNamespace(about=None, participants_count=50))
+        await asyncio.sleep(self.delay)
+        messages = [_FakeMessage(self.next_id - i) for i in range(request.limit)]
+        self.next_id -= request.limit
+        return SimpleNamespace(messages=messages)
+
+
+class TestFetchDeadline:
+    @pytest.fixture
+    def fake_client(self, monkeypatch):
+        client = _FakeClient(delay=0.05)
+
+        async def get_client():
+            return client
+
+        monkeypatch.setattr(fetcher, "get_telethon_client", get_client)
+        monkeypatch.setattr(fetcher, "Channel", _FakeEntity)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_no_deadline_fetches_everything(self, fake_client):
+        result = await fetcher.fetch_channel("fakechannel", max_posts=300)
+        assert len(result.posts) == 300
+        assert not result.deadline_hit
+
+    @pytest.mark.asyncio
+    async def test_stops_early_before_deadline(self, fake_client):
+        deadline = time.monotonic() + 0.18
+        result = await fetcher.fetch_channel("fakechannel", max_posts=2000, deadline=deadline)
+        assert 0 < len(result.posts) < 2000
+        assert result.deadline_hit and result.truncated
+        assert time.monotonic() <= deadline + 0.05
+
+    @pytest.mark.asyncio
+    async def test_deadline_before_any_post_raises(self, fake_client):
+        fake_client.delay = 1.0
+        with pytest.raises(TimeoutError):
+            await fetcher.fetch_channel(
+                "fakechannel", max_posts=100, deadline=time.monotonic() + 0.05
+            )
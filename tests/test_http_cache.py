@@ -0,0 +1,137 @@
+"""Tests for conditional GET handling and the finished-analysis cache"""
+
+from datetime import UTC, datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api import http_cache
+from src.api.routes import analyze, reports
+from src.api.routes.analyze import AnalysisResultResponse
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    http_cache.analysis_status_cache.clear()
+    http_cache.report_path_cache.clear()
+    yield
+    http_cache.analysis_status_cache.clear()
+    http_cache.report_path_cache.clear()
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(analyze.router, prefix="/api")
+    app.include_router(reports.router, prefix="/api")
+    return TestClient(app)
+
+
+class TestFinishedCache:
+    def test_evicts_least_recently_used(self):
+        cache = http_cache.FinishedCache(max_entries=2)
+        cache.put(1, "a")
+        cache.put(2, "b")
+        cache.get(1)
+        cache.put(3, "c")
+        assert cache.get(2) is None
+        assert cache.get(1) == "a" and cache.get(3) == "c"
+
+    def test_disabled(self):
+        cache = http_cache.FinishedCache(max_entries=0)
+        cache.put(1, "a")
+        assert cache.get(1) is None
+
+
+class TestAnalysisStatus:
+    def _patch_loader(self, monkeypatch, status: str) -> list[int]:
+        calls = []
+
+        async def load(analysis_id):
+            calls.append(analysis_id)
+            response = AnalysisResultResponse(analysis_id=analysis_id, status=status)
+            return response, datetime(2026, 3, 1, 12, tzinfo=UTC)
+
+        monkeypatch.setattr(analyze, "_load_analysis_status", load)
+        return calls
+
+    def test_done_is_cached_and_revalidated(self, monkeypatch):
+        calls = self._patch_loader(monkeypatch, "done")
+        client = _client()
+
+        first = client.get("/api/analysis/5")
+        assert first.status_code == 200
+        assert first.json()["status"] == "done"
+        # A rebuilt report changes the body under this URL: revalidate, never immutable
+        assert first.headers["cache-control"] == http_cache.FINISHED
+        assert "must-revalidate" in http_cache.FINISHED
+        assert first.headers["last-modified"] == "Sun, 01 Mar 2026 12:00:00 GMT"
+
+        etag = first.headers["etag"]
+        again = client.get("/api/analysis/5", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.content == b""
+        since = client.get(
+            "/api/analysis/5", headers={"If-Modified-Since": first.headers["last-modified"]}
+        )
+        assert since.status_code == 304
+        assert calls == [5]  # later requests never reached the DB
+
+    def test_pending_not_cached(self, monkeypatch):
+        calls = self._patch_loader(monkeypatch, "pending")
+        client = _client()
+        for _ in range(2):
+            resp = client.get("/api/analysis/6")
+            assert resp.headers["cache-control"] == "no-cache"
+            assert "etag" not in resp.headers
+        assert calls == [6, 6]
+
+
+class TestReportDownload:
+    def test_conditional_pdf(self, tmp_path, monkeypatch):
+        pdf = tmp_path / "report.pdf"
+        pdf.write_bytes(b"%PDF-1.4 fake")
+        http_cache.report_path_cache.put(9, str(pdf))
+        client = _client()
+
+        first = client.get("/api/reports/9/pdf")
+        assert first.status_code == 200
+        assert first.content == b"%PDF-1.4 fake"
+        assert first.headers["etag"].startswith('"')
+        assert first.headers["cache-control"] == http_cache.FINISHED
+
+        again = client.get("/api/reports/9/pdf", headers={"If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304
+
+    def test_range_request(self, tmp_path):
+        pdf = tmp_path / "report.pdf"
+        pdf.write_bytes(b"0123456789")
+        http_cache.report_path_cache.put(9, str(pdf))
+        client = _client()
+
+        part = client.get("/api/reports/9/pdf", headers={"Range": "bytes=2-5"})
+        assert part.status_code == 206
+        assert part.content == b"2345"
+        assert part.headers["content-range"] == "bytes 2-5/10"
+
+        # If-Range with a stale validator falls back to the whole file
+        stale = client.get("/api/reports/9/pdf", headers={"Range": "bytes=2-5", "If-Range": '"x"'})
+        assert stale.status_code == 200
+        assert stale.content == b"0123456789"
+
+    def test_x_accel_offload(self, tmp_path, monkeypatch):
+        report_dir = tmp_path / "analysis_9"
+        report_dir.mkdir()
+        pdf = report_dir / "report.pdf"
+        pdf.write_bytes(b"%PDF-1.4 fake")
+        http_cache.report_path_cache.put(9, str(pdf))
+        monkeypatch.setattr(reports, "REPORTS_DIR", tmp_path)
+        monkeypatch.setattr(reports.settings, "REPORT_OFFLOAD", "x-accel")
+        monkeypatch.setattr(reports.settings, "REPORT_OFFLOAD_PREFIX", "/_reports/")
+
+        resp = _client().get("/api/reports/9/pdf")
+        assert resp.status_code == 200
+        assert resp.content == b""
+        assert resp.headers["x-accel-redirect"] == "/_reports/analysis_9/report.pdf"
+        assert resp.headers["content-type"] == "application/pdf"
+        assert "analytics_report_9.pdf" in resp.headers["content-disposition"]
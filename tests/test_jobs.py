@@ -0,0 +1,366 @@
+"""Tests for the job queue and worker (in-memory backend)"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.config import settings
+from src.jobs import admission
+from src.jobs import worker as worker_module
+from src.jobs.admission import QueueFullError, StageClock, ensure_capacity
+from src.jobs.fairness import FairScheduler
+from src.jobs.queue import InMemoryJobQueue, Job, retry_delay
+from src.jobs.worker import Worker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _job(**payload) -> Job:
+    return Job(kind="test", payload=payload, max_attempts=3)
+
+
+class TestInMemoryJobQueue:
+    @pytest.mark.asyncio
+    async def test_fifo_and_ack(self):
+        q = InMemoryJobQueue(visibility_timeout=30)
+        await q.enqueue(_job(n=1))
+        await q.enqueue(_job(n=2))
+
+        first = await q.dequeue(timeout=0)
+        assert first.payload == {"n": 1}
+        assert first.attempts == 1
+        await q.ack(first)
+
+        second = await q.dequeue(timeout=0)
+        assert second.payload == {"n": 2}
+        assert await q.dequeue(timeout=0) is None
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_becomes_visible(self):
+        clock = FakeClock()
+        q = InMemoryJobQueue(visibility_timeout=30, clock=clock)
+        await q.enqueue(_job())
+        job = await q.dequeue(timeout=0)
+
+        assert await q.dequeue(timeout=0) is None
+        clock.now += 31
+        redelivered = await q.dequeue(timeout=0)
+        assert redelivered.id == job.id
+        assert redelivered.attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_extend_keeps_lease(self):
+        clock = FakeClock()
+        q = InMemoryJobQueue(visibility_timeout=30, clock=clock)
+        await q.enqueue(_job())
+        job = await q.dequeue(timeout=0)
+        clock.now += 20
+        await q.extend(job)
+        clock.now += 20
+        assert await q.dequeue(timeout=0) is None
+
+    @pytest.mark.asyncio
+    async def test_nack_retries_after_backoff_then_dead_letters(self):
+        clock = FakeClock()
+        q = InMemoryJobQueue(visibility_timeout=30, clock=clock)
+        await q.enqueue(_job())
+
+        for attempt in range(1, 4):
+            job = await q.dequeue(timeout=0)
+            assert job.attempts == attempt
+            retried = await q.nack(job, "boom", retry_in=10)
+            assert retried is (attempt < 3)
+            assert await q.dequeue(timeout=0) is None  # not before the delay
+            clock.now += 10
+
+        assert len(q.dead) == 1
+        assert q.dead[0].last_error == "boom"
+
+    @pytest.mark.asyncio
+    async def test_lease_expiring_every_attempt_dead_letters(self):
+        clock = FakeClock()
+        q = InMemoryJobQueue(visibility_timeout=30, clock=clock)
+        dead = []
+
+        async def on_dead(job):
+            dead.append(job)
+
+        q.on_dead = on_dead
+        await q.enqueue(_job())
+        for attempt in range(1, 4):
+            assert (await q.dequeue(timeout=0)).attempts == attempt
+            clock.now += 31  # the worker died holding it
+
+        assert await q.dequeue(timeout=0) is None
+        assert len(q.dead) == 1
+        assert dead == q.dead
+        assert "lease expired" in dead[0].last_error
+
+    @pytest.mark.asyncio
+    async def test_negative_retry_dead_letters_immediately(self):
+        q = InMemoryJobQueue(visibility_timeout=30)
+        await q.enqueue(_job())
+        job = await q.dequeue(timeout=0)
+        assert await q.nack(job, "bad channel", retry_in=-1) is False
+        assert len(q.dead) == 1
+
+    def test_retry_delay_is_exponential_and_capped(self):
+        assert [retry_delay(a, base=2) for a in (1, 2, 3)] == [2, 4, 8]
+        assert retry_delay(20, base=2, cap=60) == 60
+
+
+class TestFairScheduler:
+    def test_weighted_shares_per_round(self):
+        sched = FairScheduler({"interactive": 3, "batch": 1})
+        backlog = {"interactive": {"u1"}, "batch": {"b1"}}
+        picks = [sched.choose(backlog)[0] for _ in range(8)]
+        assert picks.count("interactive") == 6
+        assert picks.count("batch") == 2
+
+    def test_lone_class_gets_everything(self):
+        sched = FairScheduler({"interactive": 3, "batch": 1})
+        backlog = {"interactive": set(), "batch": {"b1"}}
+        assert [sched.choose(backlog) for _ in range(3)] == [("batch", "b1")] * 3
+
+    def test_tenants_take_turns(self):
+        sched = FairScheduler({"api": 1})
+        backlog = {"api": ["a", "b", "c"]}
+        picks = [sched.choose(backlog)[1] for _ in range(6)]
+        assert picks == ["a", "b", "c", "a", "b", "c"]
+
+    def test_empty_backlog(self):
+        assert FairScheduler().choose({}) is None
+
+
+class TestFairQueue:
+    @pytest.mark.asyncio
+    async def test_bulk_tenant_does_not_starve_others(self):
+        q = InMemoryJobQueue(visibility_timeout=30)
+        for i in range(50):
+            await q.enqueue(Job(kind="test", payload={"n": i}, tenant="bulk"))
+        await q.enqueue(Job(kind="test", payload={}, tenant="small"))
+        await q.enqueue(Job(kind="test", payload={}, priority="interactive", tenant="tg:1"))
+
+        served = [await q.dequeue(timeout=0) for _ in range(3)]
+        assert {(j.priority, j.tenant) for j in served} == {
+            ("interactive", "tg:1"),
+            ("api", "bulk"),
+            ("api", "small"),
+        }
+
+    @pytest.mark.asyncio
+    async def test_stats_per_class(self):
+        q = InMemoryJobQueue(visibility_timeout=30)
+        await q.enqueue(Job(kind="test", payload={}, tenant="a", enqueued_at=0))
+        await q.enqueue(Job(kind="test", payload={}, tenant="b"))
+        await q.enqueue(Job(kind="test", payload={}, priority="batch"))
+
+        stats = {s.priority: s for s in await q.stats()}
+        assert stats["api"].depth == 2
+        assert stats["api"].tenants == 2
+        assert stats["api"].oldest_wait > 1000
+        assert stats["batch"].depth == 1
+        assert stats["interactive"].depth == 0
+        assert await q.depth() == 3
+
+        await q.dequeue(timeout=0)
+        assert any(s.avg_wait is not None for s in await q.stats())
+
+    def test_unknown_priority_falls_back(self):
+        assert Job(kind="test", payload={}, priority="urgent").priority == "api"
+
+
+class TestAdmission:
+    @pytest.fixture(autouse=True)
+    def _fixed_job_time(self, monkeypatch):
+        async def fake_expected():
+            return 10.0
+
+        monkeypatch.setattr(admission, "expected_job_seconds", fake_expected)
+        monkeypatch.setattr(settings, "ANALYSIS_MAX_CONCURRENCY", 2)
+        monkeypatch.setattr(settings, "WORKER_CONCURRENCY", 2)
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self, monkeypatch):
+        monkeypatch.setattr(settings, "ANALYSIS_QUEUE_LIMIT", 2)
+        q = InMemoryJobQueue(visibility_timeout=30)
+        await ensure_capacity(q)
+        await q.enqueue(_job())
+        await q.enqueue(_job())
+
+        with pytest.raises(QueueFullError) as exc:
+            await ensure_capacity(q)
+        assert exc.value.depth == 2
+        assert exc.value.retry_after == 10.0
+
+    @pytest.mark.asyncio
+    async def test_rejects_batch_that_would_overfill(self, monkeypatch):
+        monkeypatch.setattr(settings, "ANALYSIS_QUEUE_LIMIT", 3)
+        q = InMemoryJobQueue(visibility_timeout=30)
+        await q.enqueue(_job())
+        await ensure_capacity(q, incoming=2)
+        with pytest.raises(QueueFullError):
+            await ensure_capacity(q, incoming=3)
+
+    @pytest.mark.asyncio
+    async def test_position_and_eta(self):
+        q = InMemoryJobQueue(visibility_timeout=30)
+        for _ in range(3):
+            await q.enqueue(_job())
+        placed = await admission.enqueue(q, _job())
+        assert placed.position == 4
+        assert placed.eta_seconds == 20.0  # second wave of 2 slots
+
+        urgent = Job(kind="test", payload={}, priority="interactive")
+        assert (await admission.enqueue(q, urgent)).position == 1
+        job = await q.dequeue(timeout=0)
+        assert job.id == urgent.id
+        assert await admission.queue_position(q, urgent) is None
+
+    @pytest.mark.asyncio
+    async def test_max_running_caps_leases(self):
+        q = InMemoryJobQueue(visibility_timeout=30, max_running=1)
+        await q.enqueue(_job(n=1))
+        await q.enqueue(_job(n=2))
+
+        first = await q.dequeue(timeout=0)
+        assert await q.dequeue(timeout=0) is None
+        await q.ack(first)
+        assert (await q.dequeue(timeout=0)).payload == {"n": 2}
+
+    def test_stage_clock(self):
+        clock = StageClock()
+        clock.mark("fetching")
+        clock.mark("metrics")
+        durations = clock.durations()
+        assert list(durations) == ["fetching", "metrics"]
+        assert all(d >= 0 for d in durations.values())
+
+
+class TestWorker:
+    @pytest.mark.asyncio
+    async def test_runs_and_acks(self):
+        q = InMemoryJobQueue(visibility_timeout=30)
+        seen = []
+
+        async def handler(job):
+            seen.append(job.payload["n"])
+
+        worker = Worker(q, concurrency=2, handlers={"test": handler})
+        for n in range(4):
+            await q.enqueue(_job(n=n))
+        worker.start()
+        await asyncio.sleep(0.1)
+        await worker.stop()
+
+        assert sorted(seen) == [0, 1, 2, 3]
+        assert await q.depth() == 0
+
+    @pytest.mark.asyncio
+    async def test_consumer_survives_ack_failure(self):
+        q = InMemoryJobQueue(visibility_timeout=30)
+        seen = []
+        real_ack = q.ack
+
+        async def flaky_ack(job):
+            if job.payload["n"] == 0:
+                raise ConnectionError("redis went away")
+            await real_ack(job)
+
+        async def handler(job):
+            seen.append(job.payload["n"])
+
+        q.ack = flaky_ack
+        worker = Worker(q, concurrency=1, handlers={"test": handler})
+        for n in range(3):
+            await q.enqueue(_job(n=n))
+        worker.start()
+        await asyncio.sleep(0.1)
+        await worker.stop()
+
+        assert seen == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_value_error_is_not_retried(self):
+        q = InMemoryJobQueue(visibility_timeout=30)
+
+        async def handler(job):
+            raise ValueError("not a channel")
+
+        worker = Worker(q, concurrency=1, handlers={"test": handler})
+        await q.enqueue(_job())
+        await worker.process(await q.dequeue(timeout=0))
+
+        assert len(q.dead) == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_kind_fails_request(self, monkeypatch):
+        failed = []
+
+        async def record_failure(job):
+            failed.append((job.payload["request_id"], job.last_error))
+
+        monkeypatch.setattr(worker_module, "record_failure", record_failure)
+        q = InMemoryJobQueue(visibility_timeout=30)
+        await q.enqueue(Job(kind="nope", payload={"request_id": 5}))
+
+        await Worker(q, concurrency=1).process(await q.dequeue(timeout=0))
+
+        assert len(q.dead) == 1
+        assert failed == [(5, "unknown kind 'nope'")]
+
+    @pytest.mark.asyncio
+    async def test_dead_lettered_at_dequeue_fails_request(self, monkeypatch):
+        failed = []
+
+        async def record_failure(job):
+            failed.append(job.payload["request_id"])
+
+        monkeypatch.setattr(worker_module, "record_failure", record_failure)
+        clock = FakeClock()
+        q = InMemoryJobQueue(visibility_timeout=30, clock=clock)
+        Worker(q, concurrency=1)
+        await q.enqueue(Job(kind="analysis", payload={"request_id": 6}, max_attempts=1))
+        await q.dequeue(timeout=0)
+        clock.now += 31
+
+        assert await q.dequeue(timeout=0) is None
+        assert failed == [6]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "error, fails",
+        [(ValueError('No user has "nope" as username'), True), (ConnectionError("reset"), False)],
+    )
+    async def test_analysis_fails_request_only_when_not_retried(self, monkeypatch, error, fails):
+        decisions = []
+
+        async def run_analysis(channel, session, record_failure, **kwargs):
+            decisions.append(record_failure(error))
+            raise error
+
+        @asynccontextmanager
+        async def async_session():
+            yield None
+
+        monkeypatch.setattr(worker_module, "run_analysis", run_analysis)
+        monkeypatch.setattr(worker_module, "async_session", async_session)
+        q = InMemoryJobQueue(visibility_timeout=30)
+        await q.enqueue(
+            Job(kind="analysis", payload={"channel": "nope", "request_id": 1}, max_attempts=3)
+        )
+        job = await q.dequeue(timeout=0)
+        assert job.attempts == 1
+
+        await Worker(q, concurrency=1).process(job)
+
+        # The request is marked failed exactly when the queue gives up on the job
+        assert decisions == [fails]
+        assert len(q.dead) == (1 if fails else 0)
@@ -0,0 +1,103 @@
+"""Tests for the load-test fakes and report"""
+
+import asyncio
+
+import pytest
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.filters import Command
+from aiogram.types import BufferedInputFile, Message
+from telethon.errors import FloodWaitError
+
+from src.analyzer import fetcher
+from src.loadtest.fake_bot_api import FakeBotAPI
+from src.loadtest.fake_telethon import FakeTelethonClient, SyntheticChannel, install
+from src.loadtest.harness import LoadTestConfig, LoadTestRun, Sample, summarize
+
+
+@pytest.fixture
+def fake_telethon(monkeypatch):
+    monkeypatch.setattr(fetcher, "_client", None)  # restored after the test
+    client = FakeTelethonClient(seed=1)
+    install(client)
+    return client
+
+
+class TestFakeTelethon:
+    @pytest.mark.asyncio
+    async def test_fetch_channel_runs_unchanged(self, fake_telethon):
+        result = await fetcher.fetch_channel("https://t.me/lt_news", max_posts=250)
+        channel = SyntheticChannel.generate("lt_news")
+        assert result.channel.member_count == channel.members
+        assert len(result.posts) == min(250, channel.total_posts)
+        ids = [p.message_id for p in result.posts]
+        assert ids == sorted(ids, reverse=True) and len(set(ids)) == len(ids)
+        assert {p.media_type for p in result.posts} >= {"photo", None}
+        assert fake_telethon.calls["get_entity"] == 1
+
+    @pytest.mark.asyncio
+    async def test_history_is_deterministic(self, fake_telethon):
+        first = await fetcher.fetch_channel("lt_same", max_posts=50)
+        second = await fetcher.fetch_channel("lt_same", max_posts=50)
+        assert [p.views for p in first.posts] == [p.views for p in second.posts]
+
+    @pytest.mark.asyncio
+    async def test_missing_channel(self, fake_telethon):
+        with pytest.raises(ValueError, match="No user has"):
+            await fetcher.fetch_channel("missing_channel")
+
+    @pytest.mark.asyncio
+    async def test_long_flood_wait_is_raised(self, fake_telethon):
+        fake_telethon.flood_rate = 1.0
+        fake_telethon.flood_seconds = 120
+        with pytest.raises(FloodWaitError) as exc:
+            await fetcher.fetch_channel("lt_flood")
+        assert exc.value.seconds == 120
+        assert fake_telethon.flood_waits == 1
+
+
+class TestFakeBotAPI:
+    @pytest.mark.asyncio
+    async def test_round_trip_through_aiogram(self):
+        api = FakeBotAPI()
+        await api.start()
+        router = Router()
+
+        @router.message(Command("start"))
+        async def start(message: Message) -> None:
+            await message.answer("hello")
+            await message.answer_document(BufferedInputFile(b"%PDF" * 100, "report.pdf"))
+
+        dp = Dispatcher()
+        dp.include_router(router)
+        bot = Bot("123456:TEST", session=AiohttpSession(api=TelegramAPIServer.from_base(api.url)))
+        polling = asyncio.create_task(
+            dp.start_polling(bot, handle_signals=False, polling_timeout=1)
+        )
+        try:
+            await api.push_message(42, "/start")
+            reply = await api.next_call(42, timeout=5)
+            upload = await api.next_call(42, timeout=5)
+        finally:
+            await dp.stop_polling()
+            await polling
+            await api.stop()
+
+        assert (reply.method, reply.params["text"]) == ("sendMessage", "hello")
+        assert upload.method == "sendDocument"
+        assert api.calls["getMe"] == 1
+
+
+class TestSummary:
+    def test_percentiles_and_errors(self):
+        run = LoadTestRun(config=LoadTestConfig(), wall_seconds=60)
+        run.samples = [Sample("bot", True, float(s)) for s in range(1, 11)]
+        run.samples += [Sample("api", True, 2.0), Sample("api", False, 30.0, "timeout")]
+        summary = summarize(run)
+
+        bot, api = summary["targets"]["bot"], summary["targets"]["api"]
+        assert bot["latency_s"]["p50"] == 6 and bot["latency_s"]["max"] == 10
+        assert bot["throughput_per_min"] == 10
+        assert api["failed"] == 1 and api["errors"] == {"timeout": 1}
+        assert summary["targets"]["all"]["requests"] == 12
@@ -0,0 +1,51 @@
+"""Tests for the event-loop watchdog"""
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+from src.config import settings
+from src.observability.loop_watchdog import LoopWatchdog
+
+
+def _blocking_render() -> None:
+    time.sleep(0.3)  # stands in for matplotlib/reportlab on the loop
+
+
+class TestLoopWatchdog:
+    @pytest.mark.asyncio
+    async def test_idle_loop_has_small_lag(self):
+        watchdog = LoopWatchdog(interval_ms=10, threshold_ms=200)
+        watchdog.start()
+        await asyncio.sleep(0.2)
+        await watchdog.stop()
+        p = watchdog.percentiles()
+        assert p and p["p50"] < 50
+        assert watchdog.stalls == 0
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_stack_is_logged(self, caplog):
+        watchdog = LoopWatchdog(interval_ms=10, threshold_ms=100)
+        watchdog.start()
+        await asyncio.sleep(0.05)
+        with caplog.at_level(logging.WARNING, logger="src.observability.loop_watchdog"):
+            _blocking_render()
+            await asyncio.sleep(0.05)
+        await watchdog.stop()
+
+        assert watchdog.stalls == 1
+        stacks = [r.getMessage() for r in caplog.records if "loop thread stack" in r.getMessage()]
+        assert stacks and "_blocking_render" in stacks[0]
+        assert watchdog.percentiles()["max"] >= 250
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("interval_ms", [0, -1])
+    async def test_disabled(self, monkeypatch, interval_ms):
+        monkeypatch.setattr(settings, "LOOP_WATCHDOG_INTERVAL_MS", 10)
+        watchdog = LoopWatchdog(interval_ms=interval_ms)
+        watchdog.start()
+        assert watchdog._task is None  # an explicit 0 wins over the configured interval
+        await watchdog.stop()
+        assert watchdog.percentiles() == {}
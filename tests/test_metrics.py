@@ -2,8 +2,14 @@
 
 from datetime import datetime, timezone
 
-from src.analyzer.fetcher import ChannelInfo, FetchResult, FetchedPost
-from src.analyzer.metrics import compute_metrics
+from src.analyzer.fetcher import FetchedPost, FetchResult
+from src.analyzer.metrics import (
+    compute_daily_stats,
+    compute_metrics,
+    dump_metrics,
+    load_metrics,
+)
+from tests.conftest import make_channel
 
 
 def _make_post(
@@ -32,20 +38,9 @@ def _make_post(
     )
 
 
-def _make_channel(member_count: int = 1000) -> ChannelInfo:
-    return ChannelInfo(
-        channel_id=123,
-        title="Test Channel",
-        username="testchannel",
-        description="A test channel",
-        member_count=member_count,
-        channel_type="channel",
-    )
-
-
 class TestComputeMetrics:
     def test_empty_posts(self):
-        result = FetchResult(channel=_make_channel(), posts=[])
+        result = FetchResult(channel=make_channel(), posts=[])
         metrics = compute_metrics(result)
         assert metrics.total_posts == 0
         assert metrics.avg_views == 0.0
@@ -55,7 +50,7 @@ class TestComputeMetrics:
             _make_post(message_id=1, views=200, forwards=10, reactions=20),
             _make_post(message_id=2, views=100, forwards=5, reactions=10),
         ]
-        result = FetchResult(channel=_make_channel(member_count=1000), posts=posts)
+        result = FetchResult(channel=make_channel(member_count=1000), posts=posts)
         metrics = compute_metrics(result)
 
         assert metrics.total_posts == 2
@@ -66,14 +61,14 @@ class TestComputeMetrics:
 
     def test_engagement_rate(self):
         posts = [_make_post(views=500)]
-        result = FetchResult(channel=_make_channel(member_count=1000), posts=posts)
+        result = FetchResult(channel=make_channel(member_count=1000), posts=posts)
         metrics = compute_metrics(result)
         # engagement = (500 / 1000) * 100 = 50%
         assert metrics.avg_engagement_rate == 50.0
 
     def test_zero_members(self):
         posts = [_make_post(views=100)]
-        result = FetchResult(channel=_make_channel(member_count=0), posts=posts)
+        result = FetchResult(channel=make_channel(member_count=0), posts=posts)
         metrics = compute_metrics(result)
         assert metrics.avg_engagement_rate == 0.0
 
@@ -84,7 +79,7 @@ class TestComputeMetrics:
             _make_post(message_id=3, media_type="photo"),
             _make_post(message_id=4, media_type="video"),
         ]
-        result = FetchResult(channel=_make_channel(), posts=posts)
+        result = FetchResult(channel=make_channel(), posts=posts)
         metrics = compute_metrics(result)
 
         assert metrics.content_mix.pct_text_only == 25.0
@@ -93,7 +88,7 @@ class TestComputeMetrics:
 
     def test_top_posts_limited(self):
         posts = [_make_post(message_id=i, views=i * 100) for i in range(1, 20)]
-        result = FetchResult(channel=_make_channel(), posts=posts)
+        result = FetchResult(channel=make_channel(), posts=posts)
         metrics = compute_metrics(result, top_n=5)
 
         assert len(metrics.top_posts_by_views) == 5
@@ -105,7 +100,7 @@ class TestComputeMetrics:
             _make_post(message_id=2, hour=14, weekday=0),
             _make_post(message_id=3, hour=9, weekday=2),
         ]
-        result = FetchResult(channel=_make_channel(), posts=posts)
+        result = FetchResult(channel=make_channel(), posts=posts)
         metrics = compute_metrics(result)
 
         assert metrics.posting_pattern.most_active_hour == 14
@@ -116,7 +111,7 @@ class TestComputeMetrics:
             _make_post(message_id=1, replies=5),
             _make_post(message_id=2, replies=3),
         ]
-        result = FetchResult(channel=_make_channel(), posts=posts)
+        result = FetchResult(channel=make_channel(), posts=posts)
         metrics = compute_metrics(result)
         assert metrics.total_replies == 8
 
@@ -125,7 +120,7 @@ class TestComputeMetrics:
             _make_post(message_id=1, views=200, forwards=10, reactions=20, replies=4),
             _make_post(message_id=2, views=100, forwards=5, reactions=10, replies=2),
         ]
-        result = FetchResult(channel=_make_channel(member_count=1000), posts=posts)
+        result = FetchResult(channel=make_channel(member_count=1000), posts=posts)
         metrics = compute_metrics(result)
         eng = metrics.engagement
 
@@ -143,7 +138,7 @@ class TestComputeMetrics:
             _make_post(message_id=1, views=200),
             _make_post(message_id=2, views=100),
         ]
-        result = FetchResult(channel=_make_channel(), posts=posts)
+        result = FetchResult(channel=make_channel(), posts=posts)
         metrics = compute_metrics(result)
         # Both posts are on same day (2026-01-05), so 1 date entry
         assert len(metrics.views_trend.dates) == 1
@@ -152,11 +147,21 @@ class TestComputeMetrics:
 
     def test_data_note_present(self):
         posts = [_make_post()]
-        result = FetchResult(channel=_make_channel(), posts=posts)
+        result = FetchResult(channel=make_channel(), posts=posts)
         metrics = compute_metrics(result)
         assert isinstance(metrics.data_note, str)
         assert len(metrics.data_note) > 0
 
+    def test_data_note_deadline(self):
+        posts = [_make_post(message_id=i) for i in range(1, 4)]
+        result = FetchResult(
+            channel=make_channel(), posts=posts, truncated=True, deadline_hit=True
+        )
+        metrics = compute_metrics(result)
+        assert metrics.partial_fetch is True
+        assert "time limit" in metrics.data_note
+        assert load_metrics(dump_metrics(metrics)).partial_fetch is True
+
     def test_activity_status_active(self):
         """Posts from today → active status."""
         now = datetime.now(timezone.utc)
@@ -165,7 +170,7 @@ class TestComputeMetrics:
             views=100, forwards=5, replies=2,
             reactions_count=10, media_type=None, has_link=False,
         )
-        result = FetchResult(channel=_make_channel(), posts=[post])
+        result = FetchResult(channel=make_channel(), posts=[post])
         metrics = compute_metrics(result)
         assert metrics.activity_status == "active"
         assert metrics.days_since_last_post <= 1
@@ -178,13 +183,13 @@ class TestComputeMetrics:
             views=100000, forwards=5, replies=2,
             reactions_count=10, media_type=None, has_link=False,
         )
-        result = FetchResult(channel=_make_channel(), posts=[post])
+        result = FetchResult(channel=make_channel(), posts=[post])
         metrics = compute_metrics(result)
         assert metrics.activity_status == "dead"
         assert metrics.days_since_last_post > 90
 
     def test_empty_posts_dead_status(self):
-        result = FetchResult(channel=_make_channel(), posts=[])
+        result = FetchResult(channel=make_channel(), posts=[])
         metrics = compute_metrics(result)
         assert metrics.activity_status == "dead"
         assert metrics.posting_frequency == "none"
@@ -199,3 +204,48 @@ class TestComputeMetrics:
         status, freq = _classify_activity(days_since_last=30, avg_posts_per_day=0.05)
         assert freq == "very_low"
         assert status == "inactive"
+
+
+class TestComputeDailyStats:
+    def test_groups_by_day(self):
+        posts = [
+            _make_post(message_id=1, views=100, forwards=1, reactions=2, replies=3, weekday=0),
+            _make_post(message_id=2, views=50, forwards=1, reactions=1, replies=0, weekday=0),
+            _make_post(message_id=3, views=10, weekday=2),
+        ]
+        stats = compute_daily_stats(posts)
+
+        assert [s.day.day for s in stats] == [5, 7]  # oldest first
+        assert stats[0].posts == 2
+        assert stats[0].views == 150
+        assert stats[0].forwards == 2
+        assert stats[0].reactions == 3
+        assert stats[0].replies == 3
+        assert stats[1].views == 10
+
+    def test_truncated_drops_oldest_partial_day(self):
+        posts = [_make_post(message_id=1, weekday=0), _make_post(message_id=2, weekday=1)]
+        stats = compute_daily_stats(posts, truncated=True)
+        assert [s.day.day for s in stats] == [6]
+
+    def test_empty(self):
+        assert compute_daily_stats([], truncated=True) == []
+
+
+class TestMetricsSerialization:
+    def test_roundtrip(self):
+        posts = [
+            _make_post(message_id=1, views=200, hour=14, weekday=0),
+            _make_post(message_id=2, views=100, hour=9, weekday=2),
+        ]
+        metrics = compute_metrics(FetchResult(channel=make_channel(), posts=posts))
+
+        restored = load_metrics(dump_metrics(metrics))
+
+        assert restored == metrics
+        assert restored.posting_pattern.hour_distribution == {14: 1, 9: 1}
+        assert restored.top_posts_by_views[0].date == posts[0].date
+
+    def test_roundtrip_empty(self):
+        metrics = compute_metrics(FetchResult(channel=make_channel(), posts=[]))
+        assert load_metrics(dump_metrics(metrics)) == metrics
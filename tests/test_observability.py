@@ -0,0 +1,49 @@
+"""Tests for Prometheus instrumentation"""
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from src.api.http_cache import FinishedCache
+from src.observability.prometheus import STAGE_SECONDS, record_cache, render_latest
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestInstruments:
+    def test_cache_counters(self):
+        before = _sample("analyticbot_cache_requests_total", tier="test", result="hit")
+        record_cache("test", hit=True)
+        assert _sample("analyticbot_cache_requests_total", tier="test", result="hit") == before + 1
+
+    def test_finished_cache_reports_tier(self):
+        cache = FinishedCache(max_entries=4, tier="unit")
+        miss = _sample("analyticbot_cache_requests_total", tier="unit", result="miss")
+        hit = _sample("analyticbot_cache_requests_total", tier="unit", result="hit")
+        cache.get(1)
+        cache.put(1, "x")
+        cache.get(1)
+        assert _sample("analyticbot_cache_requests_total", tier="unit", result="miss") == miss + 1
+        assert _sample("analyticbot_cache_requests_total", tier="unit", result="hit") == hit + 1
+
+    def test_stage_histogram(self):
+        before = _sample("analyticbot_stage_seconds_count", stage="metrics")
+        with STAGE_SECONDS.labels("metrics").time():
+            pass
+        assert _sample("analyticbot_stage_seconds_count", stage="metrics") == before + 1
+
+
+class TestExposition:
+    def test_render_latest(self):
+        body, content_type = render_latest()
+        assert content_type.startswith("text/plain")
+        assert b"analyticbot_stage_seconds" in body
+        assert b"analyticbot_analyses_in_progress" in body
+
+    def test_api_endpoint(self):
+        from src.api.main import app
+
+        resp = TestClient(app).get("/metrics")  # no lifespan — no DB needed
+        assert resp.status_code == 200
+        assert b"analyticbot_db_pool_checkout_seconds" in resp.content
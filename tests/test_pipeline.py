@@ -0,0 +1,179 @@
+"""Tests for the analysis pipeline with Telegram, Redis and the DB faked out"""
+
+import asyncio
+import pstats
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.analyzer import pipeline
+from src.reports import artifact_store, charts, pdf
+from tests.conftest import make_fetch_result
+
+
+class _FakeSession:
+    def __init__(self):
+        self.commits = 0
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+@pytest.fixture
+def fakes(monkeypatch):
+    calls = {"pdf": 0, "pdf_thread": None, "saved": [], "cached": []}
+
+    async def noop(*args, **kwargs):
+        return None
+
+    async def fetch_channel(identifier, max_posts=None, deadline=None):
+        return make_fetch_result(posts=5, username="fakechannel")
+
+    def generate_pdf_report(metrics, analysis_id, lang="en"):
+        calls["pdf"] += 1
+        calls["pdf_thread"] = threading.get_ident()
+        return f"/tmp/report_{analysis_id}.pdf"
+
+    async def save_analysis(self, request_id, snapshot, posts, daily_stats, result):
+        calls["saved"].append(result)
+
+    async def set_cached_analysis(channel, analysis_id, pdf_path, summary):
+        calls["cached"].append(pdf_path)
+
+    monkeypatch.setattr(pipeline, "get_cached_analysis", noop)
+    monkeypatch.setattr(pipeline, "publish_status", noop)
+    monkeypatch.setattr(pipeline, "record_stage_durations", noop)
+    monkeypatch.setattr(pipeline, "set_cached_analysis", set_cached_analysis)
+    monkeypatch.setattr(pipeline, "fetch_channel", fetch_channel)
+    monkeypatch.setattr(pipeline, "generate_pdf_report", generate_pdf_report)
+    monkeypatch.setattr(pipeline.AnalysisRepository, "save_analysis", save_analysis)
+    return calls
+
+
+class TestRunAnalysisOutput:
+    @pytest.mark.asyncio
+    async def test_pdf_output_renders_report(self, fakes):
+        session = _FakeSession()
+        metrics, pdf_path = await pipeline.run_analysis(
+            "fakechannel", session=session, request_id=42
+        )
+        assert pdf_path == "/tmp/report_42.pdf"
+        assert fakes["pdf"] == 1
+        assert fakes["saved"][0].report_pdf_path == pdf_path
+        assert session.commits == 1
+        assert fakes["pdf_thread"] != threading.get_ident()  # built off the event loop
+
+    @pytest.mark.asyncio
+    async def test_json_output_skips_pdf(self, fakes):
+        session = _FakeSession()
+        metrics, pdf_path = await pipeline.run_analysis(
+            "fakechannel", session=session, request_id=42, output="json"
+        )
+        assert pdf_path is None
+        assert fakes["pdf"] == 0
+        assert metrics.total_posts == 5
+        saved = fakes["saved"][0]
+        assert saved.report_pdf_path is None
+        assert saved.metrics_doc  # PDF can still be rendered later
+        assert fakes["cached"] == [""]
+
+
+class TestRunAnalysisFailure:
+    @pytest.mark.asyncio
+    async def test_callable_decides_failure(self, fakes, monkeypatch):
+        statuses, failed = [], []
+
+        async def fetch_channel(identifier, max_posts=None, deadline=None):
+            raise ValueError("@fakechannel is not a channel or supergroup")
+
+        async def publish_status(request_id, status, **kwargs):
+            statuses.append(status)
+
+        async def set_request_failed(self, request_id, error):
+            failed.append(request_id)
+
+        monkeypatch.setattr(pipeline, "fetch_channel", fetch_channel)
+        monkeypatch.setattr(pipeline, "publish_status", publish_status)
+        monkeypatch.setattr(pipeline.AnalysisRepository, "set_request_failed", set_request_failed)
+
+        for will_retry in (True, False):
+            with pytest.raises(ValueError):
+                await pipeline.run_analysis(
+                    "fakechannel",
+                    session=_FakeSession(),
+                    request_id=42,
+                    record_failure=lambda e, retry=will_retry: not retry,
+                )
+        assert failed == [42]
+        assert [s for s in statuses if s != "running"] == ["pending", "failed"]
+
+
+class TestRunAnalysisProfiling:
+    @pytest.fixture
+    def telegram(self, fakes, monkeypatch, tmp_path):
+        """A Bot API that hangs until ``answer`` is set, then fails."""
+        monkeypatch.setattr(pipeline, "REPORTS_DIR", tmp_path)
+        telegram = SimpleNamespace(sent=[], answer=asyncio.Event())
+
+        async def notify_admin(text):
+            telegram.sent.append(text)
+            await telegram.answer.wait()
+            raise ConnectionError("Telegram unreachable")
+
+        monkeypatch.setattr(pipeline, "notify_admin", notify_admin)
+        yield telegram
+        telegram.answer.set()
+
+    @pytest.mark.asyncio
+    async def test_summary_does_not_hold_up_the_analysis(self, telegram):
+        run = pipeline.run_analysis(
+            "fakechannel", session=_FakeSession(), request_id=42, profile=True
+        )
+        _, pdf_path = await asyncio.wait_for(run, timeout=5)
+        assert pdf_path == "/tmp/report_42.pdf"
+        await asyncio.sleep(0)
+        assert len(telegram.sent) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_notification_keeps_the_analysis_error(self, telegram, monkeypatch):
+        async def fetch_channel(identifier, max_posts=None, deadline=None):
+            raise ValueError("@fakechannel is not a channel or supergroup")
+
+        async def set_request_failed(self, request_id, error):
+            pass
+
+        monkeypatch.setattr(pipeline, "fetch_channel", fetch_channel)
+        monkeypatch.setattr(pipeline.AnalysisRepository, "set_request_failed", set_request_failed)
+        with pytest.raises(ValueError):
+            await pipeline.run_analysis(
+                "fakechannel", session=_FakeSession(), request_id=42, profile=True
+            )
+
+        telegram.answer.set()
+        await asyncio.gather(*pipeline._notifications)  # the send error is only logged
+        assert len(telegram.sent) == 1
+        assert not pipeline._notifications
+
+    @pytest.mark.asyncio
+    async def test_report_stage_profiles_rendering(self, telegram, monkeypatch, tmp_path):
+        monkeypatch.setattr(pipeline, "generate_pdf_report", pdf.generate_pdf_report)
+        monkeypatch.setattr(pdf, "REPORTS_DIR", tmp_path)
+        monkeypatch.setattr(artifact_store.artifact_store, "root", tmp_path / "artifacts")
+        monkeypatch.setattr(charts.settings, "CHART_RENDER_WORKERS", 2)
+        charts.shutdown_render_pool()
+
+        await pipeline.run_analysis(
+            "fakechannel", session=_FakeSession(), request_id=42, profile=True
+        )
+
+        assert charts._pool is None  # charts weren't sent to pool processes
+        stats = pstats.Stats(str(tmp_path / "analysis_42" / "profile" / "report.prof"))
+        by_cumulative = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)
+        top = {f"{Path(file).name}:{name}" for (file, _, name), _ in by_cumulative[:40]}
+        assert "pdf.py:_build_report" in top
+        assert "charts.py:render_chart" in top
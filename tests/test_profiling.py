@@ -0,0 +1,56 @@
+"""Tests for per-stage analysis profiling"""
+
+import json
+
+from src.observability.profiling import AnalysisProfiler, format_summary
+
+
+def _busy(n: int = 20000) -> list[int]:
+    return [i * i for i in range(n)]
+
+
+class TestAnalysisProfiler:
+    def test_profiles_each_stage(self, tmp_path):
+        profiler = AnalysisProfiler.try_start(42, tmp_path / "profile")
+        assert profiler is not None
+        profiler.mark("fetching")
+        _busy()
+        profiler.mark("metrics")
+        data = _busy(200000)  # noqa: F841 — kept alive for the allocation peak
+        summary = profiler.finish("durov")
+
+        assert list(summary["stages"]) == ["fetching", "metrics"]
+        metrics = summary["stages"]["metrics"]
+        assert metrics["peak_alloc_kb"] > 1000
+        assert any("_busy" in fn["function"] for fn in metrics["top"])
+
+        out = tmp_path / "profile"
+        assert (out / "fetching.prof").exists() and (out / "metrics.prof").exists()
+        assert json.loads((out / "summary.json").read_text())["analysis_id"] == 42
+
+    def test_one_profile_at_a_time(self, tmp_path):
+        first = AnalysisProfiler.try_start(1, tmp_path / "a")
+        assert AnalysisProfiler.try_start(2, tmp_path / "b") is None
+        first.finish("one")
+        second = AnalysisProfiler.try_start(3, tmp_path / "c")
+        assert second is not None
+        second.finish("three")
+
+    def test_summary_text_is_escaped(self):
+        summary = {
+            "analysis_id": 7,
+            "channel": "durov",
+            "stages": {
+                "metrics": {
+                    "seconds": 1.5,
+                    "peak_alloc_kb": 2048.0,
+                    "top": [
+                        {"function": "x.py:1(<listcomp>)", "calls": 3, "self_s": 1.0, "cum_s": 1.2}
+                    ],
+                }
+            },
+        }
+        text = format_summary(summary)
+        assert "&lt;listcomp&gt;" in text
+        assert "analysis #7" in text
+        assert "2.0 MB" in text
@@ -0,0 +1,25 @@
+"""Tests for repository helpers that don't need a database"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from src.db.models import AnalysisRequest
+from src.db.repository import decode_cursor, encode_cursor
+
+
+class TestHistoryCursor:
+    def test_roundtrip_keeps_microseconds(self):
+        created = datetime(2026, 3, 1, 12, 30, 5, 123456, tzinfo=timezone.utc)
+        req = AnalysisRequest(id=987, channel_identifier="durov", created_at=created)
+
+        assert decode_cursor(encode_cursor(req)) == (created, 987)
+
+    def test_fits_telegram_callback_data(self):
+        created = datetime(2099, 12, 31, 23, 59, 59, 999999, tzinfo=timezone.utc)
+        req = AnalysisRequest(id=2_147_483_647, channel_identifier="durov", created_at=created)
+        assert len(f"history:next:{encode_cursor(req)}") <= 64
+
+    def test_malformed_cursor(self):
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
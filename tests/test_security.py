@@ -3,15 +3,18 @@
 import pytest
 from unittest.mock import MagicMock, patch
 
-from src.api.security import require_api_key, rate_limit_check, _buckets
+from src.api import security
+from src.api.security import require_api_key, rate_limit_check, _buckets, _memory_hit
 
 
 @pytest.fixture(autouse=True)
 def clear_rate_limit_buckets():
     """Clear rate limit state between tests."""
     _buckets.clear()
+    security._redis_down = False
     yield
     _buckets.clear()
+    security._redis_down = False
 
 
 class TestRequireApiKey:
@@ -81,3 +84,92 @@ class TestRateLimiting:
             with pytest.raises(HTTPException) as exc_info:
                 await rate_limit_check(request)
             assert exc_info.value.status_code == 429
+
+    @pytest.mark.asyncio
+    async def test_429_has_retry_after(self):
+        from fastapi import HTTPException
+
+        request = MagicMock()
+        request.headers = {}
+        request.client = MagicMock()
+        request.client.host = "10.0.0.9"
+
+        with patch("src.api.security.settings") as mock_settings:
+            mock_settings.RATE_LIMIT_PER_MINUTE = 1
+            await rate_limit_check(request)
+            with pytest.raises(HTTPException) as exc_info:
+                await rate_limit_check(request)
+            assert 1 <= int(exc_info.value.headers["Retry-After"]) <= 60
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_falls_back_to_memory(self, monkeypatch):
+        from fastapi import HTTPException
+
+        async def broken_redis():
+            raise ConnectionError("redis down")
+
+        monkeypatch.setattr(security, "get_redis", broken_redis)
+        request = MagicMock()
+        request.headers = {}
+        request.client = MagicMock()
+        request.client.host = "10.0.0.10"
+
+        with patch("src.api.security.settings") as mock_settings:
+            mock_settings.RATE_LIMIT_PER_MINUTE = 2
+            mock_settings.RATE_LIMIT_BACKEND = "redis"
+            await rate_limit_check(request)
+            await rate_limit_check(request)
+            with pytest.raises(HTTPException):
+                await rate_limit_check(request)
+
+    @pytest.mark.asyncio
+    async def test_fallback_logged_once_per_outage(self, monkeypatch, caplog):
+        redis_up = False
+
+        async def redis_hit(key, limit, now):
+            if not redis_up:
+                raise ConnectionError("redis down")
+            return 0.0
+
+        monkeypatch.setattr(security, "_redis_hit", redis_hit)
+        request = MagicMock()
+        request.headers = {}
+        request.client = MagicMock()
+        request.client.host = "10.0.0.11"
+
+        with patch("src.api.security.settings") as mock_settings:
+            mock_settings.RATE_LIMIT_PER_MINUTE = 100
+            mock_settings.RATE_LIMIT_BACKEND = "redis"
+            with caplog.at_level("INFO", logger=security.__name__):
+                for _ in range(3):
+                    await rate_limit_check(request)
+                redis_up = True
+                for _ in range(3):
+                    await rate_limit_check(request)
+
+        assert [r.levelname for r in caplog.records] == ["WARNING", "INFO"]
+
+
+class TestSlidingWindow:
+    def test_previous_window_still_counts(self):
+        for i in range(4):
+            assert _memory_hit("a", limit=4, now=10.0 + i) == 0
+        # Just after the boundary almost the whole previous window overlaps
+        assert _memory_hit("a", limit=4, now=61.0) == 0  # 4 * 59/60 + 0 < 4
+        assert _memory_hit("a", limit=4, now=61.0) > 0
+        # Halfway through, half of the previous 4 requests still count
+        assert _memory_hit("a", limit=4, now=90.0) == 0  # 2 + 1 < 4
+        assert _memory_hit("a", limit=4, now=90.0) > 0
+
+    def test_stale_windows_forgotten(self):
+        for _ in range(4):
+            _memory_hit("b", limit=4, now=5.0)
+        assert _memory_hit("b", limit=4, now=200.0) == 0
+
+    def test_memory_bounded(self, monkeypatch):
+        monkeypatch.setattr(security, "_MAX_KEYS", 100)
+        for i in range(1000):
+            _memory_hit(f"10.0.{i // 256}.{i % 256}", limit=5, now=1.0)
+        assert len(_buckets) == 100
+        assert "10.0.3.231" in _buckets  # most recent kept
+        assert "10.0.0.0" not in _buckets
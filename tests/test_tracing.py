@@ -0,0 +1,119 @@
+"""Tests for tracing spans and trace propagation"""
+
+import json
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.jobs.queue import Job
+from src.observability import tracing
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(tracing.settings, "TRACING_EXPORTER", "file")
+    monkeypatch.setattr(tracing.settings, "TRACING_FILE", str(path))
+    return path
+
+
+def _spans(path) -> dict[str, dict]:
+    assert tracing.flush()
+    return {s["name"]: s for s in map(json.loads, path.read_text().splitlines())}
+
+
+class TestSpans:
+    def test_disabled_is_noop(self, monkeypatch):
+        monkeypatch.setattr(tracing.settings, "TRACING_EXPORTER", "")
+        with tracing.span("anything") as s:
+            s.set_attribute("k", "v")
+            assert s is tracing.NOOP_SPAN
+            assert tracing.current_traceparent() is None
+
+    def test_nesting_and_export(self, trace_file):
+        with tracing.span("outer", {"channel": "durov"}):
+            with tracing.span("inner"):
+                pass
+            leaf = tracing.start_span("db.query")
+            tracing.end_span(leaf)
+
+        spans = _spans(trace_file)
+        outer, inner, leaf = spans["outer"], spans["inner"], spans["db.query"]
+        assert outer["parent_id"] is None
+        assert inner["parent_id"] == outer["context"]["span_id"]
+        assert leaf["parent_id"] == outer["context"]["span_id"]
+        assert inner["context"]["trace_id"] == outer["context"]["trace_id"]
+        assert outer["attributes"] == {"channel": "durov"}
+        assert outer["end_time"] >= outer["start_time"]
+
+    def test_error_status(self, trace_file):
+        with pytest.raises(ValueError):
+            with tracing.span("failing"):
+                raise ValueError("boom")
+        assert _spans(trace_file)["failing"]["status"]["status_code"] == "ERROR"
+
+    @pytest.mark.asyncio
+    async def test_traced_async(self, trace_file):
+        @tracing.traced("work")
+        async def work(x):
+            return x * 2
+
+        assert await work(21) == 42
+        assert "work" in _spans(trace_file)
+
+
+    def test_export_does_not_wait_on_the_disk(self, trace_file, monkeypatch):
+        disk = threading.Event()
+        real_open = tracing._open_trace_file
+
+        def slow_open(path):
+            disk.wait(5)
+            return real_open(path)
+
+        monkeypatch.setattr(tracing, "_open_trace_file", slow_open)
+        started = time.perf_counter()
+        for i in range(100):
+            tracing.end_span(tracing.start_span(f"db.query.{i}"))
+        assert time.perf_counter() - started < 1
+
+        disk.set()
+        assert len(_spans(trace_file)) == 100
+
+
+class TestPropagation:
+    def test_job_carries_trace_to_worker_span(self, trace_file):
+        with tracing.span("submit") as submit:
+            job = Job(kind="analysis", payload={})
+        assert job.traceparent == submit.traceparent
+
+        restored = Job.from_json(job.to_json())
+        with tracing.span("job.analysis", parent=restored.traceparent):
+            pass
+        spans = _spans(trace_file)
+        worker, submitter = spans["job.analysis"], spans["submit"]
+        assert worker["context"]["trace_id"] == submitter["context"]["trace_id"]
+        assert worker["parent_id"] == submitter["context"]["span_id"]
+
+    def test_invalid_traceparent_starts_new_trace(self, trace_file):
+        with tracing.span("root", parent="garbage"):
+            pass
+        assert _spans(trace_file)["root"]["parent_id"] is None
+
+    def test_http_middleware(self, trace_file):
+        app = FastAPI()
+        app.add_middleware(tracing.TracingMiddleware)
+
+        @app.get("/ping")
+        async def ping():
+            return {"traceparent": tracing.current_traceparent()}
+
+        incoming = "00-" + "a" * 32 + "-" + "b" * 16 + "-01"
+        resp = TestClient(app).get("/ping", headers={"traceparent": incoming})
+        assert resp.json()["traceparent"] == resp.headers["traceparent"]
+        server = _spans(trace_file)["GET /ping"]
+        assert server["context"]["trace_id"] == "0x" + "a" * 32
+        assert server["parent_id"] == "0x" + "b" * 16
+        assert server["attributes"]["http.status_code"] == 200
@@ -0,0 +1,62 @@
+"""Tests for the write-behind request log"""
+
+import asyncio
+
+import pytest
+
+from src.db.write_behind import RequestLogWriter, RequestRecord
+
+
+class _Sink:
+    def __init__(self):
+        self.batches: list[list[RequestRecord]] = []
+
+    async def __call__(self, records: list[RequestRecord]) -> None:
+        self.batches.append(list(records))
+
+
+class TestRequestLogWriter:
+    @pytest.mark.asyncio
+    async def test_flushes_on_batch_size(self):
+        sink = _Sink()
+        writer = RequestLogWriter(flush=sink, flush_ms=10_000, batch_size=3, max_buffer=100)
+        for i in range(3):
+            writer.record(f"chan{i}")
+        await asyncio.sleep(0.05)
+
+        assert len(sink.batches) == 1
+        assert [r.channel_identifier for r in sink.batches[0]] == ["chan0", "chan1", "chan2"]
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_flushes_on_interval(self):
+        sink = _Sink()
+        writer = RequestLogWriter(flush=sink, flush_ms=20, batch_size=100, max_buffer=100)
+        writer.complete(42, channel_title="Title")
+        await asyncio.sleep(0.1)
+
+        assert len(sink.batches) == 1
+        assert sink.batches[0][0].request_id == 42
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_buffer(self):
+        sink = _Sink()
+        writer = RequestLogWriter(flush=sink, flush_ms=10_000, batch_size=2, max_buffer=100)
+        for i in range(5):
+            writer.record(f"chan{i}")
+        await writer.stop()
+
+        written = [r.channel_identifier for b in sink.batches for r in b]
+        assert sorted(written) == [f"chan{i}" for i in range(5)]
+        assert writer.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_bounded_buffer_drops(self):
+        sink = _Sink()
+        writer = RequestLogWriter(flush=sink, flush_ms=10_000, batch_size=100, max_buffer=2)
+        for i in range(5):
+            writer.record(f"chan{i}")  # never blocks
+
+        assert writer.dropped >= 2
+        await writer.stop()